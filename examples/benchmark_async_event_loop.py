@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Event loop responsiveness under concurrent inference and device queries
+Compares blocking calls inside the loop against the async API
+"""
+import asyncio
+import time
+
+from unicorn_npu.runtime.async_inference import AsyncInferenceSession
+from unicorn_npu.utils.async_subprocess import run_command_async
+
+
+class SlowSession:
+    """Stand-in for an InferenceSession that takes a fixed time per run"""
+
+    def __init__(self, latency_s: float):
+        self.latency_s = latency_s
+
+    def run(self, output_names, input_feed):
+        time.sleep(self.latency_s)
+        return [input_feed["x"]]
+
+
+async def heartbeat(stop: asyncio.Event, interval: float, lags: list):
+    """Record how late the loop wakes a periodic task"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - start - interval) * 1000.0)
+
+
+async def measure(workload, interval: float = 0.005):
+    stop = asyncio.Event()
+    lags = []
+    beat = asyncio.create_task(heartbeat(stop, interval, lags))
+    await asyncio.sleep(0)  # let the heartbeat start
+    start = time.perf_counter()
+    await workload()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+    lags.sort()
+    p99 = lags[min(len(lags) - 1, int(0.99 * len(lags)))] if lags else float("nan")
+    return elapsed, max(lags) if lags else float("nan"), p99
+
+
+async def main():
+    requests = 32
+    session = SlowSession(latency_s=0.02)
+    feed = {"x": [0.0]}
+
+    print("=" * 70)
+    print("UNICORN-NPU-CORE: Async Event Loop Benchmark")
+    print("=" * 70)
+    print(f"{requests} inferences @ {session.latency_s * 1000:.0f}ms, "
+          f"heartbeat every 5ms\n")
+
+    async def blocking_inference():
+        for _ in range(requests):
+            session.run(None, feed)
+
+    async def async_inference():
+        async with AsyncInferenceSession(session, max_workers=2, max_pending=8) as s:
+            await asyncio.gather(*(s.run(None, feed) for _ in range(requests)))
+            print(f"   stats: {s.get_stats()}")
+
+    async def blocking_queries():
+        import subprocess
+        for _ in range(4):
+            subprocess.run(["sleep", "0.1"], capture_output=True, text=True, timeout=5)
+
+    async def async_queries():
+        await asyncio.gather(*(run_command_async(["sleep", "0.1"], timeout=5)
+                               for _ in range(4)))
+
+    for name, workload in [("blocking session.run", blocking_inference),
+                           ("AsyncInferenceSession", async_inference),
+                           ("blocking subprocess.run", blocking_queries),
+                           ("run_command_async", async_queries)]:
+        elapsed, worst, p99 = await measure(workload)
+        print(f"{name:<26} total={elapsed * 1000:7.1f}ms  "
+              f"loop lag max={worst:7.1f}ms p99={p99:7.1f}ms")
+
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(asyncio.run(main()))
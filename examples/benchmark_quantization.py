@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+INT8 quantization benchmark
+Calibrates a float MLP with streamed batches, emits a QDQ INT8 model and
+re-quantizes from the calibration cache
+"""
+import tempfile
+import time
+
+import numpy as np
+import onnx
+from onnx import TensorProto, helper, numpy_helper
+
+from unicorn_npu import ONNXHelper
+
+HIDDEN, LAYERS, BATCH = 1024, 6, 32
+
+
+def build_mlp(path, seed=0):
+    rng = np.random.default_rng(seed)
+    nodes, inits, current = [], [], "x"
+    for i in range(LAYERS):
+        weight = (rng.standard_normal((HIDDEN, HIDDEN)) / np.sqrt(HIDDEN)).astype(np.float32)
+        bias = (rng.standard_normal(HIDDEN) * 0.01).astype(np.float32)
+        inits += [numpy_helper.from_array(weight, f"w{i}"), numpy_helper.from_array(bias, f"b{i}")]
+        nodes += [helper.make_node("MatMul", [current, f"w{i}"], [f"mm{i}"]),
+                  helper.make_node("Add", [f"mm{i}", f"b{i}"], [f"add{i}"])]
+        current = f"add{i}"
+        if i < LAYERS - 1:
+            nodes.append(helper.make_node("Relu", [current], [f"relu{i}"]))
+            current = f"relu{i}"
+    nodes.append(helper.make_node("Identity", [current], ["y"]))
+    graph = helper.make_graph(
+        nodes, "mlp",
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, ["batch", HIDDEN])],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, ["batch", HIDDEN])],
+        inits)
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)], ir_version=8)
+    onnx.save(model, path)
+
+
+def calibration_batches(count, seed=1):
+    """Stream batches without materializing the dataset"""
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        yield {"x": rng.standard_normal((BATCH, HIDDEN)).astype(np.float32)}
+
+
+def main():
+    helper_ = ONNXHelper()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        float_path, int8_path = f"{tmp}/mlp.onnx", f"{tmp}/mlp.int8.onnx"
+        build_mlp(float_path)
+
+        print("=" * 70)
+        print("UNICORN-NPU-CORE: Offline INT8 Quantization")
+        print("=" * 70)
+        print(f"{LAYERS}x MatMul {HIDDEN}x{HIDDEN}, batch {BATCH}, 64 calibration batches\n")
+
+        for label in ("first run", "cached run"):
+            start = time.perf_counter()
+            report = helper_.quantize_int8(float_path, int8_path, calibration_batches(64),
+                                           cache_dir=f"{tmp}/calibration")
+            elapsed = time.perf_counter() - start
+            print(f"{label}: {elapsed:.2f}s total, calibration "
+                  f"{'cached' if report['calibration_cached'] else 'computed'} in "
+                  f"{report['calibrate_s']:.3f}s ({report['calibrated_tensors']} tensors), "
+                  f"quantize {report['quantize_s']:.2f}s")
+
+        drift = report["drift"]["y"]
+        print(f"\nmodel size: {report['float_bytes'] / 2**20:.1f} MiB -> "
+              f"{report['int8_bytes'] / 2**20:.1f} MiB")
+        print(f"accuracy drift: cosine {drift['cosine']:.5f}, "
+              f"relative error {drift['relative_error']:.4f}, "
+              f"max abs {drift['max_abs_error']:.4f}")
+        print(f"CPU latency: float {report['float_ms']:.2f} ms, int8 {report['int8_ms']:.2f} ms "
+              f"per batch ({report['speedup']:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
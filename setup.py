@@ -44,6 +44,13 @@ setup(
         "openvino": [
             "onnxruntime-openvino>=1.23.0",
         ],
+        "cache": [
+            "xxhash>=3.0.0",
+        ],
+        "quantize": [
+            "onnxruntime>=1.22.0",
+            "onnx>=1.14.0",
+        ],
         "dev": [
             "pytest>=7.0.0",
             "black>=22.0.0",
@@ -53,6 +60,8 @@ setup(
     entry_points={
         "console_scripts": [
             "npu-detect=unicorn_npu.utils.detect:main",
+            "npu-arbiter=unicorn_npu.arbiter.server:main",
+            "npu-quantize=unicorn_npu.runtime.quantization:main",
         ],
     },
     include_package_data=True,
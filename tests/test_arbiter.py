@@ -0,0 +1,81 @@
+"""
+Arbiter scheduler and daemon with the software backend
+"""
+import os
+import socket
+import stat
+
+import pytest
+
+from unicorn_npu.arbiter import (ArbiterClient, ArbiterRequest, ArbiterServer, FairScheduler,
+                                 SoftwareBackend)
+from unicorn_npu.arbiter.protocol import recv_message, send_message
+
+
+def request(client, xclbin, priority=0):
+    return ArbiterRequest(client, xclbin, 'identity', priority=priority)
+
+
+def test_affinity_run_counts_consecutive_picks():
+    scheduler = FairScheduler(affinity_window=100.0, max_affinity_run=1)
+    scheduler.submit(request('x', 'A'))
+    assert scheduler.next(timeout=0).xclbin == 'A'
+
+    scheduler.submit(request('y', 'B'))
+    scheduler.submit(request('x', 'A'))
+    assert scheduler.next(timeout=0).xclbin == 'A'  # affinity pick
+
+    # A fair in-order pick of A (only candidate in its class) ends the streak
+    scheduler.submit(request('z', 'A', priority=1))
+    assert scheduler.next(timeout=0).priority == 1
+
+    scheduler.submit(request('x', 'A'))
+    assert scheduler.next(timeout=0).xclbin == 'A'  # allowed again
+    assert scheduler.next(timeout=0).xclbin == 'B'  # limit reached
+    assert scheduler.get_stats()['affinity_picks'] == 2
+
+
+def test_close_fails_queued_requests_and_clears_counts():
+    scheduler = FairScheduler()
+    pending = [scheduler.submit(request('x', 'A')) for _ in range(3)]
+    scheduler.close()
+
+    assert all(r.done.is_set() and r.error for r in pending)
+    clients = scheduler.get_stats()['clients']
+    assert clients['x']['queued'] == 0 and clients['x']['failed'] == 3
+    with pytest.raises(RuntimeError):
+        scheduler.submit(request('x', 'A'))
+
+
+@pytest.fixture
+def server(tmp_path):
+    arbiter = ArbiterServer(SoftwareBackend(load_latency_s=0.0),
+                            socket_path=str(tmp_path / "arbiter.sock"), socket_mode=0o600)
+    arbiter.start()
+    yield arbiter
+    arbiter.shutdown()
+
+
+def test_socket_created_with_mode(server):
+    assert stat.S_IMODE(os.stat(server.socket_path).st_mode) == 0o600
+
+
+def test_non_object_header_is_rejected(server):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(5)
+    sock.connect(server.socket_path)
+    try:
+        for header in ([], "x", 3):
+            send_message(sock, header)
+            reply, _ = recv_message(sock)
+            assert reply['ok'] is False and 'JSON object' in reply['error']
+        send_message(sock, {'op': 'ping'})
+        assert recv_message(sock)[0] == {'ok': True}
+    finally:
+        sock.close()
+
+
+def test_submit_round_trip(server):
+    with ArbiterClient('tests', socket_path=server.socket_path, timeout=5) as client:
+        assert client.submit('identity', b'payload', xclbin='A') == b'payload'
+        assert client.get_stats()['clients']['tests']['completed'] == 1
@@ -0,0 +1,253 @@
+"""
+PrebuiltInstaller against a scratch root filesystem
+Packages are tiny debs built with dpkg-deb, so no network or root is needed
+"""
+import hashlib
+import http.server
+import shutil
+import sys
+import subprocess
+import threading
+
+import pytest
+
+from unicorn_npu.scripts import install_host
+from unicorn_npu.scripts.install_host import PrebuiltInstaller, XRT_PACKAGES
+
+pytestmark = pytest.mark.skipif(shutil.which("dpkg-deb") is None, reason="dpkg-deb not available")
+
+KERNEL = "6.14.0-test"
+
+
+def build_deb(path, package, files):
+    staging = path.parent / f"{package}-staging"
+    (staging / "DEBIAN").mkdir(parents=True)
+    (staging / "DEBIAN" / "control").write_text(
+        f"Package: {package}\nVersion: 1.0\nArchitecture: all\n"
+        f"Maintainer: test <test@example.com>\nDescription: {package}\n")
+    for name, content in files.items():
+        target = staging / name.lstrip("/")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(content)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    subprocess.run(["dpkg-deb", "-b", str(staging), str(path)], check=True, capture_output=True)
+    shutil.rmtree(staging)
+
+
+def write_checksums(release_dir):
+    lines = []
+    for path in sorted(release_dir.rglob("*")):
+        if path.is_file() and path.name != "checksums.txt":
+            digest = hashlib.sha256(path.read_bytes()).hexdigest()
+            lines.append(f"{digest}  {path.relative_to(release_dir)}\n")
+    (release_dir / "checksums.txt").write_text("".join(lines))
+
+
+@pytest.fixture
+def release_dir(tmp_path):
+    release = tmp_path / "release"
+    for name in XRT_PACKAGES:
+        package = name.split("/")[1].split("_2.20")[0].replace("_", "-")
+        files = {f"/opt/xilinx/xrt/share/{package}": package}
+        if package == "xrt-base":
+            files["/opt/xilinx/xrt/bin/xrt-smi"] = "#!/bin/sh\n"
+        build_deb(release / name, package, files)
+    module = release / install_host.KERNEL_MODULE_TEMPLATE.format(kernel=KERNEL)
+    module.parent.mkdir(parents=True)
+    module.write_bytes(b"not really a module")
+    write_checksums(release)
+    return release
+
+
+@pytest.fixture(autouse=True)
+def no_depmod(monkeypatch):
+    # The fake module would trip up a host depmod
+    real_which = shutil.which
+
+    def which(cmd, *args, **kwargs):
+        return None if cmd == "depmod" else real_which(cmd, *args, **kwargs)
+
+    monkeypatch.setattr(install_host.shutil, "which", which)
+
+
+def make_installer(root, release_dir, **kwargs):
+    return PrebuiltInstaller(root=str(root), release_dir=str(release_dir),
+                             kernel_version=KERNEL, download=False, **kwargs)
+
+
+def statuses(steps):
+    return {name: entry['status'] for name, entry in steps.items()}
+
+
+def test_install_into_scratch_root(tmp_path, release_dir):
+    root = tmp_path / "root"
+    steps = make_installer(root, release_dir).run()
+
+    assert statuses(steps) == {'verify': 'done', 'xrt': 'done', 'kernel_module': 'done',
+                               'permissions': 'done', 'check': 'done'}
+    assert (root / "opt/xilinx/xrt/bin/xrt-smi").exists()
+    assert (root / "opt/xilinx/xrt/share/xrt-plugin-amdxdna").exists()
+    assert (root / f"lib/modules/{KERNEL}/updates/dkms/amdxdna.ko.zst").read_bytes() == \
+        b"not really a module"
+    assert (root / "etc/udev/rules.d/99-npu.rules").read_text() == install_host.UDEV_RULE
+    assert steps['check']['details']['xrt_smi'] and steps['check']['details']['kernel_module']
+
+
+def test_rerun_skips_everything(tmp_path, release_dir):
+    root = tmp_path / "root"
+    make_installer(root, release_dir).run()
+    steps = make_installer(root, release_dir).run()
+
+    assert statuses(steps) == {'verify': 'skipped', 'xrt': 'skipped', 'kernel_module': 'skipped',
+                               'permissions': 'skipped', 'check': 'done'}
+    assert steps['verify']['details']['hashed'] == []
+
+
+def test_tampered_artifact_fails_verify(tmp_path, release_dir):
+    root = tmp_path / "root"
+    make_installer(root, release_dir).run()
+    with open(release_dir / XRT_PACKAGES[0], 'ab') as f:
+        f.write(b"tampered")
+
+    installer = make_installer(root, release_dir, force=True)
+    with pytest.raises(RuntimeError, match="Checksum mismatch"):
+        installer.run()
+    assert installer.state.steps['verify']['status'] == 'failed'
+    assert XRT_PACKAGES[0] not in installer.state.verified
+    assert (release_dir / XRT_PACKAGES[0]).exists()
+
+
+def test_installed_components_need_no_artifacts(tmp_path, release_dir):
+    root = tmp_path / "root"
+    make_installer(root, release_dir).run()
+    for name in XRT_PACKAGES:
+        (release_dir / name).unlink()
+
+    steps = make_installer(root, release_dir).run()
+    assert steps['verify']['status'] == 'skipped'
+    assert steps['verify']['details']['installed'] == ['xrt', 'kernel_module']
+    assert steps['xrt']['status'] == 'skipped'
+
+
+def test_tampered_download_is_removed(tmp_path, release_dir):
+    root = tmp_path / "root"
+    installer = make_installer(root, release_dir)
+    cached = installer.cache_dir / XRT_PACKAGES[1]
+    cached.parent.mkdir(parents=True)
+    (release_dir / XRT_PACKAGES[1]).rename(cached)
+    with open(cached, 'ab') as f:
+        f.write(b"tampered")
+
+    with pytest.raises(RuntimeError, match="Checksum mismatch"):
+        installer.run()
+    assert not cached.exists()
+
+
+def test_resume_after_failed_step(tmp_path, release_dir):
+    root = tmp_path / "root"
+    # A directory where the udev rule goes makes the permissions step fail
+    (root / "etc/udev/rules.d/99-npu.rules").mkdir(parents=True)
+    installer = make_installer(root, release_dir)
+    with pytest.raises(OSError):
+        installer.run()
+    assert statuses(installer.state.steps) == {'verify': 'done', 'xrt': 'done',
+                                               'kernel_module': 'done', 'permissions': 'failed'}
+    assert installer.state.steps['permissions']['error']
+
+    (root / "etc/udev/rules.d/99-npu.rules").rmdir()
+    steps = make_installer(root, release_dir).run()
+    assert statuses(steps) == {'verify': 'skipped', 'xrt': 'skipped', 'kernel_module': 'skipped',
+                               'permissions': 'done', 'check': 'done'}
+
+
+def test_failed_command_records_stderr(tmp_path, release_dir):
+    root = tmp_path / "root"
+    (release_dir / XRT_PACKAGES[2]).write_bytes(b"not a deb")
+    write_checksums(release_dir)
+
+    installer = make_installer(root, release_dir)
+    with pytest.raises(subprocess.CalledProcessError):
+        installer.run()
+    error = installer.state.steps['xrt']['error']
+    assert "dpkg-deb: error" in error
+
+
+def test_download_resume_accepts_416(tmp_path, monkeypatch):
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(416)
+            self.send_header("Content-Range", "bytes */4")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        monkeypatch.setattr(install_host, "RELEASE_URL", f"http://127.0.0.1:{server.server_port}")
+        target = tmp_path / "cache" / "xrt.deb"
+        target.parent.mkdir()
+        target.with_name("xrt.deb.part").write_bytes(b"done")
+        assert PrebuiltInstaller._download("xrt/xrt.deb", target) == target
+        assert target.read_bytes() == b"done"
+    finally:
+        server.shutdown()
+
+
+def serve(files):
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = files.get(self.path.lstrip("/"))
+            self.send_response(200 if body is not None else 404)
+            self.end_headers()
+            if body is not None:
+                self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.mark.parametrize("pinned", [True, False])
+def test_checksums_downloaded_without_release_dir(tmp_path, monkeypatch, pinned):
+    manifest = b"0" * 64 + b"  ./xrt/xrt-base_2.20.0_amd64.deb\n"
+    server = serve({"checksums.txt": manifest})
+    try:
+        monkeypatch.setattr(install_host, "RELEASE_URL", f"http://127.0.0.1:{server.server_port}")
+        monkeypatch.setattr(install_host, "get_release_dir", lambda: tmp_path / "missing")
+        monkeypatch.setattr(install_host, "CHECKSUMS_SHA256",
+                            hashlib.sha256(manifest if pinned else b"other").hexdigest())
+        root = tmp_path / "root"
+        if pinned:
+            installer = PrebuiltInstaller(root=str(root), kernel_version=KERNEL)
+            assert installer.checksums == {"xrt/xrt-base_2.20.0_amd64.deb": "0" * 64}
+            assert installer.release_dir == installer.cache_dir
+        else:
+            with pytest.raises(RuntimeError, match="pinned"):
+                PrebuiltInstaller(root=str(root), kernel_version=KERNEL)
+            assert not list(root.rglob("checksums.txt"))
+    finally:
+        server.shutdown()
+
+
+def test_main_reports_missing_checksums(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["install_host", "--root", str(tmp_path / "root"),
+                                      "--release-dir", str(tmp_path / "nonexistent")])
+    with pytest.raises(SystemExit) as exit_info:
+        install_host.main()
+    assert exit_info.value.code == 1
+    assert "checksums.txt not found" in capsys.readouterr().out
+
+
+def test_stream_keeps_output_tail(tmp_path, release_dir, capsys):
+    installer = make_installer(tmp_path / "root", release_dir)
+    script = "for i in $(seq 1 30); do echo line$i; done; echo failed >&2; exit 3"
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        installer._stream(["sh", "-c", script])
+    tail = error.value.stderr.splitlines()
+    assert len(tail) == install_host.STREAM_TAIL_LINES and tail[-1] == "failed"
+    assert "line1\n" in capsys.readouterr().out
@@ -0,0 +1,133 @@
+"""
+PipelinedKernelRunner on the software NPU emulator
+"""
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from unicorn_npu.runtime import npu_emulator
+from unicorn_npu.runtime.kernel_runner import PipelinedKernelRunner
+from unicorn_npu.runtime.xrt_wrapper import NPUDevice
+
+CHUNK = 64
+
+
+def add_one(src, dst, *args):
+    if src[0] == 255:
+        raise RuntimeError("kernel fault")
+    np.add(src, 1, out=dst, casting="unsafe")
+    return src.size
+
+
+@pytest.fixture
+def npu(tmp_path):
+    previous = npu_emulator.configure()
+    npu_emulator.configure(time_scale=0.0)
+    npu_emulator.register_kernel("add_one", add_one)
+    xclbin = tmp_path / "test.xclbin"
+    xclbin.write_bytes(b"xclbin")
+    device = NPUDevice(0, backend="emulator")
+    device.load_xclbin(xclbin)
+    yield device
+    device.close()
+    npu_emulator.configure(previous)
+
+
+def chunks(count):
+    return [np.full(CHUNK, i % 200, dtype=np.uint8) for i in range(count)]
+
+
+@pytest.mark.parametrize("num_buffers", [1, 2, 3])
+def test_outputs_in_order(npu, num_buffers):
+    runner = npu.create_runner("add_one", CHUNK, CHUNK, num_buffers=num_buffers)
+    inputs = chunks(10)
+    outputs = runner.run_all(inputs)
+
+    assert len(outputs) == len(inputs)
+    for output, chunk in zip(outputs, inputs):
+        np.testing.assert_array_equal(output, chunk + 1)
+    stats = runner.get_stats()
+    assert stats["chunks"] == 10 and stats["pipelined"]
+    assert all(stage["count"] == 10 for stage in stats["stages"].values())
+
+
+def test_serial_matches_pipelined(npu):
+    runner = npu.create_runner("add_one", CHUNK, CHUNK)
+    inputs = chunks(5)
+    serial = runner.run_all(inputs, pipelined=False)
+    pipelined = runner.run_all(inputs)
+    assert all(np.array_equal(a, b) for a, b in zip(serial, pipelined))
+    np.testing.assert_array_equal(runner.run(inputs[0]), inputs[0] + 1)
+
+
+def test_h2d_error(npu):
+    runner = npu.create_runner("add_one", CHUNK, CHUNK)
+    inputs = chunks(3) + [np.zeros(CHUNK * 2, dtype=np.uint8)]
+    with pytest.raises(RuntimeError, match="h2d stage failed") as error:
+        runner.run_all(inputs)
+    assert isinstance(error.value.__cause__, ValueError)
+
+
+def test_exec_error(npu):
+    runner = npu.create_runner("add_one", CHUNK, CHUNK)
+    inputs = chunks(3) + [np.full(CHUNK, 255, dtype=np.uint8)] + chunks(3)
+    with pytest.raises(RuntimeError, match="exec stage failed"):
+        runner.run_all(inputs)
+
+
+def test_d2h_error(npu):
+    runner = npu.create_runner("add_one", CHUNK, CHUNK)
+    bo = runner.output_bos[1]
+    real_sync = bo.sync
+
+    def failing_sync(direction, *args):
+        if direction == npu.xrt.xclBOSyncDirection.XCL_BO_SYNC_BO_FROM_DEVICE:
+            raise OSError("DMA fault")
+        return real_sync(direction, *args)
+
+    bo.sync = failing_sync
+    with pytest.raises(RuntimeError, match="d2h stage failed"):
+        runner.run_all(chunks(4))
+
+
+def test_error_from_source_iterator(npu):
+    def source():
+        yield from chunks(2)
+        raise KeyError("source gone")
+
+    runner = npu.create_runner("add_one", CHUNK, CHUNK)
+    with pytest.raises(RuntimeError, match="h2d stage failed"):
+        runner.run_all(source())
+
+
+def test_close_while_source_blocked(npu):
+    release = threading.Event()
+
+    def live_source():
+        yield from chunks(2)
+        release.wait()
+        yield from chunks(1)
+
+    runner = npu.create_runner("add_one", CHUNK, CHUNK)
+    stream = runner.stream(live_source())
+    try:
+        assert len([next(stream), next(stream)]) == 2
+        # Close from a helper thread so a regression fails instead of hanging
+        closer = threading.Thread(target=stream.close, daemon=True)
+        start = time.perf_counter()
+        closer.start()
+        closer.join(timeout=5.0)
+        assert not closer.is_alive()
+        assert time.perf_counter() - start < 2.0
+        assert runner.get_stats()["chunks"] == 2
+    finally:
+        release.set()
+
+
+def test_close_releases_buffers(npu):
+    runner = PipelinedKernelRunner(npu, npu.get_kernel("add_one"), CHUNK, CHUNK)
+    assert len(runner.input_bos) == len(runner.output_bos) == 2
+    runner.close()
+    assert runner.input_bos == [] and runner.output_bos == []
@@ -0,0 +1,62 @@
+"""
+CachedSession with a fake session
+"""
+import os
+
+import numpy as np
+
+from unicorn_npu.runtime.result_cache import CachedSession, hash_inputs
+
+
+class ScaleSession:
+    """Multiplies its input and counts runs"""
+
+    def __init__(self, scale=1.0):
+        self.scale = scale
+        self.runs = 0
+
+    def run(self, output_names, input_feed, run_options=None):
+        self.runs += 1
+        return [input_feed['x'] * self.scale]
+
+
+def test_zero_length_input():
+    session = CachedSession(ScaleSession())
+    past = np.zeros((1, 8, 0, 64), dtype=np.float32)
+
+    first = session.run(None, {'x': past})[0]
+    second = session.run(None, {'x': past})[0]
+    assert first.shape == second.shape == (1, 8, 0, 64)
+    assert session.session.runs == 1
+    assert hash_inputs({'x': past}) != hash_inputs({'x': np.zeros((1, 8, 0, 32), np.float32)})
+
+
+def test_spill_dirs_are_per_session(tmp_path):
+    a = CachedSession(ScaleSession(1.0), max_bytes=4096, spill_dir=str(tmp_path))
+    b = CachedSession(ScaleSession(100.0), max_bytes=4096, spill_dir=str(tmp_path))
+    inputs = [np.full(512, i, dtype=np.float32) for i in range(8)]
+    for session in (a, b):
+        for x in inputs:
+            session.run(None, {'x': x})
+
+    assert a.get_stats()['disk_entries'] > 0
+    assert a.run(None, {'x': inputs[1]})[0][0] == 1.0
+    assert b.run(None, {'x': inputs[1]})[0][0] == 100.0
+    assert a.get_stats()['disk_hits'] == 1
+
+    a.close()
+    b.close()
+    assert os.listdir(tmp_path) == []
+
+
+def test_only_own_stale_dirs_are_reaped(tmp_path):
+    dead = CachedSession(ScaleSession(), spill_dir=str(tmp_path)).spill_dir
+    stale = dead.rename(tmp_path / "999999999-deadbeef")
+    user_dir = tmp_path / "999999999-cafef00d"
+    user_dir.mkdir()
+    user_file = tmp_path / ("0" * 32 + "_0.npy")
+    user_file.write_bytes(b"")
+
+    CachedSession(ScaleSession(), spill_dir=str(tmp_path)).close()
+    assert not stale.exists()
+    assert user_dir.exists() and user_file.exists()
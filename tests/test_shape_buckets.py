@@ -0,0 +1,74 @@
+"""
+BucketedSession on small generated models
+"""
+import numpy as np
+import onnx
+import pytest
+from onnx import TensorProto, helper, numpy_helper
+
+from unicorn_npu.runtime.shape_buckets import BucketedSession, suggest_buckets
+
+
+@pytest.fixture
+def model_path(tmp_path):
+    # y: [batch, seq] (length-bearing); feat: [1, 4] (static, same size as bucket 4)
+    features = numpy_helper.from_array(np.arange(4, dtype=np.float32).reshape(1, 4), "features")
+    graph = helper.make_graph(
+        [helper.make_node("Mul", ["x", "x"], ["y"]),
+         helper.make_node("ReduceSum", ["x"], ["total"], keepdims=0),
+         helper.make_node("Add", ["features", "total"], ["feat"])],
+        "bucketed",
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, ["batch", "seq"])],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, ["batch", "seq"]),
+         helper.make_tensor_value_info("feat", TensorProto.FLOAT, [1, 4])],
+        [features])
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)], ir_version=8)
+    path = tmp_path / "bucketed.onnx"
+    onnx.save(model, str(path))
+    return str(path)
+
+
+def make_session(model_path, **kwargs):
+    return BucketedSession(model_path, [4, 8], {"x": 1},
+                           providers=["CPUExecutionProvider"], **kwargs)
+
+
+def test_length_outputs_are_trimmed(model_path):
+    session = make_session(model_path)
+    x = np.array([[1.0, 2.0, 3.0]], dtype=np.float32)
+    y, feat = session.run(None, {"x": x})
+
+    np.testing.assert_allclose(y, x * x)
+    assert session.get_stats()["buckets"] == {4: 1, 8: 0}
+    # Padding is zero, so the reduction only sees the request's values
+    np.testing.assert_allclose(feat, np.arange(4, dtype=np.float32).reshape(1, 4) + 6.0)
+
+
+def test_static_output_matching_bucket_size_is_not_trimmed(model_path):
+    session = make_session(model_path)
+    feat = session.run(["feat"], {"x": np.ones((1, 3), dtype=np.float32)})[0]
+    assert feat.shape == (1, 4)
+
+
+def test_explicit_output_axes(model_path):
+    session = make_session(model_path, output_axes={"feat": (1, 0.5)})
+    feat = session.run(["feat"], {"x": np.ones((1, 3), dtype=np.float32)})[0]
+    assert feat.shape == (1, 2)
+
+
+def test_bindings_per_bucket_are_bounded(model_path):
+    session = make_session(model_path, max_bindings=2)
+    for batch in (1, 2, 3, 2):
+        y = session.run(["y"], {"x": np.ones((batch, 3), dtype=np.float32)})[0]
+        assert y.shape == (batch, 3)
+    assert list(session._slots[0].bindings) == [(("x", (3, 4)),), (("x", (2, 4)),)]
+
+
+def test_overflow_uses_dynamic_session(model_path):
+    session = make_session(model_path)
+    assert session.run(["y"], {"x": np.ones((1, 12), dtype=np.float32)})[0].shape == (1, 12)
+    assert session.get_stats()["overflow"] == 1
+
+
+def test_suggest_buckets_minimizes_padding():
+    assert suggest_buckets({3: 10, 4: 10, 30: 1, 32: 1}, 2) == [4, 32]
@@ -0,0 +1,179 @@
+"""
+WeightStreamer on the software NPU emulator
+"""
+import json
+import mmap
+import struct
+
+import numpy as np
+import pytest
+
+from unicorn_npu.runtime import npu_emulator, weight_streamer
+from unicorn_npu.runtime.weight_streamer import (WeightStreamer, read_onnx_external_data_index,
+                                                 read_raw_index, read_safetensors_index)
+from unicorn_npu.runtime.xrt_wrapper import NPUDevice
+
+PAGE = mmap.PAGESIZE
+
+
+@pytest.fixture
+def npu():
+    previous = npu_emulator.configure()
+    npu_emulator.configure(time_scale=0.0)
+    device = NPUDevice(0, backend="emulator")
+    yield device
+    device.close()
+    npu_emulator.configure(previous)
+
+
+def random_bytes(size, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, size, dtype=np.uint8).tobytes()
+
+
+def on_device(bo, size):
+    # The emulator keeps a separate device copy, so this also checks the syncs
+    return bo.device_memory[:size].tobytes()
+
+
+def write_safetensors(path, tensors):
+    header, blobs, offset = {"__metadata__": {"format": "pt"}}, [], 0
+    for name, array in tensors.items():
+        data = array.tobytes()
+        header[name] = {"dtype": "F32", "shape": list(array.shape),
+                        "data_offsets": [offset, offset + len(data)]}
+        blobs.append(data)
+        offset += len(data)
+    encoded = json.dumps(header).encode()
+    with open(path, "wb") as f:
+        f.write(struct.pack("<Q", len(encoded)) + encoded + b"".join(blobs))
+    return 8 + len(encoded)
+
+
+@pytest.mark.parametrize("size", [1, PAGE - 1, PAGE, PAGE + 1, 3 * PAGE, 3 * PAGE + PAGE // 2])
+def test_chunk_boundaries(tmp_path, npu, size):
+    data = random_bytes(size)
+    path = tmp_path / "weights.bin"
+    path.write_bytes(data)
+
+    streamer = WeightStreamer(npu, chunk_size=PAGE, max_resident_bytes=2 * PAGE)
+    bo = streamer.stream_file(path)
+    assert on_device(bo, size) == data
+    stats = streamer.get_stats()
+    assert stats["bytes"] == size and stats["chunks"] == -(-size // PAGE)
+
+
+def test_unaligned_byte_range(tmp_path, npu):
+    data = random_bytes(5 * PAGE)
+    path = tmp_path / "weights.bin"
+    path.write_bytes(data)
+
+    bo = WeightStreamer(npu, chunk_size=PAGE).stream_file(path, offset=123, length=2 * PAGE + 7)
+    assert on_device(bo, 2 * PAGE + 7) == data[123:123 + 2 * PAGE + 7]
+
+
+def test_safetensors_offsets(tmp_path, npu):
+    tensors = {
+        "b.weight": np.arange(3000, dtype=np.float32),
+        "a.bias": np.linspace(-1, 1, 7, dtype=np.float32),
+    }
+    path = tmp_path / "model.safetensors"
+    data_start = write_safetensors(path, tensors)
+
+    segments = read_safetensors_index(path)
+    assert [s.name for s in segments] == ["b.weight", "a.bias"]
+    assert segments[0].offset == data_start
+    assert segments[1].offset == data_start + tensors["b.weight"].nbytes
+
+    bos = WeightStreamer(npu, chunk_size=PAGE).stream_safetensors(path)
+    for name, array in tensors.items():
+        assert on_device(bos[name], array.nbytes) == array.tobytes()
+
+    assert list(WeightStreamer(npu, chunk_size=PAGE).stream_safetensors(path, ["a.bias"])) == ["a.bias"]
+    with pytest.raises(KeyError):
+        read_safetensors_index(path, ["missing"])
+
+
+def test_onnx_external_data_offsets(tmp_path, npu):
+    onnx = pytest.importorskip("onnx")
+    from onnx import TensorProto, helper, numpy_helper
+
+    weights = {
+        "w0": np.random.default_rng(0).standard_normal((64, 64)).astype(np.float32),
+        "w1": np.arange(100, dtype=np.float32),
+    }
+    graph = helper.make_graph(
+        [helper.make_node("Add", ["x", "w1"], ["y"])], "external",
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, [100])],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, [100])],
+        [numpy_helper.from_array(array, name) for name, array in weights.items()])
+    model_path = tmp_path / "model.onnx"
+    onnx.save(helper.make_model(graph), str(model_path), save_as_external_data=True,
+              all_tensors_to_one_file=True, location="weights.data", size_threshold=0)
+
+    segments = read_onnx_external_data_index(model_path)
+    assert {s.name for s in segments} == set(weights)
+    assert all(s.path == str(tmp_path / "weights.data") for s in segments)
+    raw = (tmp_path / "weights.data").read_bytes()
+    for segment in segments:
+        assert raw[segment.offset:segment.offset + segment.length] == weights[segment.name].tobytes()
+
+    bos = WeightStreamer(npu, chunk_size=PAGE).stream_onnx_external_data(model_path)
+    for name, array in weights.items():
+        assert on_device(bos[name], array.nbytes) == array.tobytes()
+
+
+def test_resident_bytes_stay_bounded(tmp_path, npu, monkeypatch):
+    outstanding, peak = [0], [0]
+
+    class TrackedFile(weight_streamer._MappedFile):
+        def prefetch(self, offset, length):
+            outstanding[0] += length
+            peak[0] = max(peak[0], outstanding[0])
+            super().prefetch(offset, length)
+
+        def release(self, offset, length):
+            super().release(offset, length)
+            outstanding[0] -= length
+
+    monkeypatch.setattr(weight_streamer, "_MappedFile", TrackedFile)
+    path = tmp_path / "weights.bin"
+    data = random_bytes(40 * PAGE)
+    path.write_bytes(data)
+
+    streamer = WeightStreamer(npu, chunk_size=PAGE, max_resident_bytes=3 * PAGE)
+    assert on_device(streamer.stream_file(path), len(data)) == data
+    assert 0 < peak[0] <= 3 * PAGE
+    assert streamer.get_stats()["peak_window_bytes"] <= 3 * PAGE
+    assert outstanding[0] == 0
+
+
+def test_prefetch_error_propagates(tmp_path, npu, monkeypatch):
+    calls = [0]
+
+    class FailingFile(weight_streamer._MappedFile):
+        def prefetch(self, offset, length):
+            calls[0] += 1
+            if calls[0] == 3:
+                raise OSError("read error")
+            super().prefetch(offset, length)
+
+    monkeypatch.setattr(weight_streamer, "_MappedFile", FailingFile)
+    path = tmp_path / "weights.bin"
+    path.write_bytes(random_bytes(8 * PAGE))
+
+    streamer = WeightStreamer(npu, chunk_size=PAGE, max_resident_bytes=2 * PAGE)
+    with pytest.raises(RuntimeError, match="Weight prefetch failed") as error:
+        streamer.stream_file(path)
+    assert isinstance(error.value.__cause__, OSError)
+    assert streamer.get_stats()["bytes"] == 2 * PAGE
+
+
+def test_invalid_configuration(npu, tmp_path):
+    with pytest.raises(ValueError):
+        WeightStreamer(npu, chunk_size=PAGE + 1)
+    with pytest.raises(ValueError):
+        WeightStreamer(npu, chunk_size=2 * PAGE, max_resident_bytes=PAGE)
+    path = tmp_path / "weights.bin"
+    path.write_bytes(b"1234")
+    with pytest.raises(ValueError):
+        read_raw_index(path, offset=2, length=10)
@@ -0,0 +1,15 @@
+"""Cross-process NPU arbiter"""
+
+from .client import ArbiterClient
+from .server import ArbiterServer
+from .scheduler import FairScheduler, ArbiterRequest
+from .backends import SoftwareBackend, XRTBackend
+
+__all__ = [
+    "ArbiterClient",
+    "ArbiterServer",
+    "FairScheduler",
+    "ArbiterRequest",
+    "SoftwareBackend",
+    "XRTBackend",
+]
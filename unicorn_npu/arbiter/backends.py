@@ -0,0 +1,139 @@
+"""
+Arbiter Backends
+Execute scheduled work on the NPU, or on the CPU as a stand-in
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+KernelFunction = Callable[[bytes, Dict[str, Any]], bytes]
+
+
+class SoftwareBackend:
+    """
+    CPU stand-in for the NPU
+
+    Kernels are Python callables (data, params) -> bytes. Switching xclbin
+    and running a kernel cost configurable simulated latencies, so reload
+    behaviour can be observed without hardware.
+    """
+
+    def __init__(self,
+                 kernels: Optional[Dict[str, KernelFunction]] = None,
+                 load_latency_s: float = 0.05,
+                 exec_latency_s: float = 0.0):
+        """
+        Initialize software backend
+
+        Args:
+            kernels: Kernel name -> callable (default: 'identity')
+            load_latency_s: Simulated xclbin load time
+            exec_latency_s: Simulated time per kernel run
+        """
+        self.kernels = {'identity': lambda data, params: data}
+        self.kernels.update(kernels or {})
+        self.load_latency_s = load_latency_s
+        self.exec_latency_s = exec_latency_s
+        self.current_xclbin: Optional[str] = None
+        self.xclbin_loads = 0
+
+    def execute(self, xclbin: Optional[str], kernel: str, data: bytes,
+                params: Dict[str, Any]) -> bytes:
+        """Run a kernel, loading its xclbin first if needed"""
+        if xclbin != self.current_xclbin:
+            time.sleep(self.load_latency_s)
+            self.current_xclbin = xclbin
+            self.xclbin_loads += 1
+
+        if kernel not in self.kernels:
+            raise KeyError(f"Unknown kernel: {kernel}")
+
+        latency = params.get('latency_s', self.exec_latency_s)
+        if latency:
+            time.sleep(latency)
+        return self.kernels[kernel](data, params)
+
+    def get_info(self) -> Dict[str, Any]:
+        return {
+            'backend': 'software',
+            'current_xclbin': self.current_xclbin,
+            'xclbin_loads': self.xclbin_loads,
+            'kernels': sorted(self.kernels),
+        }
+
+    def close(self):
+        pass
+
+
+class XRTBackend:
+    """Run work on the NPU through runtime.xrt_wrapper.NPUDevice"""
+
+    def __init__(self, device_index: int = 0, backend: Optional[str] = None,
+                 max_runners: int = 8):
+        """
+        Initialize XRT backend
+
+        Args:
+            device_index: NPU device index
+            backend: NPUDevice backend ("xrt" or "emulator")
+            max_runners: Runners (each owning its BOs) kept per xclbin; the
+                         least recently used is freed beyond this
+        """
+        from ..runtime.xrt_wrapper import NPUDevice
+
+        self.npu = NPUDevice(device_index, backend=backend)
+        self.max_runners = max(1, max_runners)
+        self.current_xclbin: Optional[str] = None
+        self.xclbin_loads = 0
+        self.runner_evictions = 0
+        self._runners: "OrderedDict[Tuple[str, int, int], Any]" = OrderedDict()
+
+    def execute(self, xclbin: Optional[str], kernel: str, data: bytes,
+                params: Dict[str, Any]) -> bytes:
+        """
+        Run a kernel on one input buffer
+
+        params must contain 'output_size'; 'input_size' defaults to len(data).
+        """
+        if xclbin is None:
+            raise ValueError("XRT backend requires an xclbin")
+        if xclbin != self.current_xclbin:
+            self.npu.load_xclbin(xclbin)
+            self.current_xclbin = xclbin
+            self.xclbin_loads += 1
+            self._close_runners()
+
+        input_size = int(params.get('input_size', len(data)))
+        output_size = int(params['output_size'])
+        key = (kernel, input_size, output_size)
+        runner = self._runners.get(key)
+        if runner is None:
+            # Variable-size payloads would otherwise accumulate BOs forever
+            while len(self._runners) >= self.max_runners:
+                _, evicted = self._runners.popitem(last=False)
+                evicted.close()
+                self.runner_evictions += 1
+            runner = self.npu.create_runner(kernel, input_size, output_size, num_buffers=1)
+            self._runners[key] = runner
+        else:
+            self._runners.move_to_end(key)
+        return runner.run(data).tobytes()
+
+    def _close_runners(self):
+        for runner in self._runners.values():
+            runner.close()
+        self._runners.clear()
+
+    def get_info(self) -> Dict[str, Any]:
+        return {
+            'backend': self.npu.backend,
+            'device_index': self.npu.device_index,
+            'current_xclbin': self.current_xclbin,
+            'xclbin_loads': self.xclbin_loads,
+            'runners': len(self._runners),
+            'runner_evictions': self.runner_evictions,
+        }
+
+    def close(self):
+        self._close_runners()
+        self.npu.close()
@@ -0,0 +1,137 @@
+"""
+NPU Arbiter Client
+Submit NPU work to the local arbiter daemon instead of opening the device
+"""
+import socket
+import threading
+from typing import Any, Dict, Optional, Union
+
+from .protocol import default_socket_path, recv_message, send_message
+
+
+class ArbiterClient:
+    """Thread-safe client for the NPU arbiter daemon"""
+
+    def __init__(self,
+                 client_name: str,
+                 socket_path: Optional[str] = None,
+                 weight: float = 1.0,
+                 priority: int = 0,
+                 timeout: Optional[float] = None):
+        """
+        Initialize client
+
+        Args:
+            client_name: Name used for fair-share accounting (e.g. 'amanuensis')
+            socket_path: Arbiter socket (default: default_socket_path())
+            weight: Share of the device relative to other clients
+            priority: Default priority class (higher is served first)
+            timeout: Socket timeout in seconds (None blocks)
+        """
+        self.client_name = client_name
+        self.socket_path = socket_path or default_socket_path()
+        self.weight = weight
+        self.priority = priority
+        self.timeout = timeout
+        self.last_wait_ms: Optional[float] = None
+        self.last_service_ms: Optional[float] = None
+        self._sock: Optional[socket.socket] = None
+        self._lock = threading.Lock()
+
+    def submit(self,
+               kernel: str,
+               data: Union[bytes, bytearray, memoryview] = b'',
+               xclbin: Optional[str] = None,
+               params: Optional[Dict[str, Any]] = None,
+               cost: float = 1.0,
+               priority: Optional[int] = None) -> bytes:
+        """
+        Run a kernel through the arbiter and wait for its output
+
+        Args:
+            kernel: Kernel name
+            data: Input payload
+            xclbin: XCLBIN containing the kernel
+            params: Backend parameters (XRT backend needs 'output_size')
+            cost: Estimated service cost used for fair queueing
+            priority: Priority class for this request (default: client's)
+
+        Returns:
+            Output payload
+
+        Raises:
+            RuntimeError: If the arbiter reports an error
+            ConnectionError: If the arbiter is unreachable
+        """
+        header = {
+            'op': 'submit',
+            'client': self.client_name,
+            'kernel': kernel,
+            'xclbin': xclbin,
+            'params': params or {},
+            'cost': cost,
+            'priority': self.priority if priority is None else priority,
+            'weight': self.weight,
+        }
+        reply, payload = self._call(header, bytes(data))
+        self.last_wait_ms = reply.get('wait_ms')
+        self.last_service_ms = reply.get('service_ms')
+        return payload
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get arbiter queue, wait-time and backend statistics"""
+        reply, _ = self._call({'op': 'stats'})
+        return reply['stats']
+
+    def ping(self) -> bool:
+        """Check that the arbiter is reachable"""
+        try:
+            self._call({'op': 'ping'})
+            return True
+        except (ConnectionError, OSError, RuntimeError):
+            return False
+
+    def close(self):
+        """Close the connection"""
+        with self._lock:
+            self._disconnect()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _call(self, header: Dict[str, Any], payload: bytes = b''):
+        with self._lock:
+            if self._sock is None:
+                self._connect()
+            try:
+                send_message(self._sock, header, payload)
+                message = recv_message(self._sock)
+            except OSError:
+                self._disconnect()
+                raise
+            if message is None:
+                self._disconnect()
+                raise ConnectionError("Arbiter closed the connection")
+
+        reply, result = message
+        if not reply.get('ok'):
+            raise RuntimeError(f"Arbiter error: {reply.get('error')}")
+        return reply, result
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError as e:
+            sock.close()
+            raise ConnectionError(f"NPU arbiter not reachable at {self.socket_path}: {e}")
+        self._sock = sock
+
+    def _disconnect(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
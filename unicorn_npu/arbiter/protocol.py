@@ -0,0 +1,69 @@
+"""
+Arbiter Wire Protocol
+Length-prefixed JSON header plus an optional binary payload
+"""
+import json
+import os
+import socket
+import struct
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+# header length, payload length
+_FRAME = struct.Struct('!II')
+
+MAX_HEADER_BYTES = 1 << 20
+MAX_PAYLOAD_BYTES = 1 << 31
+
+
+def default_socket_path() -> str:
+    """Get arbiter socket path (UNICORN_NPU_ARBITER_SOCKET, then runtime dir)"""
+    path = os.environ.get('UNICORN_NPU_ARBITER_SOCKET')
+    if path:
+        return path
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR') or '/tmp'
+    return str(Path(runtime_dir) / 'unicorn-npu-arbiter.sock')
+
+
+def send_message(sock: socket.socket, header: Dict[str, Any], payload: bytes = b''):
+    """Send one framed message"""
+    encoded = json.dumps(header, separators=(',', ':')).encode()
+    sock.sendall(_FRAME.pack(len(encoded), len(payload)) + encoded)
+    if payload:
+        sock.sendall(payload)
+
+
+def recv_message(sock: socket.socket) -> Optional[Tuple[Dict[str, Any], bytes]]:
+    """
+    Receive one framed message
+
+    Returns:
+        (header, payload), or None if the peer closed the connection
+    """
+    frame = _recv_exact(sock, _FRAME.size)
+    if frame is None:
+        return None
+    header_len, payload_len = _FRAME.unpack(frame)
+    if header_len > MAX_HEADER_BYTES or payload_len > MAX_PAYLOAD_BYTES:
+        raise ValueError(f"Oversized message ({header_len}/{payload_len} bytes)")
+
+    header = _recv_exact(sock, header_len)
+    payload = _recv_exact(sock, payload_len) if payload_len else b''
+    if header is None or payload is None:
+        raise ConnectionError("Connection closed mid-message")
+    return json.loads(header), payload
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    """Read exactly size bytes, None on clean EOF before any data"""
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if count == 0:
+            if received == 0:
+                return None
+            raise ConnectionError("Connection closed mid-message")
+        received += count
+    return bytes(buffer)
@@ -0,0 +1,271 @@
+"""
+Fair Request Scheduler
+Weighted fair queueing with strict priority classes and xclbin affinity
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+
+class ArbiterRequest:
+    """A unit of NPU work waiting for or holding the device"""
+
+    def __init__(self,
+                 client: str,
+                 xclbin: Optional[str],
+                 kernel: str,
+                 data: bytes = b'',
+                 params: Optional[Dict[str, Any]] = None,
+                 cost: float = 1.0,
+                 priority: int = 0,
+                 weight: float = 1.0):
+        """
+        Initialize request
+
+        Args:
+            client: Client (flow) name used for fairness accounting
+            xclbin: XCLBIN the kernel lives in
+            kernel: Kernel name
+            data: Input payload
+            params: Backend-specific parameters (e.g. output_size)
+            cost: Estimated service cost, in arbitrary units
+            priority: Priority class (higher is served first)
+            weight: Fair share of the client within its priority class
+        """
+        if cost <= 0 or weight <= 0:
+            raise ValueError("cost and weight must be positive")
+
+        self.client = client
+        self.xclbin = xclbin
+        self.kernel = kernel
+        self.data = data
+        self.params = params or {}
+        self.cost = cost
+        self.priority = priority
+        self.weight = weight
+
+        self.start_tag = 0.0
+        self.finish_tag = 0.0
+        self.enqueued_at = 0.0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+        self.result: Optional[bytes] = None
+        self.error: Optional[str] = None
+        self.done = threading.Event()
+
+    @property
+    def wait_s(self) -> float:
+        """Time spent queued"""
+        return (self.started_at or time.monotonic()) - self.enqueued_at
+
+    @property
+    def service_s(self) -> float:
+        """Time spent on the device"""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+
+class _ClientStats:
+    """Per-client counters and recent wait times"""
+
+    def __init__(self, history: int):
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.queued = 0
+        self.service_s = 0.0
+        self.waits: Deque[float] = deque(maxlen=history)
+
+    def summary(self) -> Dict[str, Any]:
+        waits = sorted(self.waits)
+        return {
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'queued': self.queued,
+            'service_ms': self.service_s * 1000.0,
+            'wait_ms': {
+                'mean': sum(waits) / len(waits) * 1000.0 if waits else 0.0,
+                'p50': waits[len(waits) // 2] * 1000.0 if waits else 0.0,
+                'p95': waits[min(len(waits) - 1, int(0.95 * len(waits)))] * 1000.0 if waits else 0.0,
+                'max': waits[-1] * 1000.0 if waits else 0.0,
+            },
+        }
+
+
+class FairScheduler:
+    """
+    Weighted fair queue over clients, with strict priority classes
+
+    Each request gets start/finish tags in virtual time; the request with
+    the smallest finish tag in the highest non-empty priority class runs
+    next. To avoid xclbin reloads, a request using the currently loaded
+    xclbin may jump ahead if its finish tag is within affinity_window of
+    the fair choice, for at most max_affinity_run consecutive requests.
+    """
+
+    def __init__(self,
+                 affinity_window: float = 2.0,
+                 max_affinity_run: int = 8,
+                 history: int = 1024):
+        """
+        Initialize scheduler
+
+        Args:
+            affinity_window: Virtual-time slack allowed to keep the same xclbin
+            max_affinity_run: Maximum consecutive out-of-order affinity picks
+            history: Wait-time samples kept per client
+        """
+        self.affinity_window = affinity_window
+        self.max_affinity_run = max_affinity_run
+        self.history = history
+
+        self._cond = threading.Condition()
+        self._queues: Dict[int, List[ArbiterRequest]] = {}
+        self._last_finish: Dict[str, float] = {}
+        self._virtual_time = 0.0
+        self._current_xclbin: Optional[str] = None
+        self._affinity_run = 0
+        self._closed = False
+
+        self._clients: Dict[str, _ClientStats] = {}
+        self._dispatched = 0
+        self._affinity_picks = 0
+        self._xclbin_switches = 0
+
+    def submit(self, request: ArbiterRequest) -> ArbiterRequest:
+        """
+        Queue a request
+
+        Args:
+            request: Request to queue
+
+        Returns:
+            The same request (wait on request.done)
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Scheduler closed")
+
+            start = max(self._virtual_time, self._last_finish.get(request.client, 0.0))
+            request.start_tag = start
+            request.finish_tag = start + request.cost / request.weight
+            request.enqueued_at = time.monotonic()
+            self._last_finish[request.client] = request.finish_tag
+
+            self._queues.setdefault(request.priority, []).append(request)
+            stats = self._client(request.client)
+            stats.submitted += 1
+            stats.queued += 1
+            self._cond.notify()
+
+        return request
+
+    def next(self, timeout: Optional[float] = None) -> Optional[ArbiterRequest]:
+        """
+        Take the next request to run
+
+        Args:
+            timeout: Seconds to wait for work (None waits forever)
+
+        Returns:
+            Request, or None on timeout or close
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self._closed and not any(self._queues.values()):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            if self._closed:
+                return None
+
+            priority = max(p for p, queue in self._queues.items() if queue)
+            queue = self._queues[priority]
+            chosen = min(queue, key=lambda r: r.finish_tag)
+            affinity = False
+
+            if chosen.xclbin != self._current_xclbin and self._current_xclbin is not None \
+                    and self._affinity_run < self.max_affinity_run:
+                same = [r for r in queue if r.xclbin == self._current_xclbin]
+                if same:
+                    candidate = min(same, key=lambda r: r.finish_tag)
+                    if candidate.finish_tag <= chosen.finish_tag + self.affinity_window:
+                        chosen = candidate
+                        affinity = True
+
+            queue.remove(chosen)
+            if chosen.xclbin != self._current_xclbin:
+                if self._current_xclbin is not None:
+                    self._xclbin_switches += 1
+                self._current_xclbin = chosen.xclbin
+            # Only an unbroken streak of out-of-order picks counts toward the limit
+            if affinity:
+                self._affinity_run += 1
+                self._affinity_picks += 1
+            else:
+                self._affinity_run = 0
+
+            self._virtual_time = max(self._virtual_time, chosen.start_tag)
+            chosen.started_at = time.monotonic()
+            stats = self._client(chosen.client)
+            stats.queued -= 1
+            stats.waits.append(chosen.wait_s)
+            self._dispatched += 1
+            return chosen
+
+    def complete(self, request: ArbiterRequest,
+                 result: Optional[bytes] = None,
+                 error: Optional[str] = None):
+        """Record the outcome of a request and wake its submitter"""
+        request.finished_at = time.monotonic()
+        request.result = result
+        request.error = error
+        with self._cond:
+            stats = self._client(request.client)
+            stats.service_s += request.service_s
+            if error is None:
+                stats.completed += 1
+            else:
+                stats.failed += 1
+        request.done.set()
+
+    def close(self):
+        """Stop handing out work and fail anything still queued"""
+        with self._cond:
+            self._closed = True
+            pending = [r for queue in self._queues.values() for r in queue]
+            self._queues.clear()
+            for request in pending:
+                self._client(request.client).queued -= 1
+            self._cond.notify_all()
+        for request in pending:
+            self.complete(request, error="Arbiter shutting down")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get scheduler statistics
+
+        Returns:
+            Dictionary with queue depths, per-client wait times and xclbin switches
+        """
+        with self._cond:
+            return {
+                'queue_depth': sum(len(q) for q in self._queues.values()),
+                'queue_depth_by_priority': {str(p): len(q) for p, q in self._queues.items() if q},
+                'dispatched': self._dispatched,
+                'affinity_picks': self._affinity_picks,
+                'xclbin_switches': self._xclbin_switches,
+                'current_xclbin': self._current_xclbin,
+                'virtual_time': self._virtual_time,
+                'clients': {name: s.summary() for name, s in self._clients.items()},
+            }
+
+    def _client(self, name: str) -> _ClientStats:
+        if name not in self._clients:
+            self._clients[name] = _ClientStats(self.history)
+        return self._clients[name]
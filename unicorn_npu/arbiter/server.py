@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+NPU Arbiter Daemon
+Owns the NPU and runs work submitted by local clients over a Unix socket
+"""
+import argparse
+import logging
+import os
+import signal
+import socketserver
+import threading
+from typing import Any, Optional
+
+from .protocol import default_socket_path, recv_message, send_message
+from .scheduler import ArbiterRequest, FairScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class _ConnectionHandler(socketserver.BaseRequestHandler):
+    """Serve requests from one client connection, one at a time"""
+
+    def handle(self):
+        arbiter: ArbiterServer = self.server.arbiter
+        while True:
+            try:
+                message = recv_message(self.request)
+            except (ConnectionError, ValueError) as e:
+                logger.warning(f"⚠️ Dropping arbiter client: {e}")
+                return
+            if message is None:
+                return
+
+            header, payload = message
+            if not isinstance(header, dict):
+                try:
+                    send_message(self.request, {'ok': False,
+                                                'error': "Bad request: header must be a JSON object"})
+                except OSError as e:
+                    logger.warning(f"⚠️ Lost arbiter client: {e}")
+                    return
+                continue
+            op = header.get('op')
+            try:
+                if op == 'submit':
+                    request = arbiter.scheduler.submit(ArbiterRequest(
+                        client=str(header.get('client', 'anonymous')),
+                        xclbin=header.get('xclbin'),
+                        kernel=header['kernel'],
+                        data=payload,
+                        params=header.get('params'),
+                        cost=float(header.get('cost', 1.0)),
+                        priority=int(header.get('priority', 0)),
+                        weight=float(header.get('weight', 1.0))
+                    ))
+                    request.done.wait()
+                    if request.error is not None:
+                        send_message(self.request, {'ok': False, 'error': request.error})
+                    else:
+                        send_message(self.request, {
+                            'ok': True,
+                            'wait_ms': request.wait_s * 1000.0,
+                            'service_ms': request.service_s * 1000.0,
+                        }, request.result or b'')
+                elif op == 'stats':
+                    send_message(self.request, {'ok': True, 'stats': arbiter.get_stats()})
+                elif op == 'ping':
+                    send_message(self.request, {'ok': True})
+                else:
+                    send_message(self.request, {'ok': False, 'error': f"Unknown op: {op}"})
+            except (KeyError, TypeError, ValueError) as e:
+                send_message(self.request, {'ok': False, 'error': f"Bad request: {e}"})
+            except OSError as e:
+                logger.warning(f"⚠️ Lost arbiter client: {e}")
+                return
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class ArbiterServer:
+    """Arbiter daemon: socket server plus a single device dispatcher thread"""
+
+    def __init__(self,
+                 backend: Any,
+                 socket_path: Optional[str] = None,
+                 socket_mode: int = 0o660,
+                 affinity_window: float = 2.0,
+                 max_affinity_run: int = 8):
+        """
+        Initialize arbiter
+
+        Args:
+            backend: SoftwareBackend or XRTBackend (the only device owner)
+            socket_path: Unix socket path (default: default_socket_path())
+            socket_mode: Permissions of the socket file
+            affinity_window: Virtual-time slack allowed to keep the same xclbin
+            max_affinity_run: Maximum consecutive out-of-order affinity picks
+        """
+        self.backend = backend
+        self.socket_path = socket_path or default_socket_path()
+        self.socket_mode = socket_mode
+        self.scheduler = FairScheduler(affinity_window=affinity_window,
+                                       max_affinity_run=max_affinity_run)
+        self._server: Optional[_UnixServer] = None
+        self._threads = []
+
+    def start(self):
+        """Bind the socket and start serving in background threads"""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        os.makedirs(os.path.dirname(self.socket_path) or '.', exist_ok=True)
+
+        # Create the socket with its final permissions; a chmod after bind()
+        # would leave a window where other users could connect
+        umask = os.umask(0o777 & ~self.socket_mode)
+        try:
+            self._server = _UnixServer(self.socket_path, _ConnectionHandler)
+        finally:
+            os.umask(umask)
+        self._server.arbiter = self
+
+        self._threads = [
+            threading.Thread(target=self._dispatch_loop, name='npu-arbiter-dispatch', daemon=True),
+            threading.Thread(target=self._server.serve_forever, name='npu-arbiter-accept',
+                             daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"✅ NPU arbiter listening on {self.socket_path}")
+
+    def serve_forever(self):
+        """Start and block until shutdown()"""
+        self.start()
+        try:
+            for thread in self._threads:
+                thread.join()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        """Stop accepting work, fail queued requests and release the device"""
+        self.scheduler.close()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join()
+        self._threads = []
+        self.backend.close()
+        logger.info("✅ NPU arbiter stopped")
+
+    def get_stats(self):
+        """Scheduler statistics plus backend state"""
+        stats = self.scheduler.get_stats()
+        stats['backend'] = self.backend.get_info()
+        return stats
+
+    def _dispatch_loop(self):
+        """Run requests on the backend one at a time, in scheduler order"""
+        while True:
+            request = self.scheduler.next()
+            if request is None:
+                return
+            try:
+                result = self.backend.execute(request.xclbin, request.kernel,
+                                              request.data, request.params)
+                self.scheduler.complete(request, result=result)
+            except Exception as e:
+                logger.error(f"❌ {request.client}/{request.kernel} failed: {e}")
+                self.scheduler.complete(request, error=str(e))
+
+
+def main():
+    """Run the arbiter daemon"""
+    parser = argparse.ArgumentParser(description="Unicorn NPU arbiter daemon")
+    parser.add_argument('--socket', default=None, help="Unix socket path")
+    parser.add_argument('--backend', choices=['xrt', 'emulator', 'software'], default='xrt')
+    parser.add_argument('--device-index', type=int, default=0)
+    parser.add_argument('--affinity-window', type=float, default=2.0)
+    parser.add_argument('--max-affinity-run', type=int, default=8)
+    parser.add_argument('--max-runners', type=int, default=8,
+                        help="Buffer sets kept per xclbin (xrt/emulator backends)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+
+    def _terminate(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, _terminate)
+
+    if args.backend in ('xrt', 'emulator'):
+        from .backends import XRTBackend
+        backend = XRTBackend(args.device_index, backend=args.backend,
+                             max_runners=args.max_runners)
+    else:
+        from .backends import SoftwareBackend
+        backend = SoftwareBackend()
+
+    ArbiterServer(
+        backend,
+        socket_path=args.socket,
+        affinity_window=args.affinity_window,
+        max_affinity_run=args.max_affinity_run
+    ).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
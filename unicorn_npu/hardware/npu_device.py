@@ -7,23 +7,89 @@ Provides common NPU hardware access for all Unicorn projects
 import os
 import subprocess
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 from pathlib import Path
 
+from ..utils.async_subprocess import run_command_async
+
 logger = logging.getLogger(__name__)
 
+# xrt-smi may be in different locations
+XRT_SMI_PATHS = [
+    '/opt/xilinx/xrt/bin/xrt-smi',
+    '/opt/xilinx/xrt/bin/unwrapped/xrt-smi'
+]
+
 
 class NPUDevice:
     """NPU device detection and management"""
 
-    def __init__(self):
-        """Initialize NPU device"""
+    def __init__(self, detect: bool = True):
+        """
+        Initialize NPU device
+
+        Args:
+            detect: Run detection now. Pass False from async code and
+                    await detect_async() instead to avoid blocking the loop.
+        """
         self.device_path = "/dev/accel/accel0"
         self.device_info = None
-        self.available = self._detect_npu()
+        self.available = self._detect_npu() if detect else False
 
     def _detect_npu(self) -> bool:
         """Detect and validate NPU availability"""
+        direct = self._detect_direct()
+        if direct is not None:
+            return direct
+
+        # Fallback to XRT if available
+        try:
+            result = subprocess.run(
+                ['/opt/xilinx/xrt/bin/xrt-smi', 'examine'],
+                capture_output=True,
+                text=True,
+                timeout=10
+            )
+            return self._handle_examine_result(result)
+
+        except subprocess.TimeoutExpired:
+            logger.error("❌ XRT device detection timeout")
+            return False
+        except FileNotFoundError:
+            logger.warning("⚠️ XRT tools not found")
+            return False
+        except Exception as e:
+            logger.error(f"❌ NPU detection failed: {e}")
+            return False
+
+    async def detect_async(self) -> bool:
+        """Detect NPU availability without blocking the event loop"""
+        direct = self._detect_direct()
+        if direct is not None:
+            self.available = direct
+            return self.available
+
+        try:
+            result = await run_command_async(
+                ['/opt/xilinx/xrt/bin/xrt-smi', 'examine'],
+                timeout=10
+            )
+            self.available = self._handle_examine_result(result)
+
+        except subprocess.TimeoutExpired:
+            logger.error("❌ XRT device detection timeout")
+            self.available = False
+        except FileNotFoundError:
+            logger.warning("⚠️ XRT tools not found")
+            self.available = False
+        except Exception as e:
+            logger.error(f"❌ NPU detection failed: {e}")
+            self.available = False
+
+        return self.available
+
+    def _detect_direct(self) -> Optional[bool]:
+        """Detect NPU via device file, None if the device file is absent"""
         # Try direct device file access first (doesn't require XRT tools)
         if os.path.exists(self.device_path):
             try:
@@ -42,33 +108,18 @@ class NPUDevice:
                 logger.warning(f"⚠️ NPU device exists but not accessible: {e}")
                 return False
 
-        # Fallback to XRT if available
-        try:
-            result = subprocess.run(
-                ['/opt/xilinx/xrt/bin/xrt-smi', 'examine'],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-
-            if result.returncode == 0 and ('NPU Phoenix' in result.stdout or 'RyzenAI' in result.stdout):
-                self.device_info = self._parse_xrt_info(result.stdout)
-                self.device_info['method'] = 'xrt_tools'
-                logger.info(f"✅ NPU Phoenix detected via XRT tools")
-                logger.info(f"Device info: {self.device_info}")
-                return True
-            else:
-                logger.error("❌ NPU Phoenix not detected")
-                return False
+        return None
 
-        except subprocess.TimeoutExpired:
-            logger.error("❌ XRT device detection timeout")
-            return False
-        except FileNotFoundError:
-            logger.warning("⚠️ XRT tools not found")
-            return False
-        except Exception as e:
-            logger.error(f"❌ NPU detection failed: {e}")
+    def _handle_examine_result(self, result: subprocess.CompletedProcess) -> bool:
+        """Validate `xrt-smi examine` output and record device info"""
+        if result.returncode == 0 and ('NPU Phoenix' in result.stdout or 'RyzenAI' in result.stdout):
+            self.device_info = self._parse_xrt_info(result.stdout)
+            self.device_info['method'] = 'xrt_tools'
+            logger.info(f"✅ NPU Phoenix detected via XRT tools")
+            logger.info(f"Device info: {self.device_info}")
+            return True
+        else:
+            logger.error("❌ NPU Phoenix not detected")
             return False
 
     def _parse_xrt_info(self, xrt_output: str) -> Dict[str, Any]:
@@ -111,55 +162,79 @@ class NPUDevice:
             return False
 
         try:
-            # Find xrt-smi (may be in different locations)
-            xrt_smi_paths = [
-                '/opt/xilinx/xrt/bin/xrt-smi',
-                '/opt/xilinx/xrt/bin/unwrapped/xrt-smi'
-            ]
-
-            xrt_smi = None
-            for path in xrt_smi_paths:
-                if os.path.exists(path):
-                    xrt_smi = path
-                    break
-
-            if not xrt_smi:
-                logger.error("❌ xrt-smi not found")
+            command = self._power_mode_command(mode)
+            if command is None:
                 return False
 
-            # Get PCI address if we have it
-            pci_address = self.device_info.get('pci_address', '0000:c7:00.1')
-
             # Set power mode
             result = subprocess.run(
-                ['sudo', xrt_smi, 'configure', '--device', pci_address, '--pmode', mode],
+                command,
                 capture_output=True,
                 text=True,
                 timeout=30
             )
+            return self._handle_power_mode_result(result, mode)
 
-            if result.returncode == 0:
-                logger.info(f"✅ NPU power mode set to: {mode}")
-                return True
-            else:
-                logger.error(f"❌ Failed to set power mode: {result.stderr}")
+        except Exception as e:
+            logger.error(f"❌ Failed to set NPU power mode: {e}")
+            return False
+
+    async def set_power_mode_async(self, mode: str = "performance") -> bool:
+        """Set NPU power mode without blocking the event loop"""
+        if not self.available:
+            logger.error("❌ NPU not available")
+            return False
+
+        try:
+            command = self._power_mode_command(mode)
+            if command is None:
                 return False
 
+            result = await run_command_async(command, timeout=30)
+            return self._handle_power_mode_result(result, mode)
+
         except Exception as e:
             logger.error(f"❌ Failed to set NPU power mode: {e}")
             return False
 
+    def _power_mode_command(self, mode: str) -> Optional[List[str]]:
+        """Build the xrt-smi power mode command, None if xrt-smi is missing"""
+        xrt_smi = self._find_xrt_smi()
+        if not xrt_smi:
+            logger.error("❌ xrt-smi not found")
+            return None
+
+        # Get PCI address if we have it
+        pci_address = self.device_info.get('pci_address', '0000:c7:00.1')
+
+        return ['sudo', xrt_smi, 'configure', '--device', pci_address, '--pmode', mode]
+
+    @staticmethod
+    def _handle_power_mode_result(result: subprocess.CompletedProcess, mode: str) -> bool:
+        """Check the outcome of a power mode change"""
+        if result.returncode == 0:
+            logger.info(f"✅ NPU power mode set to: {mode}")
+            return True
+        else:
+            logger.error(f"❌ Failed to set power mode: {result.stderr}")
+            return False
+
+    @staticmethod
+    def _find_xrt_smi() -> Optional[str]:
+        """Find xrt-smi (may be in different locations)"""
+        for path in XRT_SMI_PATHS:
+            if os.path.exists(path):
+                return path
+        return None
+
     def get_power_state(self) -> Optional[str]:
         """Get current NPU power state"""
         if not self.available:
             return None
 
         try:
-            xrt_smi = '/opt/xilinx/xrt/bin/xrt-smi'
-            if not os.path.exists(xrt_smi):
-                xrt_smi = '/opt/xilinx/xrt/bin/unwrapped/xrt-smi'
-
-            if not os.path.exists(xrt_smi):
+            xrt_smi = self._find_xrt_smi()
+            if not xrt_smi:
                 return None
 
             result = subprocess.run(
@@ -168,18 +243,38 @@ class NPUDevice:
                 text=True,
                 timeout=10
             )
+            return self._parse_power_state(result)
 
-            if result.returncode == 0:
-                # Parse power state from output
-                for line in result.stdout.split('\n'):
-                    if 'Power' in line or 'D0' in line or 'D3' in line:
-                        if 'D0' in line:
-                            return 'D0 (full performance)'
-                        elif 'D3' in line:
-                            return 'D3hot (low power)'
+        except Exception as e:
+            logger.error(f"❌ Failed to get power state: {e}")
+            return None
 
-            return "Unknown"
+    async def get_power_state_async(self) -> Optional[str]:
+        """Get current NPU power state without blocking the event loop"""
+        if not self.available:
+            return None
+
+        try:
+            xrt_smi = self._find_xrt_smi()
+            if not xrt_smi:
+                return None
+
+            result = await run_command_async([xrt_smi, 'examine'], timeout=10)
+            return self._parse_power_state(result)
 
         except Exception as e:
             logger.error(f"❌ Failed to get power state: {e}")
             return None
+
+    @staticmethod
+    def _parse_power_state(result: subprocess.CompletedProcess) -> str:
+        """Parse power state from `xrt-smi examine` output"""
+        if result.returncode == 0:
+            for line in result.stdout.split('\n'):
+                if 'Power' in line or 'D0' in line or 'D3' in line:
+                    if 'D0' in line:
+                        return 'D0 (full performance)'
+                    elif 'D3' in line:
+                        return 'D3hot (low power)'
+
+        return "Unknown"
@@ -9,21 +9,60 @@ import subprocess
 import logging
 from typing import Optional, Dict, Any
 
+from ..utils.async_subprocess import run_command_async
+
 logger = logging.getLogger(__name__)
 
 
 class XRTRuntime:
     """XRT Runtime wrapper for NPU operations"""
 
-    def __init__(self):
-        """Initialize XRT runtime"""
+    XRT_SETUP = "/opt/xilinx/xrt/setup.sh"
+
+    def __init__(self, initialize: bool = True):
+        """
+        Initialize XRT runtime
+
+        Args:
+            initialize: Configure environment and check XRT now. Pass False
+                        from async code and await initialize_async() instead.
+        """
         self.xrt_available = False
-        self._setup_environment()
-        self._check_xrt()
+        if initialize:
+            self._setup_environment()
+            self._check_xrt()
+
+    async def initialize_async(self) -> bool:
+        """Configure environment and check XRT without blocking the event loop"""
+        xrt_setup = self.XRT_SETUP
+
+        if os.path.exists(xrt_setup):
+            try:
+                env_vars = await run_command_async(
+                    ['bash', '-c', f"source {xrt_setup} && env"],
+                    timeout=10
+                )
+                self._apply_environment(env_vars)
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to setup XRT environment: {e}")
+
+        try:
+            result = await run_command_async(
+                ['/opt/xilinx/xrt/bin/xrt-smi', 'version'],
+                timeout=5
+            )
+            self._handle_check_result(result)
+
+        except (FileNotFoundError, subprocess.TimeoutExpired):
+            logger.warning("⚠️ XRT tools not found")
+        except Exception as e:
+            logger.warning(f"⚠️ XRT check failed: {e}")
+
+        return self.xrt_available
 
     def _setup_environment(self):
         """Set up XRT environment variables"""
-        xrt_setup = "/opt/xilinx/xrt/setup.sh"
+        xrt_setup = self.XRT_SETUP
 
         if os.path.exists(xrt_setup):
             try:
@@ -35,18 +74,22 @@ class XRTRuntime:
                     text=True,
                     timeout=10
                 )
-
-                if env_vars.returncode == 0:
-                    for line in env_vars.stdout.split('\n'):
-                        if '=' in line and any(x in line for x in ['XRT', 'XILINX']):
-                            key, value = line.split('=', 1)
-                            os.environ[key] = value
-                    logger.info("✅ XRT environment configured")
-                else:
-                    logger.warning("⚠️ XRT environment setup failed")
+                self._apply_environment(env_vars)
             except Exception as e:
                 logger.warning(f"⚠️ Failed to setup XRT environment: {e}")
 
+    @staticmethod
+    def _apply_environment(env_vars: subprocess.CompletedProcess):
+        """Export XRT variables from a sourced `env` dump"""
+        if env_vars.returncode == 0:
+            for line in env_vars.stdout.split('\n'):
+                if '=' in line and any(x in line for x in ['XRT', 'XILINX']):
+                    key, value = line.split('=', 1)
+                    os.environ[key] = value
+            logger.info("✅ XRT environment configured")
+        else:
+            logger.warning("⚠️ XRT environment setup failed")
+
     def _check_xrt(self):
         """Check if XRT is available"""
         try:
@@ -56,18 +99,21 @@ class XRTRuntime:
                 text=True,
                 timeout=5
             )
-
-            if result.returncode == 0:
-                self.xrt_available = True
-                logger.info("✅ XRT runtime available")
-            else:
-                logger.warning("⚠️ XRT not available")
+            self._handle_check_result(result)
 
         except (FileNotFoundError, subprocess.TimeoutExpired):
             logger.warning("⚠️ XRT tools not found")
         except Exception as e:
             logger.warning(f"⚠️ XRT check failed: {e}")
 
+    def _handle_check_result(self, result: subprocess.CompletedProcess):
+        """Record XRT availability from `xrt-smi version`"""
+        if result.returncode == 0:
+            self.xrt_available = True
+            logger.info("✅ XRT runtime available")
+        else:
+            logger.warning("⚠️ XRT not available")
+
     def is_available(self) -> bool:
         """Check if XRT is available"""
         return self.xrt_available
@@ -84,19 +130,38 @@ class XRTRuntime:
                 text=True,
                 timeout=5
             )
+            return self._parse_version(result)
 
-            if result.returncode == 0:
-                # Parse version from output
-                for line in result.stdout.split('\n'):
-                    if 'Version' in line or 'xrt' in line.lower():
-                        return line.strip()
+        except Exception as e:
+            logger.error(f"❌ Failed to get XRT version: {e}")
+            return None
 
-            return "Unknown"
+    async def get_version_async(self) -> Optional[str]:
+        """Get XRT version without blocking the event loop"""
+        if not self.xrt_available:
+            return None
+
+        try:
+            result = await run_command_async(
+                ['/opt/xilinx/xrt/bin/xrt-smi', 'version'],
+                timeout=5
+            )
+            return self._parse_version(result)
 
         except Exception as e:
             logger.error(f"❌ Failed to get XRT version: {e}")
             return None
 
+    @staticmethod
+    def _parse_version(result: subprocess.CompletedProcess) -> str:
+        """Parse version from `xrt-smi version` output"""
+        if result.returncode == 0:
+            for line in result.stdout.split('\n'):
+                if 'Version' in line or 'xrt' in line.lower():
+                    return line.strip()
+
+        return "Unknown"
+
     def get_device_status(self) -> Optional[Dict[str, Any]]:
         """Get NPU device status via XRT"""
         if not self.xrt_available:
@@ -109,26 +174,46 @@ class XRTRuntime:
                 text=True,
                 timeout=10
             )
+            return self._parse_device_status(result)
 
-            if result.returncode == 0:
-                status = {
-                    'online': True,
-                    'raw_output': result.stdout
-                }
-
-                # Parse key information
-                for line in result.stdout.split('\n'):
-                    if 'Temperature' in line:
-                        status['temperature'] = line.strip()
-                    elif 'Power' in line:
-                        status['power'] = line.strip()
-                    elif 'Firmware' in line:
-                        status['firmware'] = line.strip()
-
-                return status
-            else:
-                return {'online': False, 'error': result.stderr}
+        except Exception as e:
+            logger.error(f"❌ Failed to get device status: {e}")
+            return None
+
+    async def get_device_status_async(self) -> Optional[Dict[str, Any]]:
+        """Get NPU device status without blocking the event loop"""
+        if not self.xrt_available:
+            return None
+
+        try:
+            result = await run_command_async(
+                ['/opt/xilinx/xrt/bin/xrt-smi', 'examine'],
+                timeout=10
+            )
+            return self._parse_device_status(result)
 
         except Exception as e:
             logger.error(f"❌ Failed to get device status: {e}")
             return None
+
+    @staticmethod
+    def _parse_device_status(result: subprocess.CompletedProcess) -> Dict[str, Any]:
+        """Parse `xrt-smi examine` output into a status dictionary"""
+        if result.returncode == 0:
+            status = {
+                'online': True,
+                'raw_output': result.stdout
+            }
+
+            # Parse key information
+            for line in result.stdout.split('\n'):
+                if 'Temperature' in line:
+                    status['temperature'] = line.strip()
+                elif 'Power' in line:
+                    status['power'] = line.strip()
+                elif 'Firmware' in line:
+                    status['firmware'] = line.strip()
+
+            return status
+        else:
+            return {'online': False, 'error': result.stderr}
@@ -1,5 +1,26 @@
 """NPU runtime helpers"""
 
 from .onnx_helpers import ONNXHelper
+from .provider_selection import ProviderSelector
+from .async_inference import AsyncInferenceSession
+from .result_cache import CachedSession
+from .shape_buckets import BucketedSession, suggest_buckets
+from .kv_cache import KVCache, KVBlockPool, PagedKVCache
+from .quantization import INT8Quantizer
+from .kernel_runner import PipelinedKernelRunner
+from .weight_streamer import WeightStreamer
 
-__all__ = ["ONNXHelper"]
+__all__ = [
+    "ONNXHelper",
+    "ProviderSelector",
+    "AsyncInferenceSession",
+    "CachedSession",
+    "BucketedSession",
+    "suggest_buckets",
+    "KVCache",
+    "KVBlockPool",
+    "PagedKVCache",
+    "INT8Quantizer",
+    "PipelinedKernelRunner",
+    "WeightStreamer",
+]
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Async Inference
+Runs ONNX Runtime sessions from asyncio code on a bounded executor
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncInferenceSession:
+    """asyncio wrapper around an InferenceSession with backpressure"""
+
+    def __init__(self, session: Any, max_workers: int = 1, max_pending: int = 4):
+        """
+        Initialize async session
+
+        Args:
+            session: ONNX Runtime InferenceSession (anything with run())
+            max_workers: Threads running session.run concurrently
+            max_pending: Maximum requests admitted (running + queued); further
+                         callers wait for a slot
+        """
+        if max_workers < 1 or max_pending < max_workers:
+            raise ValueError("Need max_workers >= 1 and max_pending >= max_workers")
+
+        self.session = session
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='unicorn-npu-infer')
+        # Created lazily: asyncio primitives bind to the running loop on Python < 3.10
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._stats_lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+
+    async def run(self,
+                  output_names: Optional[List[str]],
+                  input_feed: Dict[str, Any],
+                  timeout: Optional[float] = None) -> List[Any]:
+        """
+        Run inference without blocking the event loop
+
+        Cancelling the caller does not interrupt an inference that has
+        already started; its slot is released when the run finishes.
+
+        Args:
+            output_names: Output names (None for all outputs)
+            input_feed: Input name -> array
+            timeout: Maximum seconds to wait for a free slot (None waits forever)
+
+        Returns:
+            List of output arrays
+
+        Raises:
+            RuntimeError: If no slot became free within the timeout
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout)
+        except asyncio.TimeoutError:
+            with self._stats_lock:
+                self._rejected += 1
+            raise RuntimeError(f"Inference queue full ({self.max_pending} pending)")
+
+        with self._stats_lock:
+            self._in_flight += 1
+
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(self._executor, self.session.run,
+                                          output_names, input_feed)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+
+        # Shield so a cancelled caller leaves the slot held until the run ends
+        return await asyncio.shield(future)
+
+    def _release(self, future: Optional[asyncio.Future]):
+        """Free a slot once the executor has finished a run"""
+        with self._stats_lock:
+            self._in_flight -= 1
+            if future is None or future.cancelled() or future.exception() is not None:
+                self._failed += 1
+            else:
+                self._completed += 1
+        self._slots.release()
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get queue statistics
+
+        Returns:
+            Dictionary with in-flight, completed, failed and rejected counts
+        """
+        with self._stats_lock:
+            return {
+                'in_flight': self._in_flight,
+                'completed': self._completed,
+                'failed': self._failed,
+                'rejected': self._rejected,
+                'max_workers': self.max_workers,
+                'max_pending': self.max_pending,
+            }
+
+    def close(self, wait: bool = True):
+        """Shut down the executor"""
+        self._executor.shutdown(wait=wait)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
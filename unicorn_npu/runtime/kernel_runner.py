@@ -0,0 +1,336 @@
+"""
+Pipelined Kernel Runner
+Overlaps host-to-device DMA, kernel execution and readback across BO sets
+"""
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+# Queue markers
+_DONE = object()
+_STOP = object()
+
+# How often blocked stages re-check for shutdown (seconds)
+_POLL_INTERVAL = 0.05
+
+STAGES = ("h2d", "exec", "d2h")
+
+
+class _PipelineError:
+    """Carries a stage exception to the consuming generator"""
+
+    def __init__(self, stage: str, error: BaseException):
+        self.stage = stage
+        self.error = error
+
+
+class PipelinedKernelRunner:
+    """
+    Run a kernel over a stream of chunks with double-buffered BOs
+
+    Chunk N uses BO set N % num_buffers. The input DMA of chunk N+1 and the
+    readback of chunk N-1 run on their own threads while chunk N executes.
+    Each input BO is reused once its kernel run has finished, and each
+    output BO once it has been read back, so two sets are enough for full
+    three-stage overlap.
+    """
+
+    def __init__(self,
+                 npu,
+                 kernel,
+                 input_size: int,
+                 output_size: int,
+                 num_buffers: int = 2,
+                 input_arg: int = 0,
+                 output_arg: int = 1,
+                 arg_builder: Optional[Callable[..., Sequence]] = None,
+                 output_dtype: str = 'uint8'):
+        """
+        Initialize runner and allocate BO sets
+
+        Args:
+            npu: Open runtime.xrt_wrapper.NPUDevice
+            kernel: Kernel object from NPUDevice.get_kernel()
+            input_size: Input chunk size in bytes
+            output_size: Output chunk size in bytes
+            num_buffers: BO sets to rotate through (2 = ping-pong)
+            input_arg: Kernel argument index of the input BO
+            output_arg: Kernel argument index of the output BO
+            arg_builder: Callable (input_bo, output_bo) -> kernel args
+            output_dtype: NumPy dtype of returned output chunks
+        """
+        if num_buffers < 1:
+            raise ValueError("num_buffers must be >= 1")
+
+        self.npu = npu
+        self.xrt = npu.xrt
+        self.kernel = kernel
+        self.input_size = input_size
+        self.output_size = output_size
+        self.num_buffers = num_buffers
+        self.output_dtype = np.dtype(output_dtype)
+        self.arg_builder = arg_builder or (lambda input_bo, output_bo: (input_bo, output_bo))
+        self.last_stats: Optional[Dict[str, Any]] = None
+
+        input_group = self._group_id(input_arg)
+        output_group = self._group_id(output_arg)
+        self.input_bos = [npu.allocate_bo(input_size, input_group) for _ in range(num_buffers)]
+        self.output_bos = [npu.allocate_bo(output_size, output_group) for _ in range(num_buffers)]
+
+    def _group_id(self, arg_index: int) -> int:
+        """Memory bank for a kernel argument"""
+        if hasattr(self.kernel, 'group_id'):
+            return self.kernel.group_id(arg_index)
+        return 0
+
+    def run(self, chunk: Any) -> np.ndarray:
+        """
+        Run one chunk through the kernel (no overlap)
+
+        Args:
+            chunk: Input bytes or array (at most input_size bytes)
+
+        Returns:
+            Output chunk
+        """
+        return self.run_all([chunk], pipelined=False)[0]
+
+    def run_all(self, chunks: Iterable[Any], pipelined: bool = True) -> List[np.ndarray]:
+        """
+        Run all chunks and collect outputs in order
+
+        Args:
+            chunks: Input chunks
+            pipelined: Overlap stages (False runs them back to back)
+
+        Returns:
+            List of output chunks
+        """
+        return list(self.stream(chunks, pipelined=pipelined))
+
+    def stream(self, chunks: Iterable[Any], pipelined: bool = True) -> Iterator[np.ndarray]:
+        """
+        Stream chunks through the kernel, yielding outputs in order
+
+        Statistics for the stream are available from get_stats() once the
+        generator is exhausted or closed.
+
+        Args:
+            chunks: Input chunks (consumed lazily)
+            pipelined: Overlap stages (False runs them back to back)
+
+        Yields:
+            Output chunks
+        """
+        if pipelined:
+            return self._stream_pipelined(chunks)
+        return self._stream_serial(chunks)
+
+    def get_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        Get timings of the last stream
+
+        Returns:
+            Dictionary with per-stage timings, wall time and achieved overlap
+        """
+        return self.last_stats
+
+    def close(self):
+        """Release the runner's BOs"""
+        self.input_bos = []
+        self.output_bos = []
+
+    # Stages
+
+    def _h2d(self, index: int, chunk: Any):
+        """Copy a chunk into an input BO and sync it to the device"""
+        if isinstance(chunk, np.ndarray):
+            chunk = np.ascontiguousarray(chunk)
+        payload = memoryview(chunk).cast('B')
+        if payload.nbytes > self.input_size:
+            raise ValueError(f"Chunk of {payload.nbytes} bytes exceeds "
+                             f"input_size {self.input_size}")
+        bo = self.input_bos[index]
+        bo.write(payload, 0)
+        bo.sync(self.xrt.xclBOSyncDirection.XCL_BO_SYNC_BO_TO_DEVICE, payload.nbytes, 0)
+
+    def _exec(self, index: int):
+        """Run the kernel on a BO set and wait for completion"""
+        run = self.kernel(*self.arg_builder(self.input_bos[index], self.output_bos[index]))
+        run.wait()
+
+    def _d2h(self, index: int) -> np.ndarray:
+        """Sync an output BO from the device and copy it out"""
+        bo = self.output_bos[index]
+        bo.sync(self.xrt.xclBOSyncDirection.XCL_BO_SYNC_BO_FROM_DEVICE, self.output_size, 0)
+        return np.frombuffer(bo.read(self.output_size, 0), dtype=self.output_dtype).copy()
+
+    # Drivers
+
+    def _stream_serial(self, chunks: Iterable[Any]) -> Iterator[np.ndarray]:
+        """Run stages back to back on BO set 0"""
+        timings = {stage: [] for stage in STAGES}
+        start = time.perf_counter()
+        try:
+            for chunk in chunks:
+                t0 = time.perf_counter()
+                self._h2d(0, chunk)
+                t1 = time.perf_counter()
+                self._exec(0)
+                t2 = time.perf_counter()
+                output = self._d2h(0)
+                t3 = time.perf_counter()
+                timings['h2d'].append(t1 - t0)
+                timings['exec'].append(t2 - t1)
+                timings['d2h'].append(t3 - t2)
+                yield output
+        finally:
+            self.last_stats = self._summarize(timings, time.perf_counter() - start, False)
+
+    def _stream_pipelined(self, chunks: Iterable[Any]) -> Iterator[np.ndarray]:
+        """Run stages on three threads connected by queues"""
+        n = self.num_buffers
+        stop = threading.Event()
+        input_free = [threading.Semaphore(1) for _ in range(n)]
+        output_free = [threading.Semaphore(1) for _ in range(n)]
+        result_slots = threading.Semaphore(n)
+        exec_queue: queue.Queue = queue.Queue()
+        d2h_queue: queue.Queue = queue.Queue()
+        results: queue.Queue = queue.Queue()
+        timings = {stage: [] for stage in STAGES}
+
+        def fail(stage: str, error: BaseException):
+            results.put(_PipelineError(stage, error))
+            stop.set()
+
+        def h2d_worker():
+            try:
+                for seq, chunk in enumerate(chunks):
+                    index = seq % n
+                    if not self._acquire(input_free[index], stop):
+                        return
+                    t0 = time.perf_counter()
+                    self._h2d(index, chunk)
+                    timings['h2d'].append(time.perf_counter() - t0)
+                    exec_queue.put(index)
+                exec_queue.put(_DONE)
+            except BaseException as e:
+                fail('h2d', e)
+
+        def exec_worker():
+            try:
+                while True:
+                    index = self._get(exec_queue, stop)
+                    if index is _STOP:
+                        return
+                    if index is _DONE:
+                        d2h_queue.put(_DONE)
+                        return
+                    if not self._acquire(output_free[index], stop):
+                        return
+                    t0 = time.perf_counter()
+                    self._exec(index)
+                    timings['exec'].append(time.perf_counter() - t0)
+                    input_free[index].release()
+                    d2h_queue.put(index)
+            except BaseException as e:
+                fail('exec', e)
+
+        def d2h_worker():
+            try:
+                while True:
+                    index = self._get(d2h_queue, stop)
+                    if index is _STOP:
+                        return
+                    if index is _DONE:
+                        results.put(_DONE)
+                        return
+                    if not self._acquire(result_slots, stop):
+                        return
+                    t0 = time.perf_counter()
+                    output = self._d2h(index)
+                    timings['d2h'].append(time.perf_counter() - t0)
+                    output_free[index].release()
+                    results.put(output)
+            except BaseException as e:
+                fail('d2h', e)
+
+        workers = [
+            threading.Thread(target=h2d_worker, name='npu-h2d', daemon=True),
+            threading.Thread(target=exec_worker, name='npu-exec', daemon=True),
+            threading.Thread(target=d2h_worker, name='npu-d2h', daemon=True),
+        ]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+
+        try:
+            while True:
+                item = results.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, _PipelineError):
+                    raise RuntimeError(f"Pipeline {item.stage} stage failed: "
+                                       f"{item.error}") from item.error
+                result_slots.release()
+                yield item
+        finally:
+            wall = time.perf_counter() - start
+            stop.set()
+            h2d, others = workers[0], workers[1:]
+            for worker in others:
+                worker.join()
+            # The h2d thread may be blocked inside the caller's iterator (e.g. a
+            # live source waiting for data); it exits on its own once the next
+            # chunk arrives, since stop is set, so don't wait on it indefinitely
+            h2d.join(timeout=_POLL_INTERVAL * 4)
+            self.last_stats = self._summarize(timings, wall, True)
+
+    @staticmethod
+    def _acquire(semaphore: threading.Semaphore, stop: threading.Event) -> bool:
+        """Acquire a semaphore unless the pipeline is stopping"""
+        while not stop.is_set():
+            if semaphore.acquire(timeout=_POLL_INTERVAL):
+                return True
+        return False
+
+    @staticmethod
+    def _get(source: queue.Queue, stop: threading.Event) -> Any:
+        """Get from a queue unless the pipeline is stopping"""
+        while True:
+            try:
+                return source.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                if stop.is_set():
+                    return _STOP
+
+    def _summarize(self, timings: Dict[str, List[float]], wall: float,
+                   pipelined: bool) -> Dict[str, Any]:
+        """Build stream statistics"""
+        stats: Dict[str, Any] = {
+            'pipelined': pipelined,
+            'num_buffers': self.num_buffers if pipelined else 1,
+            'chunks': len(timings['d2h']),
+            'wall_ms': wall * 1000.0,
+            'stages': {},
+        }
+        serial = 0.0
+        for stage in STAGES:
+            samples = timings[stage]
+            total = sum(samples)
+            serial += total
+            stats['stages'][stage] = {
+                'count': len(samples),
+                'total_ms': total * 1000.0,
+                'mean_ms': (total / len(samples) * 1000.0) if samples else 0.0,
+                'max_ms': max(samples) * 1000.0 if samples else 0.0,
+            }
+
+        # Fraction of stage time hidden behind other stages
+        stats['serial_ms'] = serial * 1000.0
+        stats['overlap'] = max(0.0, 1.0 - wall / serial) if serial > 0 else 0.0
+        stats['speedup'] = serial / wall if wall > 0 else 0.0
+        return stats
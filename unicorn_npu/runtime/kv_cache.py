@@ -0,0 +1,609 @@
+#!/usr/bin/env python3
+"""
+KV-Cache Management
+Preallocated and paged past/present key-value buffers for decoder inference
+"""
+
+import re
+import logging
+import threading
+from typing import List, Optional, Dict, Any, Sequence
+
+import numpy as np
+
+from .onnx_types import ONNX_TYPE_TO_DTYPE
+
+logger = logging.getLogger(__name__)
+
+
+class _KVEntry:
+    """One past input / present output pair of a decoder session"""
+
+    def __init__(self, past_name: str, present_name: Optional[str], shape: List[Any],
+                 dtype: np.dtype, batch_axis: int, seq_axis: int, static: bool):
+        self.past_name = past_name
+        self.present_name = present_name
+        self.shape = shape
+        self.dtype = dtype
+        self.batch_axis = batch_axis
+        self.seq_axis = seq_axis
+        self.static = static
+
+    def concrete_shape(self, batch_size: int, length: int) -> tuple:
+        shape = list(self.shape)
+        shape[self.batch_axis] = batch_size
+        shape[self.seq_axis] = length
+        return tuple(shape)
+
+    @property
+    def row_seq_axis(self) -> int:
+        """Sequence axis once the batch axis is removed"""
+        return self.seq_axis - (1 if self.seq_axis > self.batch_axis else 0)
+
+    def per_token_elements(self) -> int:
+        """Elements per sequence position of one batch row"""
+        count = 1
+        for axis, dim in enumerate(self.shape):
+            if axis not in (self.batch_axis, self.seq_axis):
+                count *= dim
+        return count
+
+
+def _row(array: np.ndarray, axis: int, row: int) -> np.ndarray:
+    """View of one batch row (batch axis removed)"""
+    return array[(slice(None),) * axis + (row,)]
+
+
+def discover_kv_entries(session: Any,
+                        past_pattern: str = r'^past_key_values\.',
+                        present_prefix: str = 'present.',
+                        static_pattern: Optional[str] = r'\.encoder\.',
+                        batch_axis: int = 0,
+                        seq_axis: int = 2,
+                        dim_values: Optional[Dict[int, int]] = None) -> List[_KVEntry]:
+    """
+    Find the past/present KV pairs of a decoder session
+
+    Present outputs are matched by replacing the past pattern with
+    present_prefix (past_key_values.0.key -> present.0.key). Entries whose
+    name matches static_pattern (Whisper cross-attention) never grow.
+
+    Args:
+        session: InferenceSession of a decoder with past inputs
+        past_pattern: Regex matching past KV input names
+        present_prefix: Replacement for the matched past prefix
+        static_pattern: Regex for constant entries (None: none are static)
+        batch_axis: Batch (beam) axis of KV tensors
+        seq_axis: Sequence axis of KV tensors
+        dim_values: Values for symbolic dims other than batch and sequence
+                    (axis -> size), e.g. {1: num_heads, 3: head_dim}
+
+    Returns:
+        List of KV entries
+    """
+    outputs = {node.name for node in session.get_outputs()}
+    entries = []
+    for node in session.get_inputs():
+        match = re.search(past_pattern, node.name)
+        if not match:
+            continue
+        present = node.name[:match.start()] + present_prefix + node.name[match.end():]
+        shape = list(node.shape)
+        for axis, dim in enumerate(shape):
+            if axis in (batch_axis, seq_axis):
+                continue
+            if not isinstance(dim, int) or dim <= 0:
+                if not dim_values or axis not in dim_values:
+                    raise ValueError(f"{node.name} has symbolic dim {dim!r} at axis {axis}; "
+                                     "pass its size through dim_values")
+                shape[axis] = dim_values[axis]
+        entries.append(_KVEntry(
+            node.name,
+            present if present in outputs else None,
+            shape,
+            np.dtype(ONNX_TYPE_TO_DTYPE.get(node.type, 'float32')),
+            batch_axis,
+            seq_axis,
+            bool(static_pattern and re.search(static_pattern, node.name))
+        ))
+
+    if not any(not e.static and e.present_name for e in entries):
+        raise ValueError("No growing past/present KV pairs found in session")
+    return entries
+
+
+class KVCache:
+    """
+    Preallocated KV cache bound in place through IO binding
+
+    Each growing entry owns two flat buffers sized for max_length. A step
+    binds the first buffer's prefix as the past input and the second's as
+    the present output, so ONNX Runtime writes the new cache directly into
+    preallocated memory; the buffers then swap roles. No per-step
+    allocation or host-side concatenation takes place.
+
+    Beam reordering copies only the rows whose parent beam changed; for
+    copy-free reordering and shared prefixes use PagedKVCache.
+    """
+
+    def __init__(self,
+                 session: Any,
+                 batch_size: int,
+                 max_length: int,
+                 tokens_input: str = 'input_ids',
+                 **discover_kwargs):
+        """
+        Initialize KV cache
+
+        Args:
+            session: Decoder InferenceSession with past inputs / present outputs
+            batch_size: Batch rows (beams) held by the cache
+            max_length: Maximum sequence length
+            tokens_input: Input whose last dim is the number of new tokens
+            **discover_kwargs: Options for discover_kv_entries()
+        """
+        self.session = session
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.tokens_input = tokens_input
+        self.entries = discover_kv_entries(session, **discover_kwargs)
+        self.length = 0
+
+        self._buffers: Dict[str, List[np.ndarray]] = {}
+        self._static: Dict[str, np.ndarray] = {}
+        self._current = 0
+        for entry in self.entries:
+            if entry.static:
+                continue
+            size = batch_size * max_length * entry.per_token_elements()
+            self._buffers[entry.past_name] = [np.zeros(size, dtype=entry.dtype),
+                                              np.zeros(size, dtype=entry.dtype)]
+
+        self._binding = session.io_binding()
+        self._stats = {'steps': 0, 'reorders': 0, 'tokens': 0}
+
+    def view(self, name: str, length: Optional[int] = None, slot: Optional[int] = None) -> np.ndarray:
+        """
+        Get the cache of one entry as a tensor (no copy)
+
+        Args:
+            name: Past input name
+            length: Sequence length of the view (default: current length)
+            slot: Buffer index (default: the one holding the current cache)
+
+        Returns:
+            Array shaped like the past input
+        """
+        entry = next(e for e in self.entries if e.past_name == name)
+        length = self.length if length is None else length
+        slot = self._current if slot is None else slot
+        shape = entry.concrete_shape(self.batch_size, length)
+        flat = self._buffers[name][slot]
+        return flat[:int(np.prod(shape))].reshape(shape)
+
+    def reset(self):
+        """Start a new sequence"""
+        self.length = 0
+
+    def load(self, past: Dict[str, np.ndarray]):
+        """
+        Seed the cache, e.g. from a decoder run without past
+
+        Args:
+            past: Past input name (or matching present name) -> array
+        """
+        lengths = set()
+        for entry in self.entries:
+            value = past.get(entry.past_name)
+            if value is None and entry.present_name:
+                value = past.get(entry.present_name)
+            if value is None:
+                continue
+            if entry.static:
+                self._static[entry.past_name] = np.ascontiguousarray(value, dtype=entry.dtype)
+                continue
+            length = value.shape[entry.seq_axis]
+            if length > self.max_length:
+                raise ValueError(f"Cache of length {length} exceeds max_length {self.max_length}")
+            lengths.add(length)
+            self.view(entry.past_name, length, self._current)[...] = value
+        if len(lengths) > 1:
+            raise ValueError(f"Inconsistent cache lengths: {sorted(lengths)}")
+        if lengths:
+            self.length = lengths.pop()
+
+    def run(self, input_feed: Dict[str, np.ndarray],
+            output_names: Optional[List[str]] = None) -> List[np.ndarray]:
+        """
+        Run one decode step with the cache bound in place
+
+        Args:
+            input_feed: Non-cache inputs (input_ids, masks, encoder states, ...)
+            output_names: Outputs to return (default: all non-cache outputs)
+
+        Returns:
+            Requested outputs
+        """
+        new_tokens = input_feed[self.tokens_input].shape[-1]
+        total = self.length + new_tokens
+        if total > self.max_length:
+            raise ValueError(f"Sequence length {total} exceeds max_length {self.max_length}")
+
+        present_names = {e.present_name for e in self.entries if e.present_name}
+        if output_names is None:
+            output_names = [o.name for o in self.session.get_outputs()
+                            if o.name not in present_names]
+
+        binding = self._binding
+        binding.clear_binding_inputs()
+        binding.clear_binding_outputs()
+        for name, value in input_feed.items():
+            binding.bind_cpu_input(name, value)
+        for name in output_names:
+            binding.bind_output(name)
+
+        target = 1 - self._current
+        for entry in self.entries:
+            if entry.static:
+                if entry.past_name not in self._static:
+                    raise RuntimeError(f"Static cache entry {entry.past_name} not loaded")
+                binding.bind_cpu_input(entry.past_name, self._static[entry.past_name])
+                continue
+            binding.bind_cpu_input(entry.past_name, self.view(entry.past_name))
+            present = self.view(entry.past_name, total, target)
+            binding.bind_output(entry.present_name, 'cpu', 0, entry.dtype,
+                                list(present.shape), present.ctypes.data)
+
+        self.session.run_with_iobinding(binding)
+        outputs = [value.numpy() for value in binding.get_outputs()[:len(output_names)]]
+
+        self._current = target
+        self.length = total
+        self._stats['steps'] += 1
+        self._stats['tokens'] += new_tokens * self.batch_size
+        return outputs
+
+    def reorder(self, beam_indices: Sequence[int]):
+        """
+        Reorder batch rows after a beam search step
+
+        Args:
+            beam_indices: For each row, the row it continues from
+        """
+        indices = np.asarray(beam_indices, dtype=np.int64)
+        if indices.shape != (self.batch_size,):
+            raise ValueError(f"Expected {self.batch_size} beam indices")
+        if indices.min() < 0 or indices.max() >= self.batch_size:
+            raise IndexError(f"Beam indices out of range [0, {self.batch_size})")
+        # Rows continuing their own beam stay in place; only the others are copied
+        changed = np.flatnonzero(indices != np.arange(self.batch_size))
+        if len(changed) == 0:
+            return
+        sources = indices[changed]
+        for entry in self.entries:
+            if entry.static:
+                continue
+            cache = np.moveaxis(self.view(entry.past_name), entry.batch_axis, 0)
+            cache[changed] = cache[sources]
+        self._stats['reorders'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with reserved/used bytes, length, steps and reorders
+        """
+        reserved = sum(b.nbytes for pair in self._buffers.values() for b in pair)
+        used = sum(self.view(name).nbytes for name in self._buffers)
+        stats = dict(self._stats)
+        stats.update({
+            'length': self.length,
+            'max_length': self.max_length,
+            'reserved_bytes': reserved,
+            'used_bytes': used,
+            'static_bytes': sum(a.nbytes for a in self._static.values()),
+        })
+        return stats
+
+
+class KVBlockPool:
+    """
+    Fixed pool of KV blocks shared by many sequences
+
+    Storage per entry is [num_blocks, *entry_dims, block_size, ...] with the
+    sequence axis holding block_size positions. Blocks are reference
+    counted so forked beams share their common prefix.
+    """
+
+    def __init__(self, entries: List[_KVEntry], num_blocks: int, block_size: int = 16):
+        """
+        Initialize block pool
+
+        Args:
+            entries: KV entries (from discover_kv_entries); static entries are skipped
+            num_blocks: Blocks in the pool
+            block_size: Sequence positions per block
+        """
+        self.entries = [e for e in entries if not e.static]
+        self.num_blocks = num_blocks
+        self.block_size = block_size
+        self.storage: Dict[str, np.ndarray] = {}
+        for entry in self.entries:
+            # Block shape: the entry shape with batch=1 dropped and seq=block_size
+            shape = list(entry.concrete_shape(1, block_size))
+            del shape[entry.batch_axis]
+            self.storage[entry.past_name] = np.zeros([num_blocks] + shape, dtype=entry.dtype)
+
+        self._lock = threading.Lock()
+        self._free = list(range(num_blocks - 1, -1, -1))
+        self._refcount = [0] * num_blocks
+        self._peak_used = 0
+        self._copy_on_write = 0
+
+    @classmethod
+    def for_session(cls, session: Any, num_blocks: int, block_size: int = 16,
+                    **discover_kwargs) -> "KVBlockPool":
+        """Create a pool matching a decoder session's KV inputs"""
+        return cls(discover_kv_entries(session, **discover_kwargs), num_blocks, block_size)
+
+    def allocate(self) -> int:
+        with self._lock:
+            if not self._free:
+                raise MemoryError(f"KV block pool exhausted ({self.num_blocks} blocks)")
+            block = self._free.pop()
+            self._refcount[block] = 1
+            self._peak_used = max(self._peak_used, self.num_blocks - len(self._free))
+            return block
+
+    def retain(self, block: int):
+        with self._lock:
+            self._refcount[block] += 1
+
+    def release(self, block: int):
+        with self._lock:
+            self._refcount[block] -= 1
+            if self._refcount[block] == 0:
+                self._free.append(block)
+
+    def is_shared(self, block: int) -> bool:
+        return self._refcount[block] > 1
+
+    def copy_block(self, block: int, positions: int) -> int:
+        """Copy-on-write: duplicate the first positions of a shared block"""
+        new_block = self.allocate()
+        for entry in self.entries:
+            storage = self.storage[entry.past_name]
+            axis = entry.row_seq_axis
+            index = [slice(None)] * (storage.ndim - 1)
+            index[axis] = slice(0, positions)
+            storage[new_block][tuple(index)] = storage[block][tuple(index)]
+        self.release(block)
+        with self._lock:
+            self._copy_on_write += 1
+        return new_block
+
+    def get_stats(self) -> Dict[str, Any]:
+        block_bytes = sum(s[0].nbytes for s in self.storage.values())
+        with self._lock:
+            used = self.num_blocks - len(self._free)
+            return {
+                'num_blocks': self.num_blocks,
+                'block_size': self.block_size,
+                'used_blocks': used,
+                'peak_used_blocks': self._peak_used,
+                'block_bytes': block_bytes,
+                'reserved_bytes': block_bytes * self.num_blocks,
+                'used_bytes': block_bytes * used,
+                'copy_on_write': self._copy_on_write,
+            }
+
+
+class PagedSequence:
+    """A sequence's KV cache as a table of pool blocks"""
+
+    def __init__(self, pool: KVBlockPool):
+        self.pool = pool
+        self.blocks: List[int] = []
+        self.length = 0
+
+    def fork(self) -> "PagedSequence":
+        """Share this sequence's blocks with a new sequence (no KV copy)"""
+        child = PagedSequence(self.pool)
+        child.blocks = list(self.blocks)
+        child.length = self.length
+        for block in self.blocks:
+            self.pool.retain(block)
+        return child
+
+    def free(self):
+        """Return this sequence's blocks to the pool"""
+        for block in self.blocks:
+            self.pool.release(block)
+        self.blocks = []
+        self.length = 0
+
+    def append(self, values: Dict[str, np.ndarray]):
+        """
+        Append new positions
+
+        Args:
+            values: Past name -> array shaped like one batch row of the cache
+                    (batch axis removed) holding only the new positions
+        """
+        pool = self.pool
+        entry0 = pool.entries[0]
+        axis0 = entry0.row_seq_axis
+        count = values[entry0.past_name].shape[axis0]
+
+        written = 0
+        while written < count:
+            offset = self.length % pool.block_size
+            if offset == 0:
+                self.blocks.append(pool.allocate())
+            elif pool.is_shared(self.blocks[-1]):
+                self.blocks[-1] = pool.copy_block(self.blocks[-1], offset)
+            take = min(pool.block_size - offset, count - written)
+            block = self.blocks[-1]
+            for entry in pool.entries:
+                axis = entry.row_seq_axis
+                dst = [slice(None)] * (pool.storage[entry.past_name].ndim - 1)
+                src = [slice(None)] * len(dst)
+                dst[axis] = slice(offset, offset + take)
+                src[axis] = slice(written, written + take)
+                pool.storage[entry.past_name][block][tuple(dst)] = values[entry.past_name][tuple(src)]
+            written += take
+            self.length += take
+
+    def gather(self, name: str, out: np.ndarray):
+        """
+        Copy this sequence's cache for one entry into a contiguous row
+
+        Args:
+            name: Past input name
+            out: Destination shaped like one batch row with seq = self.length
+        """
+        pool = self.pool
+        entry = next(e for e in pool.entries if e.past_name == name)
+        axis = entry.row_seq_axis
+        storage = pool.storage[name]
+        for i, block in enumerate(self.blocks):
+            start = i * pool.block_size
+            take = min(pool.block_size, self.length - start)
+            dst = [slice(None)] * out.ndim
+            src = [slice(None)] * out.ndim
+            dst[axis] = slice(start, start + take)
+            src[axis] = slice(0, take)
+            out[tuple(dst)] = storage[block][tuple(src)]
+
+
+def reorder_beams(sequences: List[PagedSequence], beam_indices: Sequence[int]) -> List[PagedSequence]:
+    """
+    Reorder beams by sharing block tables instead of copying KV data
+
+    Args:
+        sequences: Current beams
+        beam_indices: For each new beam, the beam it continues from
+
+    Returns:
+        New beam list (the old sequences are freed)
+    """
+    reordered = [sequences[i].fork() for i in beam_indices]
+    for sequence in sequences:
+        sequence.free()
+    return reordered
+
+
+class PagedKVCache:
+    """
+    Run a decoder over PagedSequences sharing one KVBlockPool
+
+    Each step gathers the batch's blocks into a preallocated contiguous
+    staging buffer, runs the session with the present output bound to a
+    second staging buffer, and appends the new positions back to the
+    sequences' blocks. Memory is committed per block actually used rather
+    than per max_length, and beams share common prefixes.
+    """
+
+    def __init__(self,
+                 session: Any,
+                 pool: KVBlockPool,
+                 max_batch: int,
+                 max_length: int,
+                 tokens_input: str = 'input_ids',
+                 static: Optional[Dict[str, np.ndarray]] = None):
+        """
+        Initialize paged cache runner
+
+        Args:
+            session: Decoder InferenceSession
+            pool: Block pool created for this session
+            max_batch: Maximum sequences per step
+            max_length: Maximum sequence length
+            tokens_input: Input whose last dim is the number of new tokens
+            static: Static entries (e.g. cross-attention KV) by past name
+        """
+        self.session = session
+        self.pool = pool
+        self.max_batch = max_batch
+        self.max_length = max_length
+        self.tokens_input = tokens_input
+        self.static = static or {}
+        self._staging = {
+            e.past_name: [np.zeros(max_batch * max_length * e.per_token_elements(), dtype=e.dtype)
+                          for _ in range(2)]
+            for e in pool.entries
+        }
+        self._binding = session.io_binding()
+
+    def new_sequence(self) -> PagedSequence:
+        return PagedSequence(self.pool)
+
+    def _staging_view(self, entry: _KVEntry, slot: int, batch: int, length: int) -> np.ndarray:
+        shape = entry.concrete_shape(batch, length)
+        return self._staging[entry.past_name][slot][:int(np.prod(shape))].reshape(shape)
+
+    def run(self, sequences: List[PagedSequence], input_feed: Dict[str, np.ndarray],
+            output_names: Optional[List[str]] = None) -> List[np.ndarray]:
+        """
+        Run one decode step for a batch of equal-length sequences
+
+        Args:
+            sequences: One PagedSequence per batch row
+            input_feed: Non-cache inputs for the batch
+            output_names: Outputs to return (default: all non-cache outputs)
+
+        Returns:
+            Requested outputs
+        """
+        batch = len(sequences)
+        lengths = {s.length for s in sequences}
+        if batch > self.max_batch or len(lengths) != 1:
+            raise ValueError("Need at most max_batch sequences of equal length")
+        length = lengths.pop()
+        new_tokens = input_feed[self.tokens_input].shape[-1]
+        total = length + new_tokens
+        if total > self.max_length:
+            raise ValueError(f"Sequence length {total} exceeds max_length {self.max_length}")
+
+        present_names = {e.present_name for e in self.pool.entries if e.present_name}
+        if output_names is None:
+            output_names = [o.name for o in self.session.get_outputs()
+                            if o.name not in present_names]
+
+        binding = self._binding
+        binding.clear_binding_inputs()
+        binding.clear_binding_outputs()
+        for name, value in input_feed.items():
+            binding.bind_cpu_input(name, value)
+        for name, value in self.static.items():
+            binding.bind_cpu_input(name, value)
+        for name in output_names:
+            binding.bind_output(name)
+
+        presents = {}
+        for entry in self.pool.entries:
+            past = self._staging_view(entry, 0, batch, length)
+            for row, sequence in enumerate(sequences):
+                sequence.gather(entry.past_name, _row(past, entry.batch_axis, row))
+            binding.bind_cpu_input(entry.past_name, past)
+            present = self._staging_view(entry, 1, batch, total)
+            binding.bind_output(entry.present_name, 'cpu', 0, entry.dtype,
+                                list(present.shape), present.ctypes.data)
+            presents[entry.past_name] = present
+
+        self.session.run_with_iobinding(binding)
+        outputs = [value.numpy() for value in binding.get_outputs()[:len(output_names)]]
+
+        for row, sequence in enumerate(sequences):
+            new = {}
+            for entry in self.pool.entries:
+                present = presents[entry.past_name]
+                row_view = _row(present, entry.batch_axis, row)
+                axis = entry.row_seq_axis
+                index = [slice(None)] * row_view.ndim
+                index[axis] = slice(length, total)
+                new[entry.past_name] = row_view[tuple(index)]
+            sequence.append(new)
+
+        return outputs
@@ -0,0 +1,387 @@
+"""
+Software NPU Emulator
+Implements the subset of the pyxrt API used by runtime.xrt_wrapper on the CPU
+
+Select it with NPUDevice(backend="emulator") or UNICORN_NPU_BACKEND=emulator.
+Kernels are NumPy functions registered by name; a configurable performance
+model charges DMA, launch and compute time on per-device engine timelines
+so scheduling and pipelining code sees realistic overlap and contention.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from enum import Enum
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+
+class PerformanceModel:
+    """Timing model for emulated DMA, kernel launch and compute"""
+
+    def __init__(self,
+                 dma_bandwidth_gbps: float = 8.0,
+                 dma_latency_us: float = 5.0,
+                 launch_overhead_us: float = 20.0,
+                 compute_gops: float = 16000.0,
+                 xclbin_load_ms: float = 50.0,
+                 full_duplex_dma: bool = True,
+                 time_scale: float = 1.0):
+        """
+        Initialize performance model
+
+        Args:
+            dma_bandwidth_gbps: Host <-> device bandwidth in GB/s per direction
+            dma_latency_us: Fixed cost per BO sync
+            launch_overhead_us: Fixed cost per kernel run
+            compute_gops: Kernel throughput in giga-ops/s (Phoenix: ~16 INT8 TOPS)
+            xclbin_load_ms: Cost of loading an xclbin
+            full_duplex_dma: H2D and D2H transfers may overlap
+            time_scale: Multiplier on all modeled times (0 disables waiting)
+        """
+        self.dma_bandwidth_gbps = dma_bandwidth_gbps
+        self.dma_latency_us = dma_latency_us
+        self.launch_overhead_us = launch_overhead_us
+        self.compute_gops = compute_gops
+        self.xclbin_load_ms = xclbin_load_ms
+        self.full_duplex_dma = full_duplex_dma
+        self.time_scale = time_scale
+
+    @classmethod
+    def from_env(cls) -> "PerformanceModel":
+        """
+        Build a model from UNICORN_NPU_EMULATOR_MODEL
+
+        The variable holds a JSON object of constructor arguments, or a
+        path to a file containing one.
+        """
+        spec = os.environ.get('UNICORN_NPU_EMULATOR_MODEL', '').strip()
+        if not spec:
+            return cls()
+        if not spec.startswith('{'):
+            with open(spec) as f:
+                spec = f.read()
+        return cls(**json.loads(spec))
+
+    def dma_seconds(self, size: int) -> float:
+        return (self.dma_latency_us * 1e-6 + size / (self.dma_bandwidth_gbps * 1e9)) * self.time_scale
+
+    def kernel_seconds(self, ops: float) -> float:
+        return (self.launch_overhead_us * 1e-6 + ops / (self.compute_gops * 1e9)) * self.time_scale
+
+    def load_seconds(self) -> float:
+        return self.xclbin_load_ms * 1e-3 * self.time_scale
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+
+_model = PerformanceModel.from_env()
+
+
+def configure(model: Optional[PerformanceModel] = None, **kwargs) -> PerformanceModel:
+    """
+    Set the performance model used by devices opened afterwards
+
+    Args:
+        model: Complete model, or None to update the current one
+        **kwargs: PerformanceModel fields to override
+
+    Returns:
+        The active model
+    """
+    global _model
+    base = model or _model
+    _model = PerformanceModel(**{**base.to_dict(), **kwargs})
+    return _model
+
+
+# Kernels
+
+KernelFunction = Callable[..., Optional[float]]
+_kernels: Dict[str, KernelFunction] = {}
+
+
+def register_kernel(name: str, function: KernelFunction):
+    """
+    Register an emulated kernel
+
+    The function receives the run arguments, with BOs replaced by NumPy
+    uint8 views of their device memory, and returns the number of
+    operations performed (used by the performance model) or None.
+
+    Args:
+        name: Kernel name as passed to xrt.kernel()
+        function: Kernel implementation
+    """
+    _kernels[name] = function
+
+
+def _passthrough(src, dst, *args):
+    count = min(src.size, dst.size)
+    dst[:count] = src[:count]
+    return count
+
+
+def _vector_add_int32(a, b, out, *args):
+    a32, b32, out32 = a.view(np.int32), b.view(np.int32), out.view(np.int32)
+    count = min(a32.size, b32.size, out32.size)
+    np.add(a32[:count], b32[:count], out=out32[:count])
+    return count
+
+
+def _matmul_int8(a, b, c, m, k, n, *args):
+    """C[m, n] (int32) = A[m, k] (int8) @ B[k, n] (int8)"""
+    lhs = a[:m * k].view(np.int8).reshape(m, k).astype(np.int32)
+    rhs = b[:k * n].view(np.int8).reshape(k, n).astype(np.int32)
+    c[:m * n * 4].view(np.int32).reshape(m, n)[:] = lhs @ rhs
+    return 2 * m * k * n
+
+
+register_kernel('passthrough', _passthrough)
+register_kernel('vector_add_int32', _vector_add_int32)
+register_kernel('matmul_int8', _matmul_int8)
+
+
+# pyxrt surface
+
+class xclBOSyncDirection(Enum):
+    XCL_BO_SYNC_BO_TO_DEVICE = 0
+    XCL_BO_SYNC_BO_FROM_DEVICE = 1
+
+
+class ert_cmd_state(Enum):
+    ERT_CMD_STATE_NEW = 1
+    ERT_CMD_STATE_RUNNING = 3
+    ERT_CMD_STATE_COMPLETED = 4
+    ERT_CMD_STATE_ERROR = 5
+
+
+class uuid:
+    def __init__(self, value: str):
+        self._value = value
+
+    def to_string(self) -> str:
+        return self._value
+
+    def __str__(self):
+        return self._value
+
+    def __eq__(self, other):
+        return isinstance(other, uuid) and other._value == self._value
+
+    def __hash__(self):
+        return hash(self._value)
+
+
+class xclbin:
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        self.path = path
+        self._uuid = uuid(f"{digest[:8]}-{digest[8:12]}-{digest[12:16]}-"
+                          f"{digest[16:20]}-{digest[20:32]}")
+
+    def get_uuid(self) -> uuid:
+        return self._uuid
+
+
+class _Engine:
+    """A serially shared resource (DMA channel or compute array)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._busy_until = 0.0
+        self.busy_s = 0.0
+
+    def reserve(self, duration: float) -> float:
+        """Book the engine for duration seconds, returning the finish time"""
+        with self._lock:
+            start = max(time.perf_counter(), self._busy_until)
+            self._busy_until = start + duration
+            self.busy_s += duration
+            return self._busy_until
+
+
+def _sleep_until(deadline: float):
+    remaining = deadline - time.perf_counter()
+    if remaining > 0:
+        time.sleep(remaining)
+
+
+class device:
+    def __init__(self, index: int = 0):
+        self.index = index
+        self.model = _model
+        self._xclbins: Dict[uuid, xclbin] = {}
+        self._loaded: Optional[uuid] = None
+        self._stats_lock = threading.Lock()
+        self.stats = {'bytes_to_device': 0, 'bytes_from_device': 0, 'syncs': 0,
+                      'runs': 0, 'ops': 0.0, 'xclbin_loads': 0}
+        self.h2d_engine = _Engine()
+        self.d2h_engine = self.h2d_engine if not self.model.full_duplex_dma else _Engine()
+        self.compute_engine = _Engine()
+
+    def load_xclbin(self, path) -> uuid:
+        binary = path if isinstance(path, xclbin) else xclbin(str(path))
+        return self._load(binary)
+
+    def register_xclbin(self, binary: xclbin) -> uuid:
+        self._xclbins[binary.get_uuid()] = binary
+        return binary.get_uuid()
+
+    def _load(self, binary: xclbin) -> uuid:
+        self.register_xclbin(binary)
+        if self._loaded != binary.get_uuid():
+            _sleep_until(self.compute_engine.reserve(self.model.load_seconds()))
+            self._loaded = binary.get_uuid()
+            self._count('xclbin_loads', 1)
+        return self._loaded
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats['h2d_busy_s'] = self.h2d_engine.busy_s
+        stats['d2h_busy_s'] = self.d2h_engine.busy_s
+        stats['compute_busy_s'] = self.compute_engine.busy_s
+        return stats
+
+    def _count(self, key: str, value):
+        with self._stats_lock:
+            self.stats[key] += value
+
+
+class hw_context:
+    def __init__(self, dev: device, xclbin_uuid: uuid):
+        if xclbin_uuid not in dev._xclbins:
+            raise RuntimeError(f"xclbin {xclbin_uuid} not registered")
+        dev._load(dev._xclbins[xclbin_uuid])
+        self.device = dev
+        self.uuid = xclbin_uuid
+
+
+class bo:
+    # BO flags (values mirror XRT)
+    normal = 0
+    cacheable = 1 << 24
+    device_only = 1 << 28
+    host_only = 1 << 29
+
+    def __init__(self, dev: device, size: int, flags: int = 0, group_id: int = 0):
+        if size <= 0:
+            raise RuntimeError("bo size must be positive")
+        self.device = dev
+        self.flags = flags
+        self.group_id = group_id
+        self._size = size
+        # Separate host and device copies so a missing sync shows up as wrong data
+        self.host = np.zeros(size, dtype=np.uint8)
+        self.device_memory = np.zeros(size, dtype=np.uint8)
+
+    def size(self) -> int:
+        return self._size
+
+    def address(self) -> int:
+        return self.device_memory.ctypes.data
+
+    def map(self) -> memoryview:
+        return memoryview(self.host)
+
+    def write(self, buffer, seek: int = 0):
+        data = np.frombuffer(buffer, dtype=np.uint8)
+        if seek + data.size > self._size:
+            raise RuntimeError("bo write out of range")
+        self.host[seek:seek + data.size] = data
+
+    def read(self, size: int, skip: int = 0) -> np.ndarray:
+        if skip + size > self._size:
+            raise RuntimeError("bo read out of range")
+        return self.host[skip:skip + size].view(np.int8).copy()
+
+    def sync(self, direction: xclBOSyncDirection, size: Optional[int] = None, offset: int = 0):
+        size = self._size - offset if size is None else size
+        if offset + size > self._size:
+            raise RuntimeError("bo sync out of range")
+        model = self.device.model
+        if direction == xclBOSyncDirection.XCL_BO_SYNC_BO_TO_DEVICE:
+            done = self.device.h2d_engine.reserve(model.dma_seconds(size))
+            self.device_memory[offset:offset + size] = self.host[offset:offset + size]
+            self.device._count('bytes_to_device', size)
+        else:
+            done = self.device.d2h_engine.reserve(model.dma_seconds(size))
+            self.host[offset:offset + size] = self.device_memory[offset:offset + size]
+            self.device._count('bytes_from_device', size)
+        self.device._count('syncs', 1)
+        _sleep_until(done)
+
+
+class run:
+    def __init__(self, krnl: "kernel"):
+        self.kernel = krnl
+        self.args: Dict[int, Any] = {}
+        self._done_at: Optional[float] = None
+        self._state = ert_cmd_state.ERT_CMD_STATE_NEW
+
+    def set_arg(self, index: int, value):
+        self.args[index] = value
+
+    def start(self):
+        args = [self.args[i] for i in range(len(self.args))]
+        views = [a.device_memory if isinstance(a, bo) else a for a in args]
+        try:
+            ops = self.kernel.function(*views) or 0
+        except Exception:
+            self._state = ert_cmd_state.ERT_CMD_STATE_ERROR
+            raise
+        dev = self.kernel.device
+        dev._count('runs', 1)
+        dev._count('ops', ops)
+        self._done_at = dev.compute_engine.reserve(dev.model.kernel_seconds(ops))
+        self._state = ert_cmd_state.ERT_CMD_STATE_RUNNING
+
+    def wait(self, timeout_ms: int = 0) -> ert_cmd_state:
+        if self._done_at is not None:
+            if timeout_ms:
+                deadline = time.perf_counter() + timeout_ms / 1000.0
+                _sleep_until(min(self._done_at, deadline))
+                if time.perf_counter() < self._done_at:
+                    return self._state
+            else:
+                _sleep_until(self._done_at)
+            self._state = ert_cmd_state.ERT_CMD_STATE_COMPLETED
+        return self._state
+
+    def state(self) -> ert_cmd_state:
+        if self._state == ert_cmd_state.ERT_CMD_STATE_RUNNING and \
+                time.perf_counter() >= self._done_at:
+            self._state = ert_cmd_state.ERT_CMD_STATE_COMPLETED
+        return self._state
+
+
+class kernel:
+    def __init__(self, context, name_or_uuid, name: Optional[str] = None):
+        # kernel(hw_context, name) or legacy kernel(device, uuid, name)
+        if isinstance(context, hw_context):
+            self.device = context.device
+            self.name = name_or_uuid
+        else:
+            self.device = context
+            self.name = name
+            if name_or_uuid not in context._xclbins:
+                raise RuntimeError(f"xclbin {name_or_uuid} not registered")
+        if self.name not in _kernels:
+            raise RuntimeError(f"No emulated kernel named {self.name!r} "
+                               f"(register one with npu_emulator.register_kernel)")
+        self.function = _kernels[self.name]
+
+    def group_id(self, arg_index: int) -> int:
+        return arg_index
+
+    def __call__(self, *args) -> run:
+        r = run(self)
+        for i, arg in enumerate(args):
+            r.set_arg(i, arg)
+        r.start()
+        return r
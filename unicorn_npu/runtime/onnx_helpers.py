@@ -17,13 +17,27 @@ class ONNXHelper:
     def __init__(self):
         """Initialize ONNX helper"""
         self.cpu_only_mode = os.environ.get('CPU_ONLY_MODE', '').lower() in ('1', 'true', 'yes')
-
-    def get_execution_providers(self, prefer_npu: bool = True) -> List[str]:
+        self.selection_mode = os.environ.get('PROVIDER_SELECTION_MODE', 'priority').lower()
+        self._provider_selector = None
+
+    def get_execution_providers(self,
+                                prefer_npu: bool = True,
+                                mode: Optional[str] = None,
+                                model_path: Optional[str] = None,
+                                input_shapes: Optional[Dict[str, List[int]]] = None,
+                                latency_target_ms: Optional[float] = None) -> List[str]:
         """
         Get list of execution providers in priority order
 
         Args:
-            prefer_npu: If True, prioritize NPU-related providers
+            prefer_npu: If True, prioritize NPU-related providers (priority
+                        mode only; adaptive mode ranks chains by measurement)
+            mode: 'priority' (static order) or 'adaptive' (measured per model),
+                  case-insensitive; defaults to PROVIDER_SELECTION_MODE env var,
+                  then 'priority'
+            model_path: Model to benchmark (required for adaptive mode)
+            input_shapes: Concrete input shapes used for benchmarking
+            latency_target_ms: Optional p95 latency target for adaptive mode
 
         Returns:
             List of execution provider names
@@ -32,6 +46,26 @@ class ONNXHelper:
             logger.info("🖥️ CPU-only mode enabled")
             return ['CPUExecutionProvider']
 
+        mode = (mode or self.selection_mode).lower()
+        if mode not in ('priority', 'adaptive'):
+            logger.warning(f"⚠️ Unknown provider selection mode {mode!r}, using priority order")
+        if mode == 'adaptive':
+            if model_path is None:
+                logger.warning("⚠️ Adaptive mode needs model_path, using priority order")
+            else:
+                try:
+                    decision = self.select_execution_providers(
+                        model_path,
+                        input_shapes=input_shapes,
+                        latency_target_ms=latency_target_ms
+                    )
+                    return decision['providers']
+                except ImportError:
+                    logger.error("❌ onnxruntime not installed")
+                    return ['CPUExecutionProvider']
+                except Exception as e:
+                    logger.error(f"❌ Adaptive provider selection failed: {e}")
+
         try:
             import onnxruntime as ort
             available = ort.get_available_providers()
@@ -66,6 +100,42 @@ class ONNXHelper:
             logger.error(f"❌ Failed to get execution providers: {e}")
             return ['CPUExecutionProvider']
 
+    def select_execution_providers(self,
+                                   model_path: str,
+                                   input_shapes: Optional[Dict[str, List[int]]] = None,
+                                   inputs: Optional[Dict[str, Any]] = None,
+                                   latency_target_ms: Optional[float] = None,
+                                   force: bool = False) -> Dict[str, Any]:
+        """
+        Benchmark provider chains on a model and pick the fastest
+
+        Decisions are cached per model hash and host, and re-measured
+        when the installed provider versions change.
+
+        Args:
+            model_path: Path to ONNX model
+            input_shapes: Concrete input shapes (dynamic dims default to 1)
+            inputs: Real input arrays to benchmark with (override input_shapes)
+            latency_target_ms: Optional p95 latency target in milliseconds
+            force: Re-measure even if a cached decision is valid
+
+        Returns:
+            Decision dictionary ('providers', 'measurements', 'cached', ...)
+        """
+        from .provider_selection import ProviderSelector
+
+        if self._provider_selector is None:
+            self._provider_selector = ProviderSelector()
+
+        return self._provider_selector.select(
+            model_path,
+            input_shapes=input_shapes,
+            inputs=inputs,
+            latency_target_ms=latency_target_ms,
+            session_options=self.create_session_options(),
+            force=force
+        )
+
     def create_session_options(self,
                                inter_op_threads: int = 1,
                                intra_op_threads: int = 1,
@@ -103,6 +173,125 @@ class ONNXHelper:
             logger.error(f"❌ Failed to create session options: {e}")
             return None
 
+    def create_async_session(self,
+                             session: Any,
+                             max_workers: int = 1,
+                             max_pending: int = 4) -> Any:
+        """
+        Wrap a session for use from asyncio code
+
+        Args:
+            session: ONNX Runtime InferenceSession
+            max_workers: Threads running inference concurrently
+            max_pending: Requests admitted before callers must wait
+
+        Returns:
+            AsyncInferenceSession whose run() is awaitable
+        """
+        from .async_inference import AsyncInferenceSession
+
+        return AsyncInferenceSession(session, max_workers=max_workers,
+                                     max_pending=max_pending)
+
+    def create_cached_session(self,
+                              session: Any,
+                              max_bytes: int = 256 << 20,
+                              spill_dir: Optional[str] = None,
+                              spill_max_bytes: int = 2 << 30) -> Any:
+        """
+        Wrap a session with an inference result cache
+
+        Repeated inputs (same dtype, shape and contents) are served from a
+        memory-bounded LRU, optionally spilling to disk, and concurrent
+        identical requests share one run.
+
+        Args:
+            session: ONNX Runtime InferenceSession
+            max_bytes: Memory tier capacity in output bytes
+            spill_dir: Directory for the on-disk tier (None disables it)
+            spill_max_bytes: Disk tier capacity in bytes
+
+        Returns:
+            CachedSession with the same run() signature
+        """
+        from .result_cache import CachedSession
+
+        return CachedSession(session, max_bytes=max_bytes, spill_dir=spill_dir,
+                             spill_max_bytes=spill_max_bytes)
+
+    def create_bucketed_session(self,
+                                model_path: str,
+                                buckets: List[int],
+                                length_axes: Dict[str, int],
+                                **kwargs) -> Any:
+        """
+        Create per-length-bucket static-shape sessions for a model
+
+        Args:
+            model_path: Path to ONNX model
+            buckets: Length bucket boundaries (see suggest_buckets)
+            length_axes: Input name -> variable-length axis
+            **kwargs: Further BucketedSession options (pad_values, output_axes, ...)
+
+        Returns:
+            BucketedSession with a run() that pads and trims automatically
+        """
+        from .shape_buckets import BucketedSession
+
+        return BucketedSession(model_path, buckets, length_axes, helper=self, **kwargs)
+
+    def create_kv_cache(self,
+                        session: Any,
+                        batch_size: int,
+                        max_length: int,
+                        pool: Any = None,
+                        **kwargs) -> Any:
+        """
+        Create a preallocated KV cache for a decoder session
+
+        Args:
+            session: Decoder InferenceSession with past/present KV tensors
+            batch_size: Batch rows (beams); the maximum batch with a pool
+            max_length: Maximum sequence length
+            pool: KVBlockPool to page sequences from (None: contiguous cache)
+            **kwargs: Further KVCache/PagedKVCache options (tokens_input, ...)
+
+        Returns:
+            KVCache, or PagedKVCache when a pool is given
+        """
+        from .kv_cache import KVCache, PagedKVCache
+
+        if pool is not None:
+            return PagedKVCache(session, pool, batch_size, max_length, **kwargs)
+        return KVCache(session, batch_size, max_length, **kwargs)
+
+    def quantize_int8(self,
+                      model_path: str,
+                      output_path: str,
+                      calibration_batches: Any,
+                      cache_dir: Optional[str] = None,
+                      **kwargs) -> Dict[str, Any]:
+        """
+        Quantize a float model to QDQ INT8 for the NPU
+
+        Calibration statistics are cached by model hash, so re-quantizing
+        the same model skips the calibration pass.
+
+        Args:
+            model_path: Float ONNX model
+            output_path: Where to write the INT8 model
+            calibration_batches: Iterable of input feeds, consumed as a stream
+            cache_dir: Calibration cache directory
+            **kwargs: Further INT8Quantizer.quantize options (eval_batches, force, ...)
+
+        Returns:
+            Report with accuracy drift and CPU speedup
+        """
+        from .quantization import INT8Quantizer
+
+        return INT8Quantizer(cache_dir=cache_dir).quantize(model_path, output_path,
+                                                           calibration_batches, **kwargs)
+
     def check_provider_available(self, provider_name: str) -> bool:
         """
         Check if a specific execution provider is available
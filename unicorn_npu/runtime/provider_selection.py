@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Adaptive Execution Provider Selection
+Benchmarks candidate provider chains on a model and caches the fastest one
+"""
+
+import os
+import json
+import time
+import socket
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import List, Optional, Dict, Any, Sequence, Union
+
+from .onnx_types import ONNX_TYPE_TO_DTYPE
+
+logger = logging.getLogger(__name__)
+
+# Accelerator providers in static priority order (CPU is always the fallback)
+PRIORITY_PROVIDERS = [
+    'VitisAIExecutionProvider',   # AMD Ryzen AI NPU
+    'OpenVINOExecutionProvider',  # Intel iGPU/NPU
+    'CUDAExecutionProvider',      # NVIDIA GPU
+    'ROCmExecutionProvider',      # AMD GPU
+    'DmlExecutionProvider',       # DirectML (Windows)
+]
+
+CACHE_VERSION = 1
+
+
+def default_cache_path() -> Path:
+    """Get default location of the provider selection cache"""
+    cache_root = os.environ.get('XDG_CACHE_HOME') or os.path.join(Path.home(), '.cache')
+    return Path(cache_root) / 'unicorn-npu' / 'provider_selection.json'
+
+
+def hash_model(model_path: Union[str, Path], chunk_size: int = 1 << 20) -> str:
+    """
+    Compute SHA-256 of a model file
+
+    Args:
+        model_path: Path to ONNX model
+        chunk_size: Read size in bytes
+
+    Returns:
+        Hex digest of the model contents
+    """
+    digest = hashlib.sha256()
+    with open(model_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_provider_fingerprint() -> Dict[str, Any]:
+    """
+    Describe the installed ONNX Runtime build and its providers
+
+    A cached decision is only trusted while this fingerprint is unchanged.
+
+    Returns:
+        Dictionary with onnxruntime version, distribution versions and providers
+    """
+    import onnxruntime as ort
+
+    distributions = {}
+    try:
+        from importlib import metadata
+        for dist_name in ('onnxruntime', 'onnxruntime-openvino', 'onnxruntime-vitisai',
+                          'onnxruntime-gpu', 'onnxruntime-rocm', 'onnxruntime-directml',
+                          'voe'):
+            try:
+                distributions[dist_name] = metadata.version(dist_name)
+            except metadata.PackageNotFoundError:
+                continue
+    except ImportError:
+        pass
+
+    return {
+        'onnxruntime': ort.__version__,
+        'distributions': distributions,
+        'providers': sorted(ort.get_available_providers()),
+    }
+
+
+class ProviderSelector:
+    """Measure provider chains on real input shapes and cache the winner"""
+
+    def __init__(self,
+                 cache_path: Optional[Union[str, Path]] = None,
+                 warmup_runs: int = 2,
+                 timed_runs: int = 10):
+        """
+        Initialize provider selector
+
+        Args:
+            cache_path: JSON cache file (default: ~/.cache/unicorn-npu/provider_selection.json)
+            warmup_runs: Untimed runs per chain (session/partition warmup)
+            timed_runs: Timed runs per chain
+        """
+        self.cache_path = Path(cache_path) if cache_path else default_cache_path()
+        self.warmup_runs = max(0, warmup_runs)
+        self.timed_runs = max(1, timed_runs)
+        self.hostname = socket.gethostname()
+        self._lock = threading.Lock()
+        self._hash_memo: Dict[str, tuple] = {}
+
+    def candidate_chains(self, available: Sequence[str]) -> List[List[str]]:
+        """
+        Build candidate provider chains from available providers
+
+        Args:
+            available: Providers reported by onnxruntime
+
+        Returns:
+            List of provider chains, accelerator chains first, CPU-only last
+        """
+        chains = []
+        for provider in PRIORITY_PROVIDERS:
+            if provider in available:
+                chains.append([provider, 'CPUExecutionProvider'])
+        chains.append(['CPUExecutionProvider'])
+        return chains
+
+    def select(self,
+               model_path: Union[str, Path],
+               input_shapes: Optional[Dict[str, Sequence[int]]] = None,
+               inputs: Optional[Dict[str, Any]] = None,
+               latency_target_ms: Optional[float] = None,
+               session_options: Any = None,
+               force: bool = False) -> Dict[str, Any]:
+        """
+        Select the fastest provider chain for a model
+
+        Chains are ranked by median latency. When a latency target is given,
+        chains whose p95 latency exceeds it are discarded; if none meet the
+        target, the fastest chain is used anyway.
+
+        Args:
+            model_path: Path to ONNX model
+            input_shapes: Concrete shapes per input name (dynamic dims default to 1)
+            inputs: Real input arrays per input name (override input_shapes)
+            latency_target_ms: Optional p95 latency target in milliseconds
+            session_options: SessionOptions used for benchmark sessions
+            force: Ignore any cached decision and re-measure
+
+        Returns:
+            Decision dictionary with 'providers', 'measurements' and 'cached'
+        """
+        import onnxruntime as ort
+
+        model_path = Path(model_path)
+        fingerprint = get_provider_fingerprint()
+        shape_key = self._shape_key(inputs, input_shapes)
+        key = f"{self._model_hash(model_path)}:{self.hostname}:{shape_key}"
+
+        if not force:
+            entry = self._load_cache().get(key)
+            if entry and entry.get('fingerprint') == fingerprint and \
+                    entry.get('latency_target_ms') == latency_target_ms:
+                logger.info(f"♻️ Using cached provider chain: {entry['providers']}")
+                decision = dict(entry)
+                decision['cached'] = True
+                return decision
+            if entry:
+                logger.info("🔄 Provider versions or target changed, re-validating")
+
+        measurements = []
+        for chain in self.candidate_chains(ort.get_available_providers()):
+            result = self._benchmark_chain(ort, model_path, chain, input_shapes,
+                                           inputs, session_options)
+            measurements.append(result)
+            if 'error' in result:
+                logger.warning(f"⚠️ {chain[0]} failed: {result['error']}")
+            else:
+                logger.info(f"⏱️ {chain[0]}: p50={result['p50_ms']:.2f}ms "
+                            f"p95={result['p95_ms']:.2f}ms")
+
+        working = [m for m in measurements if 'error' not in m]
+        if not working:
+            raise RuntimeError(f"No provider chain could run {model_path}")
+
+        eligible = working
+        if latency_target_ms is not None:
+            eligible = [m for m in working if m['p95_ms'] <= latency_target_ms]
+            if not eligible:
+                logger.warning(f"⚠️ No chain meets {latency_target_ms}ms target, "
+                               "using fastest")
+                eligible = working
+
+        best = min(eligible, key=lambda m: m['p50_ms'])
+        logger.info(f"✅ Selected provider chain: {best['providers']}")
+
+        decision = {
+            'version': CACHE_VERSION,
+            'providers': best['providers'],
+            'latency_target_ms': latency_target_ms,
+            'measurements': measurements,
+            'fingerprint': fingerprint,
+            'model': str(model_path),
+            'host': self.hostname,
+            'timestamp': time.time(),
+        }
+        self._store_cache(key, decision)
+
+        decision = dict(decision)
+        decision['cached'] = False
+        return decision
+
+    def invalidate(self, model_path: Optional[Union[str, Path]] = None) -> int:
+        """
+        Drop cached decisions
+
+        Args:
+            model_path: Only drop decisions for this model (default: all)
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            cache = self._read_cache_file()
+            if model_path is None:
+                removed = len(cache)
+                cache = {}
+            else:
+                prefix = f"{self._model_hash(Path(model_path))}:"
+                keys = [k for k in cache if k.startswith(prefix)]
+                for k in keys:
+                    del cache[k]
+                removed = len(keys)
+            self._write_cache_file(cache)
+        return removed
+
+    def _benchmark_chain(self, ort, model_path: Path, chain: List[str],
+                         input_shapes, inputs, session_options) -> Dict[str, Any]:
+        """Benchmark one provider chain, including session creation time"""
+        result: Dict[str, Any] = {'providers': chain}
+        try:
+            start = time.perf_counter()
+            session = ort.InferenceSession(str(model_path),
+                                           sess_options=session_options,
+                                           providers=chain)
+            result['load_ms'] = (time.perf_counter() - start) * 1000.0
+
+            # ORT silently drops providers it cannot initialize
+            active = session.get_providers()
+            if chain[0] not in active:
+                result['error'] = f"provider not active (got {active})"
+                return result
+
+            feed = inputs if inputs is not None else \
+                self._synthesize_inputs(session, input_shapes or {})
+
+            for _ in range(self.warmup_runs):
+                session.run(None, feed)
+
+            timings = []
+            for _ in range(self.timed_runs):
+                start = time.perf_counter()
+                session.run(None, feed)
+                timings.append((time.perf_counter() - start) * 1000.0)
+
+            timings.sort()
+            result['p50_ms'] = timings[len(timings) // 2]
+            result['p95_ms'] = timings[min(len(timings) - 1,
+                                           int(round(0.95 * (len(timings) - 1))))]
+            result['min_ms'] = timings[0]
+        except Exception as e:
+            result['error'] = str(e)
+        return result
+
+    @staticmethod
+    def _synthesize_inputs(session, input_shapes: Dict[str, Sequence[int]]) -> Dict[str, Any]:
+        """Create random inputs matching the session's input signature"""
+        import numpy as np
+
+        rng = np.random.default_rng(0)
+        feed = {}
+        for node in session.get_inputs():
+            shape = input_shapes.get(node.name)
+            if shape is None:
+                shape = [d if isinstance(d, int) and d > 0 else 1 for d in node.shape]
+            dtype = np.dtype(ONNX_TYPE_TO_DTYPE.get(node.type, 'float32'))
+            if dtype.kind == 'f':
+                feed[node.name] = rng.standard_normal(shape).astype(dtype)
+            elif dtype.kind == 'b':
+                feed[node.name] = np.zeros(shape, dtype=dtype)
+            else:
+                feed[node.name] = np.ones(shape, dtype=dtype)
+        return feed
+
+    @staticmethod
+    def _shape_key(inputs, input_shapes) -> str:
+        """Stable key describing the benchmarked input shapes"""
+        if inputs is not None:
+            shapes = {name: list(getattr(value, 'shape', ())) for name, value in inputs.items()}
+        else:
+            shapes = {name: list(shape) for name, shape in (input_shapes or {}).items()}
+        return json.dumps(shapes, sort_keys=True, separators=(',', ':'))
+
+    def _model_hash(self, model_path: Path) -> str:
+        """Hash a model, memoized on (size, mtime) to avoid rehashing"""
+        stat = model_path.stat()
+        memo_key = str(model_path.resolve())
+        memo = self._hash_memo.get(memo_key)
+        if memo and memo[0] == stat.st_size and memo[1] == stat.st_mtime_ns:
+            return memo[2]
+        digest = hash_model(model_path)
+        self._hash_memo[memo_key] = (stat.st_size, stat.st_mtime_ns, digest)
+        return digest
+
+    def _load_cache(self) -> Dict[str, Any]:
+        with self._lock:
+            return self._read_cache_file()
+
+    def _store_cache(self, key: str, decision: Dict[str, Any]):
+        with self._lock:
+            cache = self._read_cache_file()
+            cache[key] = decision
+            self._write_cache_file(cache)
+
+    def _read_cache_file(self) -> Dict[str, Any]:
+        try:
+            with open(self.cache_path, 'r') as f:
+                data = json.load(f)
+            if data.get('version') != CACHE_VERSION:
+                return {}
+            return data.get('entries', {})
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"⚠️ Ignoring unreadable provider cache: {e}")
+            return {}
+
+    def _write_cache_file(self, entries: Dict[str, Any]):
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix('.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': CACHE_VERSION, 'entries': entries}, f, indent=2)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to write provider cache: {e}")
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Offline INT8 Quantization
+Streams calibration batches through a float model, caches activation
+ranges by model hash and emits a QDQ INT8 model
+"""
+
+import os
+import json
+import time
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Dict, Any, Iterable, Iterator, Union
+
+import numpy as np
+
+from .provider_selection import hash_model
+
+logger = logging.getLogger(__name__)
+
+CALIBRATION_CACHE_VERSION = 1
+
+Batch = Dict[str, np.ndarray]
+
+# onnx.TensorProto element types treated as float activations
+_FLOAT_ELEM_TYPES = (1, 10)  # FLOAT, FLOAT16
+
+
+def default_calibration_dir() -> Path:
+    """Get default directory of the calibration statistics cache"""
+    cache_root = os.environ.get('XDG_CACHE_HOME') or os.path.join(Path.home(), '.cache')
+    return Path(cache_root) / 'unicorn-npu' / 'calibration'
+
+
+def iter_npz_batches(paths: Iterable[Union[str, Path]]) -> Iterator[Batch]:
+    """
+    Stream calibration batches from .npz files (one input feed per file)
+
+    Args:
+        paths: .npz files or directories containing them
+
+    Yields:
+        Input name -> array
+    """
+    for path in paths:
+        path = Path(path)
+        files = sorted(path.glob('*.npz')) if path.is_dir() else [path]
+        for file in files:
+            with np.load(file) as data:
+                yield {name: data[name] for name in data.files}
+
+
+class INT8Quantizer:
+    """Calibrate float ONNX models and quantize them to QDQ INT8"""
+
+    def __init__(self,
+                 cache_dir: Optional[Union[str, Path]] = None,
+                 providers: Optional[List[str]] = None,
+                 op_types: Optional[List[str]] = None,
+                 per_channel: bool = False,
+                 symmetric_activations: bool = False):
+        """
+        Initialize quantizer
+
+        Args:
+            cache_dir: Calibration cache directory (default: ~/.cache/unicorn-npu/calibration)
+            providers: Providers for calibration and evaluation sessions (default: CPU)
+            op_types: Operator types to quantize (default: all supported by ORT)
+            per_channel: Quantize weights per output channel
+            symmetric_activations: Use symmetric activation ranges
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else default_calibration_dir()
+        self.providers = providers or ['CPUExecutionProvider']
+        self.op_types = op_types
+        self.per_channel = per_channel
+        self.symmetric_activations = symmetric_activations
+
+    def cache_path(self, model_path: Union[str, Path], calibration_key: str = '') -> Path:
+        """Cache file for a model's calibration statistics"""
+        suffix = f"-{calibration_key}" if calibration_key else ''
+        return self.cache_dir / f"{hash_model(model_path)}{suffix}.json"
+
+    def calibrate(self,
+                  model_path: Union[str, Path],
+                  batches: Iterable[Batch],
+                  calibration_key: str = '',
+                  force: bool = False,
+                  keep_batches: int = 0) -> Dict[str, Any]:
+        """
+        Collect activation ranges, or load them from the cache
+
+        Batches are consumed one at a time: only the running min/max of
+        each float tensor is kept, never the activations themselves.
+
+        Args:
+            model_path: Float ONNX model
+            batches: Iterable of input feeds
+            calibration_key: Distinguishes calibration datasets of one model
+            force: Recalibrate even if cached statistics exist
+            keep_batches: Retain this many batches (e.g. for evaluation)
+
+        Returns:
+            Statistics dictionary with 'ranges', 'batches', 'cached' and
+            'kept' (retained batches)
+        """
+        cache_path = self.cache_path(model_path, calibration_key)
+        if not force:
+            stats = self._load_stats(cache_path)
+            if stats is not None:
+                logger.info(f"♻️ Using cached calibration: {cache_path.name}")
+                stats['cached'] = True
+                stats['kept'] = []
+                return stats
+
+        import onnxruntime as ort
+
+        start = time.perf_counter()
+        ranges: Dict[str, List[float]] = {}
+        kept: List[Batch] = []
+        count = 0
+        with tempfile.TemporaryDirectory(prefix='unicorn-npu-calib-') as tmp_dir:
+            augmented_path, tensor_names = self._augment_model(model_path, tmp_dir)
+            session = ort.InferenceSession(augmented_path, providers=self.providers)
+            for feed in batches:
+                outputs = session.run(tensor_names, feed)
+                for name, value in zip(tensor_names, outputs):
+                    if value.size == 0:
+                        continue
+                    low, high = float(np.min(value)), float(np.max(value))
+                    current = ranges.get(name)
+                    if current is None:
+                        ranges[name] = [low, high]
+                    else:
+                        current[0] = min(current[0], low)
+                        current[1] = max(current[1], high)
+                if len(kept) < keep_batches:
+                    kept.append(feed)
+                count += 1
+            del session
+
+        if count == 0:
+            raise ValueError("No calibration batches were provided")
+
+        stats = {
+            'version': CALIBRATION_CACHE_VERSION,
+            'model': str(model_path),
+            'method': 'minmax',
+            'batches': count,
+            'ranges': ranges,
+            'elapsed_s': time.perf_counter() - start,
+            'timestamp': time.time(),
+        }
+        self._store_stats(cache_path, stats)
+        logger.info(f"📊 Calibrated {len(ranges)} tensors over {count} batches "
+                    f"in {stats['elapsed_s']:.2f}s")
+
+        stats = dict(stats)
+        stats['cached'] = False
+        stats['kept'] = kept
+        return stats
+
+    def quantize(self,
+                 model_path: Union[str, Path],
+                 output_path: Union[str, Path],
+                 batches: Iterable[Batch],
+                 calibration_key: str = '',
+                 force: bool = False,
+                 eval_batches: int = 8,
+                 nodes_to_exclude: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Quantize a float model to QDQ INT8 and report drift and speedup
+
+        Args:
+            model_path: Float ONNX model
+            output_path: Where to write the INT8 model
+            batches: Calibration input feeds (also used for evaluation)
+            calibration_key: Distinguishes calibration datasets of one model
+            force: Recalibrate even if cached statistics exist
+            eval_batches: Batches used for the accuracy/speed report (0 skips it)
+            nodes_to_exclude: Node names kept in float
+
+        Returns:
+            Report with calibration, quantization and evaluation results
+        """
+        batches = iter(batches)
+        start = time.perf_counter()
+        stats = self.calibrate(model_path, batches, calibration_key, force,
+                               keep_batches=eval_batches)
+        calibrate_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        self._write_qdq_model(model_path, output_path, stats['ranges'], nodes_to_exclude)
+        quantize_s = time.perf_counter() - start
+        logger.info(f"✅ Wrote INT8 model: {output_path}")
+
+        report = {
+            'model': str(model_path),
+            'output': str(output_path),
+            'calibration_cached': stats['cached'],
+            'calibration_batches': stats['batches'],
+            'calibrated_tensors': len(stats['ranges']),
+            'calibrate_s': calibrate_s,
+            'quantize_s': quantize_s,
+            'float_bytes': Path(model_path).stat().st_size,
+            'int8_bytes': Path(output_path).stat().st_size,
+        }
+
+        if eval_batches > 0:
+            # On a cache hit the calibration stream was not consumed; evaluate on it
+            eval_feeds = stats['kept'] or [feed for _, feed in zip(range(eval_batches), batches)]
+            if eval_feeds:
+                report.update(self.evaluate(model_path, output_path, eval_feeds))
+        return report
+
+    def evaluate(self,
+                 float_path: Union[str, Path],
+                 int8_path: Union[str, Path],
+                 feeds: List[Batch],
+                 warmup_runs: int = 2,
+                 timed_runs: int = 10) -> Dict[str, Any]:
+        """
+        Compare float and INT8 models on the same inputs
+
+        Args:
+            float_path: Float ONNX model
+            int8_path: Quantized ONNX model
+            feeds: Input feeds
+            warmup_runs: Untimed runs per model
+            timed_runs: Timed passes over all feeds per model
+
+        Returns:
+            Dictionary with per-output drift and median latencies / speedup
+        """
+        import onnxruntime as ort
+
+        float_session = ort.InferenceSession(str(float_path), providers=self.providers)
+        int8_session = ort.InferenceSession(str(int8_path), providers=self.providers)
+        output_names = [o.name for o in float_session.get_outputs()]
+
+        drift: Dict[str, Dict[str, float]] = {}
+        for feed in feeds:
+            reference = float_session.run(output_names, feed)
+            quantized = int8_session.run(output_names, feed)
+            for name, ref, out in zip(output_names, reference, quantized):
+                if ref.dtype.kind != 'f':
+                    continue
+                ref = ref.astype(np.float64).ravel()
+                out = out.astype(np.float64).ravel()
+                error = np.abs(ref - out)
+                denom = np.linalg.norm(ref) * np.linalg.norm(out)
+                entry = drift.setdefault(name, {'max_abs_error': 0.0, 'mean_abs_error': 0.0,
+                                                'relative_error': 0.0, 'cosine': 0.0})
+                entry['max_abs_error'] = max(entry['max_abs_error'], float(error.max(initial=0.0)))
+                entry['mean_abs_error'] += float(error.mean()) / len(feeds) if error.size else 0.0
+                entry['relative_error'] += float(np.linalg.norm(ref - out) /
+                                                 max(np.linalg.norm(ref), 1e-12)) / len(feeds)
+                entry['cosine'] += (float(np.dot(ref, out) / denom) if denom else 1.0) / len(feeds)
+
+        float_ms = self._time_session(float_session, feeds, warmup_runs, timed_runs)
+        int8_ms = self._time_session(int8_session, feeds, warmup_runs, timed_runs)
+        logger.info(f"⏱️ float {float_ms:.2f}ms, int8 {int8_ms:.2f}ms per batch "
+                    f"({float_ms / int8_ms:.2f}x)")
+
+        return {
+            'drift': drift,
+            'eval_batches': len(feeds),
+            'providers': int8_session.get_providers(),
+            'float_ms': float_ms,
+            'int8_ms': int8_ms,
+            'speedup': float_ms / int8_ms if int8_ms > 0 else float('inf'),
+        }
+
+    def invalidate(self, model_path: Union[str, Path], calibration_key: str = '') -> bool:
+        """Drop cached statistics for a model; returns True if removed"""
+        try:
+            self.cache_path(model_path, calibration_key).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    @staticmethod
+    def _time_session(session, feeds: List[Batch], warmup_runs: int, timed_runs: int) -> float:
+        """Median milliseconds per batch"""
+        for _ in range(warmup_runs):
+            session.run(None, feeds[0])
+        timings = []
+        for _ in range(max(1, timed_runs)):
+            start = time.perf_counter()
+            for feed in feeds:
+                session.run(None, feed)
+            timings.append((time.perf_counter() - start) * 1000.0 / len(feeds))
+        timings.sort()
+        return timings[len(timings) // 2]
+
+    def _augment_model(self, model_path: Union[str, Path], tmp_dir: str):
+        """Expose every float tensor as a graph output; returns (path, names)"""
+        import onnx
+
+        model = onnx.load(str(model_path))
+        inferred = onnx.shape_inference.infer_shapes(model)
+
+        elem_types = {}
+        for info in list(inferred.graph.value_info) + list(inferred.graph.input) + \
+                list(inferred.graph.output):
+            elem_types[info.name] = info.type.tensor_type.elem_type
+        initializers = {init.name for init in model.graph.initializer}
+        existing = {o.name for o in model.graph.output}
+
+        names = []
+        for name in [i.name for i in model.graph.input] + \
+                [o for node in model.graph.node for o in node.output]:
+            if not name or name in initializers or name in names:
+                continue
+            if elem_types.get(name) not in _FLOAT_ELEM_TYPES:
+                continue
+            names.append(name)
+            if name not in existing:
+                model.graph.output.append(
+                    onnx.helper.make_tensor_value_info(name, elem_types[name], None))
+
+        augmented_path = os.path.join(tmp_dir, 'augmented.onnx')
+        onnx.save(model, augmented_path, save_as_external_data=True,
+                  location='augmented.onnx.data')
+        return augmented_path, names
+
+    def _write_qdq_model(self, model_path, output_path, ranges: Dict[str, List[float]],
+                         nodes_to_exclude: Optional[List[str]]):
+        """Quantize with ORT's QDQ quantizer using precomputed ranges"""
+        from onnxruntime.quantization import QuantType
+        from onnxruntime.quantization.calibrate import CalibrationMethod, TensorData, TensorsData
+        from onnxruntime.quantization.qdq_quantizer import QDQQuantizer
+        from onnxruntime.quantization.quant_utils import load_model_with_shape_infer
+        from onnxruntime.quantization.registry import QDQRegistry, QLinearOpsRegistry
+
+        tensors_range = TensorsData(CalibrationMethod.MinMax, {
+            name: TensorData(lowest=np.array(low, dtype=np.float32),
+                             highest=np.array(high, dtype=np.float32))
+            for name, (low, high) in ranges.items()
+        })
+        op_types = self.op_types or list(set(QLinearOpsRegistry) | set(QDQRegistry))
+        extra_options = {'ActivationSymmetric': self.symmetric_activations}
+
+        model = load_model_with_shape_infer(Path(model_path))
+        quantizer = QDQQuantizer(
+            model,
+            self.per_channel,
+            False,  # reduce_range
+            QuantType.QInt8,
+            QuantType.QInt8,
+            tensors_range,
+            [],
+            nodes_to_exclude or [],
+            op_types,
+            extra_options,
+        )
+        quantizer.quantize_model()
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        quantizer.model.save_model_to_file(str(output_path), False)
+
+    @staticmethod
+    def _load_stats(cache_path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(cache_path, 'r') as f:
+                stats = json.load(f)
+            if stats.get('version') != CALIBRATION_CACHE_VERSION:
+                return None
+            return stats
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"⚠️ Ignoring unreadable calibration cache: {e}")
+            return None
+
+    @staticmethod
+    def _store_stats(cache_path: Path, stats: Dict[str, Any]):
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix('.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(stats, f, indent=2)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to write calibration cache: {e}")
+
+
+def main():
+    """Quantize a float ONNX model to QDQ INT8"""
+    parser = argparse.ArgumentParser(description="Unicorn NPU INT8 quantizer")
+    parser.add_argument('model', help="Float ONNX model")
+    parser.add_argument('output', help="Output INT8 model")
+    parser.add_argument('--calibration-data', nargs='+', default=[],
+                        help=".npz batches (or directories of them), one input feed per file")
+    parser.add_argument('--calibration-key', default='', help="Name of the calibration dataset")
+    parser.add_argument('--per-channel', action='store_true')
+    parser.add_argument('--symmetric-activations', action='store_true')
+    parser.add_argument('--exclude', nargs='*', default=[], help="Node names kept in float")
+    parser.add_argument('--eval-batches', type=int, default=8)
+    parser.add_argument('--force', action='store_true', help="Ignore cached calibration")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    quantizer = INT8Quantizer(per_channel=args.per_channel,
+                              symmetric_activations=args.symmetric_activations)
+    report = quantizer.quantize(args.model, args.output,
+                                iter_npz_batches(args.calibration_data),
+                                calibration_key=args.calibration_key,
+                                force=args.force,
+                                eval_batches=args.eval_batches,
+                                nodes_to_exclude=args.exclude)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
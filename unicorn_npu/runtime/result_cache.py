@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Inference Result Cache
+Memoizes session.run outputs keyed by a content hash of the inputs
+"""
+
+import os
+import re
+import uuid
+import shutil
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Dict, Any, Tuple
+
+import numpy as np
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    xxhash = None
+    XXHASH_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Spill layout: <spill_dir>/<pid>-<id>/<key>_<index>.npy, plus a marker file
+# so only directories created here are ever reaped
+_SPILL_SUBDIR = re.compile(r'^(\d+)-[0-9a-f]{8}$')
+_SPILL_MARKER = '.unicorn-npu-spill'
+
+
+def hash_inputs(input_feed: Dict[str, Any],
+                output_names: Optional[List[str]] = None) -> Optional[str]:
+    """
+    Compute a cache key for an inference request
+
+    The key covers each input's name, dtype, shape and buffer contents,
+    plus the requested outputs. Uses xxhash when installed, else BLAKE2b.
+
+    Args:
+        input_feed: Input name -> array
+        output_names: Requested outputs (None for all)
+
+    Returns:
+        Hex key, or None if an input is not a NumPy array
+    """
+    digest = xxhash.xxh3_128() if XXHASH_AVAILABLE else hashlib.blake2b(digest_size=16)
+    digest.update(repr(None if output_names is None else list(output_names)).encode())
+
+    for name in sorted(input_feed):
+        value = input_feed[name]
+        if not isinstance(value, np.ndarray):
+            return None
+        if value.dtype.hasobject:
+            return None
+        value = np.ascontiguousarray(value)
+        digest.update(f"{name}|{value.dtype.str}|{value.shape}|".encode())
+        if value.size:
+            # Zero-size buffers can't be cast; dtype and shape already cover them
+            digest.update(memoryview(value).cast('B'))
+
+    return digest.hexdigest()
+
+
+class _Pending:
+    """An in-flight run that identical requests can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.outputs: Optional[List[np.ndarray]] = None
+        self.error: Optional[BaseException] = None
+
+
+class CachedSession:
+    """
+    Opt-in memoization around an InferenceSession
+
+    Outputs live in a memory-bounded LRU. Entries evicted from memory can
+    spill to an on-disk tier of .npy files served back as read-only memory
+    maps. Concurrent identical requests are coalesced into a single run.
+    """
+
+    def __init__(self,
+                 session: Any,
+                 max_bytes: int = 256 << 20,
+                 spill_dir: Optional[str] = None,
+                 spill_max_bytes: int = 2 << 30,
+                 copy_outputs: bool = True):
+        """
+        Initialize cached session
+
+        Args:
+            session: ONNX Runtime InferenceSession (anything with run())
+            max_bytes: Memory tier capacity in output bytes
+            spill_dir: Directory for the disk tier (None disables spilling);
+                       each CachedSession spills into its own subdirectory,
+                       so several sessions may share one spill_dir
+            spill_max_bytes: Disk tier capacity in bytes
+            copy_outputs: Return copies so callers may modify outputs;
+                          if False, cached arrays (memory maps for disk
+                          hits) are returned read-only
+        """
+        self.session = session
+        self.max_bytes = max_bytes
+        self.spill_max_bytes = spill_max_bytes
+        self.copy_outputs = copy_outputs
+        self.spill_dir = None
+        if spill_dir:
+            _reap_stale_spills(Path(spill_dir))
+            self.spill_dir = Path(spill_dir) / f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            (self.spill_dir / _SPILL_MARKER).touch()
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, List[np.ndarray]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._spilling: Dict[str, List[np.ndarray]] = {}  # evicted, being written
+        self._disk: "OrderedDict[str, Tuple[int, int]]" = OrderedDict()  # key -> (outputs, bytes)
+        self._disk_bytes = 0
+        self._pending: Dict[str, _Pending] = {}
+
+        self._stats = {
+            'requests': 0,
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'coalesced': 0,
+            'misses': 0,
+            'uncacheable': 0,
+            'bytes_saved': 0,
+            'evictions': 0,
+            'spills': 0,
+            'miss_time_s': 0.0,
+        }
+
+    def run(self, output_names: Optional[List[str]], input_feed: Dict[str, Any],
+            run_options: Any = None) -> List[np.ndarray]:
+        """
+        Run inference, serving repeated inputs from the cache
+
+        Args:
+            output_names: Output names (None for all outputs)
+            input_feed: Input name -> array
+            run_options: Passed through to session.run on a miss
+
+        Returns:
+            List of output arrays
+        """
+        key = hash_inputs(input_feed, output_names)
+
+        with self._lock:
+            self._stats['requests'] += 1
+            if key is None:
+                self._stats['uncacheable'] += 1
+                spilled = None
+            else:
+                outputs = self._lookup(key)
+                if outputs is not None:
+                    return self._deliver(outputs)
+                spilled = self._disk.get(key)
+                if spilled is not None:
+                    self._disk.move_to_end(key)
+
+        if key is None:
+            return self.session.run(output_names, input_feed, run_options)
+
+        if spilled is not None:
+            # Map the entry outside the lock; an unreadable one is dropped
+            outputs = self._load_spilled(key, spilled[0])
+            if outputs is not None:
+                with self._lock:
+                    self._stats['disk_hits'] += 1
+                    self._stats['bytes_saved'] += spilled[1]
+                return self._deliver(outputs)
+
+        with self._lock:
+            pending = self._pending.get(key)
+            owner = pending is None
+            if owner:
+                pending = _Pending()
+                self._pending[key] = pending
+                self._stats['misses'] += 1
+            else:
+                self._stats['coalesced'] += 1
+
+        if not owner:
+            # An identical request is already running
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            with self._lock:
+                self._stats['bytes_saved'] += _nbytes(pending.outputs)
+            return self._deliver(pending.outputs)
+
+        start = time.perf_counter()
+        evicted: List[Tuple[str, List[np.ndarray]]] = []
+        try:
+            outputs = [np.asarray(o) for o in self.session.run(output_names, input_feed, run_options)]
+            for output in outputs:
+                output.setflags(write=False)
+            pending.outputs = outputs
+        except BaseException as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                self._stats['miss_time_s'] += time.perf_counter() - start
+                del self._pending[key]
+                if pending.error is None:
+                    evicted = self._insert(key, pending.outputs)
+            pending.done.set()
+
+        self._spill(evicted)
+        return self._deliver(outputs)
+
+    def clear(self):
+        """Drop all cached entries, including the disk tier"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            paths = []
+            for key in list(self._disk):
+                paths += self._remove_spilled(key)
+        _unlink(paths)
+
+    def close(self):
+        """Drop all entries and remove this session's spill directory"""
+        self.clear()
+        if self.spill_dir is not None:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with hit ratio, bytes saved, tier occupancy and counters
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            served = stats['memory_hits'] + stats['disk_hits'] + stats['coalesced']
+            stats['hit_ratio'] = served / stats['requests'] if stats['requests'] else 0.0
+            mean_miss = stats['miss_time_s'] / stats['misses'] if stats['misses'] else 0.0
+            stats['time_saved_s'] = served * mean_miss
+            stats['memory_entries'] = len(self._memory)
+            stats['memory_bytes'] = self._memory_bytes
+            stats['disk_entries'] = len(self._disk)
+            stats['disk_bytes'] = self._disk_bytes
+            stats['hash'] = 'xxh3_128' if XXHASH_AVAILABLE else 'blake2b'
+            return stats
+
+    def __getattr__(self, name):
+        # Expose get_inputs(), get_outputs(), ... of the wrapped session
+        return getattr(self.session, name)
+
+    def _deliver(self, outputs: List[np.ndarray]) -> List[np.ndarray]:
+        if self.copy_outputs:
+            return [np.array(o) for o in outputs]
+        return list(outputs)
+
+    # Index bookkeeping (callers hold self._lock)
+
+    def _lookup(self, key: str) -> Optional[List[np.ndarray]]:
+        """Serve from memory, including entries still being spilled"""
+        outputs = self._memory.get(key)
+        if outputs is not None:
+            self._memory.move_to_end(key)
+        else:
+            outputs = self._spilling.get(key)
+        if outputs is not None:
+            self._stats['memory_hits'] += 1
+            self._stats['bytes_saved'] += _nbytes(outputs)
+        return outputs
+
+    def _insert(self, key: str, outputs: List[np.ndarray]) -> List[Tuple[str, List[np.ndarray]]]:
+        """Add to memory; returns evicted entries for _spill()"""
+        evicted = []
+        size = _nbytes(outputs)
+        if size > self.max_bytes:
+            return evicted
+        self._memory[key] = outputs
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_bytes:
+            old_key, old_outputs = self._memory.popitem(last=False)
+            self._memory_bytes -= _nbytes(old_outputs)
+            self._stats['evictions'] += 1
+            if self.spill_dir is not None and _nbytes(old_outputs) <= self.spill_max_bytes:
+                self._spilling[old_key] = old_outputs
+                evicted.append((old_key, old_outputs))
+        return evicted
+
+    def _remove_spilled(self, key: str) -> List[Path]:
+        """Forget a disk entry; returns its files for _unlink()"""
+        count, size = self._disk.pop(key)
+        self._disk_bytes -= size
+        return [self._spill_path(key, i) for i in range(count)]
+
+    def _spill_path(self, key: str, index: int) -> Path:
+        return self.spill_dir / f"{key}_{index}.npy"
+
+    # Disk I/O (called without self._lock)
+
+    def _spill(self, evicted: List[Tuple[str, List[np.ndarray]]]):
+        for key, outputs in evicted:
+            try:
+                for i, output in enumerate(outputs):
+                    # Write beside and rename, so readers holding a map of an
+                    # older file never see it truncated
+                    path = self._spill_path(key, i)
+                    partial = path.with_suffix('.tmp')
+                    with open(partial, 'wb') as f:
+                        np.save(f, output, allow_pickle=False)
+                    os.replace(partial, path)
+                written = True
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to spill cache entry: {e}")
+                written = False
+
+            stale = []
+            with self._lock:
+                del self._spilling[key]
+                if written:
+                    if key in self._disk:
+                        stale += self._remove_spilled(key)[len(outputs):]
+                    self._disk[key] = (len(outputs), _nbytes(outputs))
+                    self._disk_bytes += _nbytes(outputs)
+                    self._stats['spills'] += 1
+                    while self._disk_bytes > self.spill_max_bytes:
+                        stale += self._remove_spilled(next(iter(self._disk)))
+            _unlink(stale if written else [self._spill_path(key, i) for i in range(len(outputs))])
+
+    def _load_spilled(self, key: str, count: int) -> Optional[List[np.ndarray]]:
+        try:
+            # mmap_mode='r' arrays are read-only; pages load on first access
+            return [np.load(self._spill_path(key, i), mmap_mode='r', allow_pickle=False)
+                    for i in range(count)]
+        except Exception as e:
+            logger.warning(f"⚠️ Dropping unreadable cache entry: {e}")
+            with self._lock:
+                paths = self._remove_spilled(key) if key in self._disk else []
+            _unlink(paths)
+            return None
+
+
+def _unlink(paths: List[Path]):
+    for path in paths:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def _reap_stale_spills(spill_dir: Path):
+    """Delete spill subdirectories left behind by dead processes"""
+    if not spill_dir.is_dir():
+        return
+    for entry in spill_dir.iterdir():
+        match = _SPILL_SUBDIR.match(entry.name)
+        if match and (entry / _SPILL_MARKER).is_file() and not _pid_alive(int(match.group(1))):
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _nbytes(outputs: List[np.ndarray]) -> int:
+    return sum(o.nbytes for o in outputs)
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Shape Bucketing
+Serves variable-length inputs from a few static-shape sessions
+"""
+
+import bisect
+import logging
+import threading
+from collections import Counter, OrderedDict
+from typing import List, Optional, Dict, Any, Iterable, Mapping, Tuple, Union
+
+import numpy as np
+
+from .onnx_types import ONNX_TYPE_TO_DTYPE
+
+logger = logging.getLogger(__name__)
+
+Histogram = Union[Mapping[int, int], Iterable[int]]
+
+
+def _histogram(lengths: Histogram) -> List[Tuple[int, int]]:
+    """Normalize a histogram or a list of lengths to sorted (length, count)"""
+    if isinstance(lengths, Mapping):
+        counts = Counter({int(k): int(v) for k, v in lengths.items() if v > 0})
+    else:
+        counts = Counter(int(x) for x in lengths)
+    return sorted(counts.items())
+
+
+def suggest_buckets(lengths: Histogram, num_buckets: int) -> List[int]:
+    """
+    Choose bucket boundaries that minimize total padding
+
+    Every length is padded up to the smallest boundary >= it. The optimum
+    places boundaries on observed lengths, so a dynamic program over the
+    distinct lengths finds it exactly (O(num_buckets * distinct^2)).
+
+    Args:
+        lengths: Observed lengths, or a {length: count} histogram
+        num_buckets: Maximum number of buckets
+
+    Returns:
+        Sorted bucket boundaries (the largest equals the longest length)
+    """
+    hist = _histogram(lengths)
+    if not hist:
+        return []
+    if num_buckets < 1:
+        raise ValueError("num_buckets must be >= 1")
+    if num_buckets >= len(hist):
+        return [length for length, _ in hist]
+
+    n = len(hist)
+    values = [length for length, _ in hist]
+    # Prefix sums of counts and of count * length
+    count_sum = [0] * (n + 1)
+    weighted_sum = [0] * (n + 1)
+    for i, (length, count) in enumerate(hist):
+        count_sum[i + 1] = count_sum[i] + count
+        weighted_sum[i + 1] = weighted_sum[i] + count * length
+
+    def waste(i: int, j: int) -> int:
+        # Pad lengths i..j (inclusive) up to values[j]
+        return values[j] * (count_sum[j + 1] - count_sum[i]) - (weighted_sum[j + 1] - weighted_sum[i])
+
+    inf = float('inf')
+    # cost[b][j]: least waste covering lengths 0..j with b buckets, last boundary at j
+    cost = [[inf] * n for _ in range(num_buckets + 1)]
+    split = [[0] * n for _ in range(num_buckets + 1)]
+    for j in range(n):
+        cost[1][j] = waste(0, j)
+    for b in range(2, num_buckets + 1):
+        for j in range(b - 1, n):
+            best, best_i = inf, 0
+            for i in range(b - 2, j):
+                candidate = cost[b - 1][i] + waste(i + 1, j)
+                if candidate < best:
+                    best, best_i = candidate, i
+            cost[b][j] = best
+            split[b][j] = best_i
+
+    boundaries = []
+    j = n - 1
+    for b in range(num_buckets, 0, -1):
+        boundaries.append(values[j])
+        if b > 1:
+            j = split[b][j]
+    return sorted(boundaries)
+
+
+def padding_waste(lengths: Histogram, buckets: List[int]) -> Dict[str, float]:
+    """
+    Measure padding overhead of a bucket configuration
+
+    Args:
+        lengths: Observed lengths, or a {length: count} histogram
+        buckets: Bucket boundaries
+
+    Returns:
+        Dictionary with useful/padded element counts, waste ratio and overflow count
+    """
+    buckets = sorted(buckets)
+    useful = padded = overflow = 0
+    for length, count in _histogram(lengths):
+        index = bisect.bisect_left(buckets, length)
+        if index == len(buckets):
+            overflow += count
+            continue
+        useful += length * count
+        padded += buckets[index] * count
+    return {
+        'useful': useful,
+        'padded': padded,
+        'waste_ratio': (padded - useful) / padded if padded else 0.0,
+        'overflow': overflow,
+    }
+
+
+class _BucketSlot:
+    """Session, binding and input buffers of one bucket"""
+
+    def __init__(self, length: int, session: Any):
+        self.length = length
+        self.session = session
+        self.lock = threading.Lock()
+        # Padded input shapes -> (input buffers, IO binding), least recently used first
+        self.bindings: "OrderedDict[Tuple, Tuple[Dict[str, np.ndarray], Any]]" = OrderedDict()
+        self.requests = 0
+
+
+class BucketedSession:
+    """
+    Route variable-length requests to per-bucket static-shape sessions
+
+    Each bucket gets its own InferenceSession with the length dimension
+    fixed through a free-dimension override, plus preallocated input
+    buffers bound once through IO binding. Requests are padded into the
+    smallest bucket that fits and outputs are trimmed back.
+    """
+
+    def __init__(self,
+                 model_path: str,
+                 buckets: List[int],
+                 length_axes: Dict[str, int],
+                 output_axes: Optional[Dict[str, Tuple[int, float]]] = None,
+                 pad_values: Optional[Dict[str, Any]] = None,
+                 dim_overrides: Optional[Dict[str, int]] = None,
+                 providers: Optional[List[str]] = None,
+                 helper: Any = None,
+                 warmup: bool = True,
+                 max_bindings: int = 8):
+        """
+        Initialize bucketed session
+
+        Args:
+            model_path: Path to ONNX model
+            buckets: Length bucket boundaries
+            length_axes: Input name -> variable-length axis
+            output_axes: Output name -> (axis, ratio); the output is trimmed
+                         to ceil(length * ratio). By default only outputs
+                         declaring the bucketed input's symbolic length dim
+                         are trimmed (along that axis); other outputs are
+                         returned as-is unless listed here.
+            pad_values: Input name -> padding value (default 0)
+            dim_overrides: Extra symbolic dims to fix in every bucket (e.g. batch)
+            providers: Execution providers (default: ONNXHelper priority order)
+            helper: ONNXHelper for providers and session options
+            warmup: Run each bucket once with padding so first requests are fast
+            max_bindings: Buffer sets and IO bindings kept per bucket, one per
+                          distinct padded input shape (e.g. batch size)
+        """
+        import onnxruntime as ort
+
+        if not buckets:
+            raise ValueError("At least one bucket is required")
+
+        if helper is None:
+            from .onnx_helpers import ONNXHelper
+            helper = ONNXHelper()
+
+        self.model_path = str(model_path)
+        self.buckets = sorted(set(int(b) for b in buckets))
+        self.length_axes = dict(length_axes)
+        self.output_axes = dict(output_axes or {})
+        self.pad_values = dict(pad_values or {})
+        self.dim_overrides = dict(dim_overrides or {})
+        self.max_bindings = max(1, max_bindings)
+        self.providers = providers or helper.get_execution_providers()
+        self._helper = helper
+        self._ort = ort
+        self._lengths: Counter = Counter()
+        self._stats_lock = threading.Lock()
+        self._overflow_session = None
+        self._overflow_lock = threading.Lock()
+        self._overflow_requests = 0
+        self._padded_elements = 0
+        self._useful_elements = 0
+
+        probe = ort.InferenceSession(self.model_path, providers=['CPUExecutionProvider'])
+        self._inputs = {node.name: node for node in probe.get_inputs()}
+        self._output_names = [node.name for node in probe.get_outputs()]
+        self._length_dims = {}
+        for name, axis in self.length_axes.items():
+            if name not in self._inputs:
+                raise KeyError(f"Model has no input named {name}")
+            dim = self._inputs[name].shape[axis]
+            if isinstance(dim, str):
+                self._length_dims[name] = dim
+        # Outputs sharing a length dim name are trimmed along that axis
+        self._output_length_axes = {}
+        for node in probe.get_outputs():
+            axes = [axis for axis, dim in enumerate(node.shape)
+                    if isinstance(dim, str) and dim in self._length_dims.values()]
+            if axes:
+                self._output_length_axes[node.name] = axes[0]
+        del probe
+
+        self._slots = [_BucketSlot(length, self._create_session(length)) for length in self.buckets]
+        logger.info(f"✅ Created {len(self._slots)} bucket sessions: {self.buckets}")
+
+        if warmup:
+            for slot in self._slots:
+                self._run_slot(slot, self._warmup_feed(slot.length), None)
+                slot.requests = 0
+            with self._stats_lock:
+                self._padded_elements = self._useful_elements = 0
+
+    def _create_session(self, length: Optional[int]) -> Any:
+        """Create a session with the length dimension fixed (None leaves it dynamic)"""
+        options = self._helper.create_session_options()
+        if options is None:
+            options = self._ort.SessionOptions()
+        for dim_name, value in self.dim_overrides.items():
+            options.add_free_dimension_override_by_name(dim_name, int(value))
+        if length is not None:
+            for dim_name in set(self._length_dims.values()):
+                options.add_free_dimension_override_by_name(dim_name, int(length))
+        return self._ort.InferenceSession(self.model_path, sess_options=options,
+                                          providers=self.providers)
+
+    def _warmup_feed(self, length: int) -> Dict[str, np.ndarray]:
+        """Padding-only inputs of a given length"""
+        feed = {}
+        for name, node in self._inputs.items():
+            shape = []
+            for axis, dim in enumerate(node.shape):
+                if name in self.length_axes and axis == self.length_axes[name]:
+                    shape.append(length)
+                elif isinstance(dim, int) and dim > 0:
+                    shape.append(dim)
+                else:
+                    shape.append(self.dim_overrides.get(dim, 1))
+            dtype = np.dtype(ONNX_TYPE_TO_DTYPE.get(node.type, 'float32'))
+            feed[name] = np.full(shape, self.pad_values.get(name, 0), dtype=dtype)
+        return feed
+
+    def select_bucket(self, length: int) -> Optional[int]:
+        """
+        Find the smallest bucket that fits a length
+
+        Returns:
+            Bucket length, or None if the length exceeds every bucket
+        """
+        index = bisect.bisect_left(self.buckets, length)
+        return self.buckets[index] if index < len(self.buckets) else None
+
+    def run(self, output_names: Optional[List[str]], input_feed: Dict[str, np.ndarray]) -> List[np.ndarray]:
+        """
+        Run inference on variable-length inputs
+
+        Args:
+            output_names: Output names (None for all outputs)
+            input_feed: Input name -> array with the request's true length
+
+        Returns:
+            List of outputs trimmed to the request length
+        """
+        lengths = {input_feed[name].shape[axis] for name, axis in self.length_axes.items()
+                   if name in input_feed}
+        if len(lengths) != 1:
+            raise ValueError(f"Length axes disagree or are missing: {sorted(lengths)}")
+        length = lengths.pop()
+
+        with self._stats_lock:
+            self._lengths[length] += 1
+
+        bucket = self.select_bucket(length)
+        if bucket is None:
+            return self._run_overflow(output_names, input_feed, length)
+
+        slot = self._slots[self.buckets.index(bucket)]
+        outputs = self._run_slot(slot, input_feed, output_names)
+        names = output_names or self._output_names
+        return [self._trim(name, output, length) for name, output in zip(names, outputs)]
+
+    def _run_slot(self, slot: _BucketSlot, input_feed: Dict[str, np.ndarray],
+                  output_names: Optional[List[str]]) -> List[np.ndarray]:
+        """Pad into the slot's buffers and run through its IO binding"""
+        shapes = {}
+        for name, value in input_feed.items():
+            shape = list(value.shape)
+            if name in self.length_axes:
+                shape[self.length_axes[name]] = slot.length
+            shapes[name] = tuple(shape)
+        key = tuple(sorted(shapes.items()))
+
+        with slot.lock:
+            if key in slot.bindings:
+                slot.bindings.move_to_end(key)
+                buffers, binding = slot.bindings[key]
+            else:
+                buffers = {name: np.empty(shape, dtype=input_feed[name].dtype)
+                           for name, shape in shapes.items()}
+                binding = slot.session.io_binding()
+                for name, buffer in buffers.items():
+                    binding.bind_cpu_input(name, buffer)
+                slot.bindings[key] = (buffers, binding)
+                while len(slot.bindings) > self.max_bindings:
+                    slot.bindings.popitem(last=False)
+
+            useful = padded = 0
+            for name, value in input_feed.items():
+                buffer = buffers[name]
+                if name not in self.length_axes:
+                    buffer[...] = value
+                    continue
+                axis = self.length_axes[name]
+                length = value.shape[axis]
+                head = [slice(None)] * value.ndim
+                head[axis] = slice(0, length)
+                buffer[tuple(head)] = value
+                # Only the tail needs padding
+                if length < slot.length:
+                    tail = [slice(None)] * value.ndim
+                    tail[axis] = slice(length, None)
+                    buffer[tuple(tail)] = self.pad_values.get(name, 0)
+                useful += value.size
+                padded += buffer.size
+
+            binding.clear_binding_outputs()
+            for name in output_names or self._output_names:
+                binding.bind_output(name)
+            slot.session.run_with_iobinding(binding)
+            outputs = binding.copy_outputs_to_cpu()
+            slot.requests += 1
+
+        with self._stats_lock:
+            self._useful_elements += useful
+            self._padded_elements += padded
+        return outputs
+
+    def _trim(self, name: str, output: np.ndarray, length: int) -> np.ndarray:
+        """Cut an output back to the request length"""
+        if name in self.output_axes:
+            axis, ratio = self.output_axes[name]
+            keep = int(np.ceil(length * ratio))
+        elif name in self._output_length_axes:
+            axis, keep = self._output_length_axes[name], length
+        else:
+            return output
+        index = [slice(None)] * output.ndim
+        index[axis] = slice(0, keep)
+        return output[tuple(index)]
+
+    def _run_overflow(self, output_names, input_feed, length: int) -> List[np.ndarray]:
+        """Run lengths beyond the largest bucket on a dynamic-shape session"""
+        with self._overflow_lock:
+            if self._overflow_session is None:
+                logger.warning(f"⚠️ Length {length} exceeds largest bucket "
+                               f"{self.buckets[-1]}, using dynamic-shape session")
+                self._overflow_session = self._create_session(None)
+            self._overflow_requests += 1
+        return self._overflow_session.run(output_names, input_feed)
+
+    def get_length_histogram(self) -> Dict[int, int]:
+        """Get the observed request length histogram"""
+        with self._stats_lock:
+            return dict(self._lengths)
+
+    def suggest_buckets(self, num_buckets: Optional[int] = None) -> List[int]:
+        """
+        Suggest bucket boundaries from observed request lengths
+
+        Args:
+            num_buckets: Bucket count (default: current count)
+
+        Returns:
+            Boundaries minimizing padding for the traffic seen so far
+        """
+        return suggest_buckets(self.get_length_histogram(), num_buckets or len(self.buckets))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get bucketing statistics
+
+        Returns:
+            Dictionary with per-bucket request counts, padding waste and overflow count
+        """
+        with self._stats_lock:
+            padded, useful = self._padded_elements, self._useful_elements
+        return {
+            'buckets': {slot.length: slot.requests for slot in self._slots},
+            'overflow': self._overflow_requests,
+            'padding_waste': (padded - useful) / padded if padded else 0.0,
+            'requests': sum(self.get_length_histogram().values()),
+        }
@@ -0,0 +1,347 @@
+"""
+Weight Streamer
+Streams memory-mapped weight files into NPU buffer objects in fixed-size chunks
+"""
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Union
+
+# How often the prefetch thread re-checks for shutdown (seconds)
+_POLL_INTERVAL = 0.05
+
+
+class WeightSegment(NamedTuple):
+    """A contiguous byte range of a weight file destined for one BO"""
+    name: str
+    path: str
+    offset: int
+    length: int
+
+
+def read_raw_index(path: Union[str, Path], name: Optional[str] = None,
+                   offset: int = 0, length: Optional[int] = None) -> List[WeightSegment]:
+    """
+    Describe a raw weight file (or a byte range of it)
+
+    Args:
+        path: Weight file
+        name: Segment name (default: file name)
+        offset: Start offset in bytes
+        length: Length in bytes (default: to end of file)
+
+    Returns:
+        Single-element list of WeightSegment
+    """
+    path = Path(path)
+    size = path.stat().st_size
+    if length is None:
+        length = size - offset
+    if offset < 0 or length < 0 or offset + length > size:
+        raise ValueError(f"Range {offset}+{length} outside {path} ({size} bytes)")
+    return [WeightSegment(name or path.name, str(path), offset, length)]
+
+
+def read_safetensors_index(path: Union[str, Path],
+                           names: Optional[Iterable[str]] = None) -> List[WeightSegment]:
+    """
+    Describe the tensors of a safetensors file
+
+    Args:
+        path: .safetensors file
+        names: Only include these tensors (default: all)
+
+    Returns:
+        List of WeightSegment in file order
+    """
+    path = Path(path)
+    with open(path, 'rb') as f:
+        header_size = struct.unpack('<Q', f.read(8))[0]
+        header = json.loads(f.read(header_size))
+
+    data_start = 8 + header_size
+    wanted = set(names) if names is not None else None
+    segments = []
+    for name, entry in header.items():
+        if name == '__metadata__' or (wanted is not None and name not in wanted):
+            continue
+        begin, end = entry['data_offsets']
+        segments.append(WeightSegment(name, str(path), data_start + begin, end - begin))
+
+    if wanted is not None:
+        missing = wanted - {s.name for s in segments}
+        if missing:
+            raise KeyError(f"Tensors not in {path}: {sorted(missing)}")
+
+    return sorted(segments, key=lambda s: s.offset)
+
+
+def read_onnx_external_data_index(model_path: Union[str, Path],
+                                  names: Optional[Iterable[str]] = None) -> List[WeightSegment]:
+    """
+    Describe the externally stored initializers of an ONNX model
+
+    Requires the onnx package; the external data itself is not loaded.
+
+    Args:
+        model_path: .onnx model saved with external data
+        names: Only include these initializers (default: all)
+
+    Returns:
+        List of WeightSegment ordered by file and offset
+    """
+    try:
+        import onnx
+    except ImportError:
+        raise ImportError("onnx is required to read ONNX external data (pip install onnx)")
+
+    model_path = Path(model_path)
+    model = onnx.load(str(model_path), load_external_data=False)
+    wanted = set(names) if names is not None else None
+
+    segments = []
+    for tensor in model.graph.initializer:
+        if tensor.data_location != onnx.TensorProto.EXTERNAL:
+            continue
+        if wanted is not None and tensor.name not in wanted:
+            continue
+        info = {entry.key: entry.value for entry in tensor.external_data}
+        data_path = model_path.parent / info['location']
+        offset = int(info.get('offset', 0))
+        length = int(info['length']) if 'length' in info else \
+            data_path.stat().st_size - offset
+        segments.append(WeightSegment(tensor.name, str(data_path), offset, length))
+
+    if wanted is not None:
+        missing = wanted - {s.name for s in segments}
+        if missing:
+            raise KeyError(f"External initializers not in {model_path}: {sorted(missing)}")
+
+    return sorted(segments, key=lambda s: (s.path, s.offset))
+
+
+def current_rss() -> int:
+    """Get current resident set size of this process in bytes"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * mmap.PAGESIZE
+    except (OSError, ValueError, IndexError):
+        import resource
+        # ru_maxrss is the lifetime peak (KiB on Linux), the best we can do here
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class _MappedFile:
+    """Read-only mapping of a weight file"""
+
+    def __init__(self, path: str):
+        self.file = open(path, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        self.mmap = mmap.mmap(self.file.fileno(), size, access=mmap.ACCESS_READ) if size else None
+        self.view = memoryview(self.mmap) if self.mmap is not None else memoryview(b'')
+
+    def prefetch(self, offset: int, length: int):
+        """Ask the kernel to read ahead, then fault the pages in"""
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(self.file.fileno(), offset, length, os.POSIX_FADV_WILLNEED)
+        start, span = self._page_range(offset, length)
+        if hasattr(self.mmap, 'madvise'):
+            self.mmap.madvise(mmap.MADV_WILLNEED, start, span)
+        # Touch one byte per page
+        self.view[start:start + span:mmap.PAGESIZE].tobytes()
+
+    def release(self, offset: int, length: int):
+        """Drop pages of a range that has been copied to the device"""
+        start, span = self._page_range(offset, length)
+        if hasattr(self.mmap, 'madvise'):
+            self.mmap.madvise(mmap.MADV_DONTNEED, start, span)
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(self.file.fileno(), offset, length, os.POSIX_FADV_DONTNEED)
+
+    @staticmethod
+    def _page_range(offset: int, length: int):
+        start = offset - (offset % mmap.PAGESIZE)
+        return start, offset + length - start
+
+    def close(self):
+        self.view.release()
+        if self.mmap is not None:
+            self.mmap.close()
+        self.file.close()
+
+
+class WeightStreamer:
+    """
+    Stream weight files into device buffers with bounded host residency
+
+    A background thread reads ahead up to max_resident_bytes of mapped
+    file pages. The caller's thread writes each chunk into its BO, syncs
+    that range to the device and drops the pages before the next chunk
+    is admitted, so resident weight pages never exceed the cap.
+    """
+
+    def __init__(self,
+                 npu,
+                 chunk_size: int = 4 << 20,
+                 max_resident_bytes: int = 64 << 20):
+        """
+        Initialize weight streamer
+
+        Args:
+            npu: Open runtime.xrt_wrapper.NPUDevice (or anything with allocate_bo)
+            chunk_size: Bytes copied per BO write/sync
+            max_resident_bytes: Cap on prefetched, not-yet-copied weight pages
+        """
+        if chunk_size < mmap.PAGESIZE or chunk_size % mmap.PAGESIZE:
+            raise ValueError(f"chunk_size must be a multiple of {mmap.PAGESIZE}")
+        if max_resident_bytes < chunk_size:
+            raise ValueError("max_resident_bytes must hold at least one chunk")
+
+        self.npu = npu
+        self.chunk_size = chunk_size
+        self.max_resident_bytes = max_resident_bytes
+        self.window_chunks = max_resident_bytes // chunk_size
+        self.last_stats: Optional[Dict[str, Any]] = None
+
+    def stream_file(self, path: Union[str, Path], offset: int = 0,
+                    length: Optional[int] = None) -> Any:
+        """
+        Stream a raw weight file (or byte range) into one BO
+
+        Returns:
+            Buffer object holding the weights
+        """
+        segments = read_raw_index(path, offset=offset, length=length)
+        return self.stream_segments(segments)[segments[0].name]
+
+    def stream_safetensors(self, path: Union[str, Path],
+                           names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Stream tensors of a safetensors file into one BO each
+
+        Returns:
+            Tensor name -> buffer object
+        """
+        return self.stream_segments(read_safetensors_index(path, names))
+
+    def stream_onnx_external_data(self, model_path: Union[str, Path],
+                                  names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Stream externally stored ONNX initializers into one BO each
+
+        Returns:
+            Initializer name -> buffer object
+        """
+        return self.stream_segments(read_onnx_external_data_index(model_path, names))
+
+    def stream_segments(self, segments: Iterable[WeightSegment]) -> Dict[str, Any]:
+        """
+        Stream weight segments into freshly allocated BOs
+
+        Args:
+            segments: Segments to stream (one BO per segment)
+
+        Returns:
+            Segment name -> buffer object
+        """
+        segments = list(segments)
+        to_device = self.npu.xrt.xclBOSyncDirection.XCL_BO_SYNC_BO_TO_DEVICE
+
+        plan = []
+        for segment in segments:
+            for bo_offset in range(0, segment.length, self.chunk_size):
+                size = min(self.chunk_size, segment.length - bo_offset)
+                plan.append((segment, segment.offset + bo_offset, size, bo_offset))
+
+        files = {}
+        stop = threading.Event()
+        window = threading.Semaphore(self.window_chunks)
+        ready = [threading.Event() for _ in plan]
+        errors: List[BaseException] = []
+        stats = {
+            'segments': len(segments),
+            'chunks': len(plan),
+            'bytes': 0,
+            'chunk_size': self.chunk_size,
+            'max_resident_bytes': self.max_resident_bytes,
+            'rss_start_bytes': current_rss(),
+            'peak_rss_bytes': 0,
+            'peak_window_bytes': 0,
+            'prefetch_stall_s': 0.0,
+        }
+
+        def prefetcher():
+            try:
+                for i, (segment, offset, size, _) in enumerate(plan):
+                    while not window.acquire(timeout=_POLL_INTERVAL):
+                        if stop.is_set():
+                            return
+                    if stop.is_set():
+                        return
+                    files[segment.path].prefetch(offset, size)
+                    ready[i].set()
+            except BaseException as e:
+                errors.append(e)
+                stop.set()
+
+        start = time.perf_counter()
+        thread = threading.Thread(target=prefetcher, name='npu-weight-prefetch', daemon=True)
+        try:
+            for segment in segments:
+                if segment.path not in files:
+                    files[segment.path] = _MappedFile(segment.path)
+            bos = {s.name: self.npu.allocate_bo(max(s.length, 1)) for s in segments}
+
+            thread.start()
+            for i, (segment, offset, size, bo_offset) in enumerate(plan):
+                wait_start = time.perf_counter()
+                while not ready[i].wait(_POLL_INTERVAL):
+                    if errors:
+                        raise RuntimeError(f"Weight prefetch failed: {errors[0]}") from errors[0]
+                stats['prefetch_stall_s'] += time.perf_counter() - wait_start
+
+                # Prefetched pages not yet copied, including this chunk
+                in_window = sum(plan[j][2] for j in range(i, min(i + self.window_chunks, len(plan)))
+                                if ready[j].is_set())
+                stats['peak_window_bytes'] = max(stats['peak_window_bytes'], in_window)
+                stats['peak_rss_bytes'] = max(stats['peak_rss_bytes'], current_rss())
+
+                mapped = files[segment.path]
+                bo = bos[segment.name]
+                chunk = mapped.view[offset:offset + size]
+                try:
+                    bo.write(chunk, bo_offset)
+                finally:
+                    chunk.release()
+                bo.sync(to_device, size, bo_offset)
+
+                mapped.release(offset, size)
+                window.release()
+                stats['bytes'] += size
+        finally:
+            stop.set()
+            if thread.is_alive():
+                thread.join()
+            for mapped in files.values():
+                mapped.close()
+
+            elapsed = time.perf_counter() - start
+            stats['seconds'] = elapsed
+            stats['bytes_per_s'] = stats['bytes'] / elapsed if elapsed > 0 else 0.0
+            stats['peak_rss_bytes'] = max(stats['peak_rss_bytes'], current_rss())
+            self.last_stats = stats
+
+        return bos
+
+    def get_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        Get statistics of the last stream
+
+        Returns:
+            Dictionary with bytes, bytes_per_s, peak RSS and prefetch stall time
+        """
+        return self.last_stats
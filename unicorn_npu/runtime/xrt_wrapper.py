@@ -5,7 +5,7 @@ Provides simplified interface to AMD XRT for NPU acceleration
 import sys
 import os
 from pathlib import Path
-from typing import Optional, Union
+from typing import Optional, Union, Callable, Sequence
 
 # Add XRT Python bindings to path
 XRT_PYTHON_PATH = "/opt/xilinx/xrt/python"
@@ -19,32 +19,59 @@ except ImportError:
     xrt = None
     XRT_AVAILABLE = False
 
+# Backend used when NPUDevice is not given one: "xrt" (pyxrt) or "emulator"
+DEFAULT_BACKEND = os.environ.get('UNICORN_NPU_BACKEND', 'xrt').lower()
+BACKENDS = ('xrt', 'emulator')
+
+
+def get_backend_module(backend: Optional[str] = None):
+    """
+    Get the pyxrt-compatible module for a backend
+
+    Args:
+        backend: "xrt" or "emulator" (default: UNICORN_NPU_BACKEND, then "xrt")
+
+    Returns:
+        pyxrt, or the software emulator module
+    """
+    backend = (backend or DEFAULT_BACKEND).lower()
+    if backend == 'emulator':
+        from . import npu_emulator
+        return npu_emulator
+    if backend != 'xrt':
+        raise ValueError(f"Unknown NPU backend: {backend} (expected one of {BACKENDS})")
+    if not XRT_AVAILABLE:
+        raise RuntimeError(
+            "XRT Python bindings not available. "
+            f"Expected at: {XRT_PYTHON_PATH}"
+        )
+    return xrt
+
 
 class NPUDevice:
     """Wrapper for AMD Phoenix NPU access via XRT"""
 
-    def __init__(self, device_index: int = 0):
+    def __init__(self, device_index: int = 0, backend: Optional[str] = None):
         """
         Initialize NPU device
 
         Args:
             device_index: NPU device index (default: 0 for /dev/accel/accel0)
+            backend: "xrt" or "emulator" (default: UNICORN_NPU_BACKEND, then "xrt")
         """
-        if not XRT_AVAILABLE:
-            raise RuntimeError(
-                "XRT Python bindings not available. "
-                f"Expected at: {XRT_PYTHON_PATH}"
-            )
-
+        self.backend = (backend or DEFAULT_BACKEND).lower()
+        self.xrt = get_backend_module(self.backend)
         self.device_index = device_index
         self.device = None
         self.xclbin_uuid = None
+        self.hw_context = None
+        self._kernels = {}
         self._open_device()
 
     def _open_device(self):
         """Open NPU device"""
         try:
-            self.device = xrt.device(self.device_index)
+            self.device = self.xrt.device(self.device_index)
             print(f"✅ NPU device {self.device_index} opened successfully")
         except Exception as e:
             raise RuntimeError(f"Failed to open NPU device {self.device_index}: {e}")
@@ -66,18 +93,22 @@ class NPUDevice:
 
         try:
             self.xclbin_uuid = self.device.load_xclbin(xclbin_path)
+            self.hw_context = None
+            self._kernels = {}
             print(f"✅ XCLBIN loaded successfully")
             print(f"   UUID: {self.xclbin_uuid}")
             return str(self.xclbin_uuid)
         except Exception as e:
             raise RuntimeError(f"Failed to load XCLBIN: {e}")
 
-    def allocate_bo(self, size: int):
+    def allocate_bo(self, size: int, group_id: int = 0, flags=None):
         """
         Allocate buffer object on NPU
 
         Args:
             size: Buffer size in bytes
+            group_id: Memory bank (usually kernel.group_id(arg_index))
+            flags: BO flags (default: xrt.bo.normal)
 
         Returns:
             Buffer object
@@ -85,11 +116,84 @@ class NPUDevice:
         if self.device is None:
             raise RuntimeError("Device not opened")
 
-        return xrt.bo(self.device, size, xrt.bo.normal, 0)
+        if flags is None:
+            flags = self.xrt.bo.normal
+        return self.xrt.bo(self.device, size, flags, group_id)
+
+    def get_kernel(self, kernel_name: str):
+        """
+        Get a kernel from the loaded XCLBIN
+
+        Args:
+            kernel_name: Kernel name in the XCLBIN
+
+        Returns:
+            Kernel object (cached per name)
+        """
+        if self.device is None:
+            raise RuntimeError("Device not opened")
+        if self.xclbin_uuid is None:
+            raise RuntimeError("No XCLBIN loaded")
+
+        if kernel_name not in self._kernels:
+            try:
+                if hasattr(self.xrt, 'hw_context'):
+                    if self.hw_context is None:
+                        self.hw_context = self.xrt.hw_context(self.device, self.xclbin_uuid)
+                    kernel = self.xrt.kernel(self.hw_context, kernel_name)
+                else:
+                    kernel = self.xrt.kernel(self.device, self.xclbin_uuid, kernel_name)
+            except Exception as e:
+                raise RuntimeError(f"Failed to open kernel {kernel_name}: {e}")
+            self._kernels[kernel_name] = kernel
+
+        return self._kernels[kernel_name]
+
+    def create_runner(self,
+                      kernel_name: str,
+                      input_size: int,
+                      output_size: int,
+                      num_buffers: int = 2,
+                      input_arg: int = 0,
+                      output_arg: int = 1,
+                      arg_builder: Optional[Callable[..., Sequence]] = None,
+                      output_dtype: str = 'uint8'):
+        """
+        Create a pipelined kernel runner
+
+        Args:
+            kernel_name: Kernel name in the loaded XCLBIN
+            input_size: Input chunk size in bytes
+            output_size: Output chunk size in bytes
+            num_buffers: BO sets to rotate through (2 = ping-pong)
+            input_arg: Kernel argument index of the input BO
+            output_arg: Kernel argument index of the output BO
+            arg_builder: Callable (input_bo, output_bo) -> kernel args
+                         (default: (input_bo, output_bo))
+            output_dtype: NumPy dtype of returned output chunks
+
+        Returns:
+            PipelinedKernelRunner
+        """
+        from .kernel_runner import PipelinedKernelRunner
+
+        return PipelinedKernelRunner(
+            self,
+            self.get_kernel(kernel_name),
+            input_size=input_size,
+            output_size=output_size,
+            num_buffers=num_buffers,
+            input_arg=input_arg,
+            output_arg=output_arg,
+            arg_builder=arg_builder,
+            output_dtype=output_dtype
+        )
 
     def close(self):
         """Close NPU device"""
         if self.device:
+            self._kernels = {}
+            self.hw_context = None
             self.device = None
             print("✅ NPU device closed")
 
@@ -174,17 +278,18 @@ def get_xrt_version() -> Optional[str]:
 
 
 # Module-level convenience functions
-def open_npu(device_index: int = 0) -> NPUDevice:
+def open_npu(device_index: int = 0, backend: Optional[str] = None) -> NPUDevice:
     """
     Convenience function to open NPU device
 
     Args:
         device_index: NPU device index
+        backend: "xrt" or "emulator" (default: UNICORN_NPU_BACKEND, then "xrt")
 
     Returns:
         NPUDevice instance
     """
-    return NPUDevice(device_index)
+    return NPUDevice(device_index, backend=backend)
 
 
 __all__ = [
@@ -193,5 +298,6 @@ __all__ = [
     'check_xrt_available',
     'get_xrt_version',
     'open_npu',
+    'get_backend_module',
     'XRT_AVAILABLE'
 ]
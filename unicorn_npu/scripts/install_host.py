@@ -5,9 +5,42 @@ Callable from any Unicorn project for automated NPU installation
 """
 
 import os
+import grp
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import collections
 import subprocess
 import sys
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable, Dict, List, Optional, Any
+
+RELEASE_VERSION = "v1.0.0"
+GITHUB_REPO = "Unicorn-Commander/unicorn-npu-core"
+RELEASE_URL = f"https://github.com/{GITHUB_REPO}/releases/download/{RELEASE_VERSION}"
+# SHA-256 of the release's checksums.txt, pinned so a downloaded copy can be trusted
+CHECKSUMS_SHA256 = "520cece6011b87f0fc53b83e8e7653f2b9635491a9b21554916e70311e9a1f1b"
+
+# Prebuilt artifacts, as listed in releases/<version>/checksums.txt
+XRT_PACKAGES = [
+    "xrt/xrt-base_2.20.0_amd64.deb",
+    "xrt/xrt-npu_2.20.0_amd64.deb",
+    "xrt/xrt_plugin-amdxdna_2.20_amd64.deb",
+]
+KERNEL_MODULE_TEMPLATE = "kernel-modules/amdxdna-{kernel}.ko.zst"
+XDNA_DRIVER_REPO = "https://github.com/amd/xdna-driver"
+PREBUILT_UBUNTU_VERSIONS = ("22.04", "24.04")
+
+UDEV_RULE = 'SUBSYSTEM=="accel", MODE="0666"\n'
+NPU_GROUPS = ("render", "video")
+STATE_VERSION = 1
+# Output lines of a streamed command kept for the state file
+STREAM_TAIL_LINES = 20
 
 
 def get_script_path() -> Path:
@@ -25,37 +58,617 @@ def get_script_path() -> Path:
     return script_path
 
 
-def main():
-    """Run NPU host installation"""
-    print("🦄 Unicorn NPU Core - Host System Setup")
-    print("=" * 50)
+def get_release_dir(version: str = RELEASE_VERSION) -> Path:
+    """Get path to the bundled releases/<version> directory"""
+    return get_script_path().parent.parent / "releases" / version
+
+
+def parse_checksums(path: Path) -> Dict[str, str]:
+    """
+    Parse a sha256sum-style checksums file
+
+    Args:
+        path: checksums.txt
+
+    Returns:
+        Relative artifact path -> hex SHA-256
+    """
+    checksums = {}
+    with open(path, 'r') as f:
+        for line in f:
+            parts = line.split(None, 1)
+            if len(parts) != 2:
+                continue
+            digest, name = parts
+            name = name.strip().lstrip('*')
+            if name.startswith('./'):
+                name = name[2:]
+            checksums[name] = digest.lower()
+    return checksums
+
+
+def sha256_file(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Stream a file through SHA-256 (hashlib releases the GIL per chunk)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_os_version(root: Path) -> str:
+    """VERSION_ID from <root>/etc/os-release, or 'unknown'"""
+    try:
+        with open(root / "etc" / "os-release", 'r') as f:
+            for line in f:
+                if line.startswith("VERSION_ID="):
+                    return line.split("=", 1)[1].strip().strip('"')
+    except OSError:
+        pass
+    return "unknown"
+
+
+class InstallState:
+    """JSON state file recording verified artifacts and finished steps"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.data: Dict[str, Any] = {'version': STATE_VERSION, 'release': RELEASE_VERSION,
+                                     'verified': {}, 'steps': {}}
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == STATE_VERSION and data.get('release') == RELEASE_VERSION:
+                self.data = data
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable install state: {e}")
+
+    @property
+    def steps(self) -> Dict[str, Any]:
+        return self.data['steps']
+
+    @property
+    def verified(self) -> Dict[str, Any]:
+        return self.data['verified']
+
+    def save(self):
+        """Write atomically so an interruption never leaves a torn file"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class PrebuiltInstaller:
+    """
+    Resumable prebuilt installation of XRT and the amdxdna kernel module
+
+    Every step's outcome and duration is recorded in a state file after it
+    finishes, so an interrupted run resumes at the first unfinished step.
+    Verified artifacts are remembered by size and mtime and not re-hashed.
+
+    All system paths live under root. With a root other than '/', packages
+    are unpacked with dpkg-deb and host-level actions (modprobe, usermod,
+    udevadm) are skipped, which allows running against a scratch rootfs.
+    """
+
+    STEPS = ("verify", "xrt", "kernel_module", "permissions", "check")
+
+    def __init__(self,
+                 root: str = "/",
+                 release_dir: Optional[str] = None,
+                 state_path: Optional[str] = None,
+                 kernel_version: Optional[str] = None,
+                 download: bool = True,
+                 force: bool = False,
+                 jobs: Optional[int] = None,
+                 user: Optional[str] = None):
+        """
+        Initialize installer
+
+        Args:
+            root: Root filesystem to install into
+            release_dir: Directory holding checksums.txt and artifacts
+                         (default: bundled releases/v1.0.0 when present,
+                         else checksums.txt is downloaded and checked
+                         against CHECKSUMS_SHA256)
+            state_path: State file (default: <root>/var/lib/unicorn-npu/install-state.json)
+            kernel_version: Target kernel (default: running kernel)
+            download: Fetch artifacts missing locally from the GitHub release
+            force: Redo every step and re-hash every artifact
+            jobs: Parallel hashing workers (default: min(8, CPUs))
+            user: User to add to the NPU groups (default: $SUDO_USER or $USER)
+        """
+        self.root = Path(root)
+        self.system_root = self.root.resolve() == Path("/")
+        self.release_dir = Path(release_dir) if release_dir else None
+        self.cache_dir = self.root / "var" / "cache" / "unicorn-npu" / RELEASE_VERSION
+        self.state = InstallState(Path(state_path) if state_path else
+                                  self.root / "var" / "lib" / "unicorn-npu" / "install-state.json")
+        self.kernel_version = kernel_version or os.uname().release
+        self.download = download
+        self.force = force
+        self.jobs = jobs or min(8, os.cpu_count() or 1)
+        self.user = user or os.environ.get("SUDO_USER") or os.environ.get("USER")
+        self.checksums = parse_checksums(self._checksums_path())
+        self.artifacts: Dict[str, Path] = {}
+        self._previous: Dict[str, Any] = {}
+
+    def _checksums_path(self) -> Path:
+        """Locate checksums.txt, downloading and pinning it for installed packages"""
+        if self.release_dir is not None:
+            path = self.release_dir / "checksums.txt"
+            if not path.exists():
+                raise FileNotFoundError(f"checksums.txt not found in {self.release_dir}")
+            return path
+
+        bundled = get_release_dir()
+        if (bundled / "checksums.txt").exists():
+            self.release_dir = bundled
+            return bundled / "checksums.txt"
+
+        # Installed package without the repository's releases/ directory
+        self.release_dir = self.cache_dir
+        path = self.cache_dir / "checksums.txt"
+        if not path.exists():
+            if not self.download:
+                raise FileNotFoundError(f"checksums.txt not found in {bundled} or {self.cache_dir}; "
+                                        "pass --release-dir or allow downloads")
+            self._download("checksums.txt", path)
+        if sha256_file(path) != CHECKSUMS_SHA256:
+            path.unlink()
+            raise RuntimeError(f"Downloaded checksums.txt does not match the pinned "
+                               f"{RELEASE_VERSION} manifest")
+        return path
+
+    def _path(self, absolute: str) -> Path:
+        """Map an absolute system path into the target root"""
+        return self.root / absolute.lstrip("/")
+
+    @property
+    def kernel_module_artifact(self) -> str:
+        return KERNEL_MODULE_TEMPLATE.format(kernel=self.kernel_version)
+
+    @property
+    def kernel_module_target(self) -> Path:
+        return self._path(f"/lib/modules/{self.kernel_version}/updates/dkms/amdxdna.ko.zst")
+
+    @property
+    def xrt_smi(self) -> Path:
+        return self._path("/opt/xilinx/xrt/bin/xrt-smi")
+
+    def _command(self, args: List[str], input: Optional[str] = None,
+                 cwd: Optional[Path] = None, privileged: bool = True) -> subprocess.CompletedProcess:
+        """Run a command, through sudo when installing into / as non-root"""
+        if privileged and self.system_root and os.geteuid() != 0:
+            args = ["sudo"] + args
+        return subprocess.run(args, check=True, capture_output=True, text=True,
+                              input=input, cwd=cwd)
+
+    def _stream(self, args: List[str], cwd: Optional[Path] = None,
+                privileged: bool = True) -> List[str]:
+        """
+        Run a long command, echoing its output as it arrives
+
+        Returns:
+            The last STREAM_TAIL_LINES lines of output; on failure they are
+            the CalledProcessError's stderr, which ends up in the state file
+        """
+        if privileged and self.system_root and os.geteuid() != 0:
+            args = ["sudo"] + args
+        tail: "collections.deque[str]" = collections.deque(maxlen=STREAM_TAIL_LINES)
+        with subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                              text=True, cwd=cwd) as process:
+            for line in process.stdout:
+                line = line.rstrip()
+                tail.append(line)
+                print(f"      {line}", flush=True)
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, args, stderr="\n".join(tail))
+        return list(tail)
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run all steps, skipping those already completed
+
+        Returns:
+            Step name -> state entry (status, elapsed_s, details)
+        """
+        steps = {
+            "verify": self._step_verify,
+            "xrt": self._step_xrt,
+            "kernel_module": self._step_kernel_module,
+            "permissions": self._step_permissions,
+            "check": self._step_check,
+        }
+        self._previous = dict(self.state.steps)
+        for name in self.STEPS:
+            self._run_step(name, steps[name])
+        return {name: self.state.steps.get(name) for name in self.STEPS}
+
+    def _run_step(self, name: str, step: Callable[[], Dict[str, Any]]):
+        """Run one step, recording its status and duration in the state file"""
+        print(f"\n▶️ {name}")
+
+        self.state.steps[name] = {'status': 'running', 'started': time.time()}
+        self.state.save()
+
+        start = time.perf_counter()
+        try:
+            details = step()
+        except Exception as e:
+            error = str(e)
+            if isinstance(e, subprocess.CalledProcessError) and e.stderr:
+                error += f": {e.stderr.strip()}"
+            self.state.steps[name] = {'status': 'failed', 'error': error,
+                                      'elapsed_s': time.perf_counter() - start}
+            self.state.save()
+            print(f"   ❌ {error}")
+            raise
+
+        status = details.pop('status', 'done')
+        entry = {'status': status, 'elapsed_s': time.perf_counter() - start,
+                 'finished': time.time(), 'details': details}
+        self.state.steps[name] = entry
+        self.state.save()
+        print(f"   {status} in {entry['elapsed_s']:.2f}s")
+
+    def _step_verify(self) -> Dict[str, Any]:
+        """Locate (or download) artifacts of components still to install and verify them"""
+        required, installed = [], []
+        if not self.force and self._xrt_installed():
+            installed.append("xrt")
+        else:
+            required += XRT_PACKAGES
+        if self.kernel_module_artifact not in self.checksums:
+            print(f"   ⚠️ No prebuilt kernel module for {self.kernel_version}")
+        elif not self.force and self._kernel_module_installed():
+            installed.append("kernel_module")
+        else:
+            required.append(self.kernel_module_artifact)
+
+        for name in required:
+            if name not in self.checksums:
+                raise RuntimeError(f"{name} is not listed in checksums.txt")
+            self.artifacts[name] = self._locate(name)
+
+        pending, skipped = [], []
+        for name in required:
+            if not self.force and self._is_verified(name, self.artifacts[name]):
+                skipped.append(name)
+            else:
+                pending.append(name)
 
+        hashed_bytes = sum(self.artifacts[name].stat().st_size for name in pending)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            digests = dict(zip(pending, pool.map(lambda n: sha256_file(self.artifacts[n]),
+                                                 pending)))
+        elapsed = time.perf_counter() - start
+
+        mismatched = [name for name in pending if digests[name] != self.checksums[name]]
+        for name in pending:
+            if name in mismatched:
+                self.state.verified.pop(name, None)
+                continue
+            stat = self.artifacts[name].stat()
+            self.state.verified[name] = {'path': str(self.artifacts[name]), 'sha256': digests[name],
+                                         'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        self.state.save()
+
+        if mismatched:
+            # Drop bad downloads so the next run fetches them again
+            for name in mismatched:
+                if self.cache_dir in self.artifacts[name].parents:
+                    self.artifacts.pop(name).unlink()
+                    print(f"   🗑️ Removed {name} from the download cache")
+            raise RuntimeError(f"Checksum mismatch: {', '.join(mismatched)}")
+
+        for name in pending:
+            print(f"   ✅ {name}")
+        for name in skipped:
+            print(f"   ♻️ {name} (verified earlier)")
+        for component in installed:
+            print(f"   ♻️ {component} already installed, artifacts not needed")
+        return {
+            'status': 'done' if pending else 'skipped',
+            'hashed': pending,
+            'skipped': skipped,
+            'installed': installed,
+            'hashed_bytes': hashed_bytes,
+            'hash_mb_per_s': hashed_bytes / elapsed / 1e6 if pending and elapsed > 0 else None,
+        }
+
+    def _step_xrt(self) -> Dict[str, Any]:
+        """Install the XRT packages (dpkg on /, dpkg-deb -x into a scratch root)"""
+        digests = {name: self.checksums[name] for name in XRT_PACKAGES}
+        if not self.force and self._xrt_installed():
+            print("   ✅ XRT already installed")
+            return {'status': 'skipped', 'packages': digests}
+
+        packages = [str(self._artifact(name)) for name in XRT_PACKAGES]
+        if self.system_root:
+            try:
+                self._command(["dpkg", "-i"] + packages)
+            except subprocess.CalledProcessError as e:
+                # Usually unmet dependencies, which apt-get -f resolves below
+                print(f"   ⚠️ dpkg -i reported errors, fixing dependencies: {e.stderr.strip()}")
+                dpkg_error = e
+            else:
+                dpkg_error = None
+            self._stream(["apt-get", "install", "-f", "-y"])
+            if dpkg_error is not None:
+                for package in packages:
+                    if not self._package_installed(package):
+                        raise RuntimeError(f"{Path(package).name} is not installed: "
+                                           f"{dpkg_error.stderr.strip()}")
+        else:
+            for package in packages:
+                self._command(["dpkg-deb", "-x", package, str(self.root)])
+        print("   ✅ XRT installed (prebuilt)")
+        return {'packages': digests}
+
+    def _step_kernel_module(self) -> Dict[str, Any]:
+        """Install the prebuilt amdxdna module, or build it with DKMS on /"""
+        name = self.kernel_module_artifact
+        if name not in self.checksums:
+            if not self.system_root:
+                print(f"   ⚠️ No prebuilt for kernel {self.kernel_version}; "
+                      "DKMS builds need --root /")
+                return {'status': 'unavailable', 'kernel': self.kernel_version}
+            return self._build_kernel_module()
+
+        target = self.kernel_module_target
+        if not self.force and self._kernel_module_installed():
+            print("   ✅ Kernel module already installed")
+            return {'status': 'skipped', 'kernel': self.kernel_version}
+
+        if self.system_root:
+            self._command(["mkdir", "-p", str(target.parent)])
+            self._command(["cp", str(self._artifact(name)), str(target)])
+            self._command(["depmod", "-a", self.kernel_version])
+            try:
+                self._command(["modprobe", "amdxdna"])
+            except subprocess.CalledProcessError as e:
+                print(f"   ⚠️ modprobe amdxdna failed: {e.stderr.strip()}")
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(self._artifact(name), target)
+            if shutil.which("depmod"):
+                self._command(["depmod", "-b", str(self.root), self.kernel_version])
+        print("   ✅ Kernel module installed (prebuilt)")
+        return {'kernel': self.kernel_version, 'path': str(target), 'method': 'prebuilt'}
+
+    def _build_kernel_module(self) -> Dict[str, Any]:
+        """Build and install amdxdna from the xdna-driver sources with DKMS"""
+        previous = self._previous.get('kernel_module', {})
+        if not self.force and previous.get('status') == 'done' and \
+                previous.get('details', {}).get('method') == 'dkms' and \
+                previous['details'].get('kernel') == self.kernel_version and \
+                self._installed_module() is not None:
+            print("   ✅ Kernel module already installed (DKMS)")
+            return {'status': 'skipped', 'kernel': self.kernel_version, 'method': 'dkms'}
+
+        print(f"   ⚠️ No prebuilt for kernel {self.kernel_version}, building with DKMS "
+              "(takes 2-5 minutes)")
+        self._stream(["apt-get", "update"])
+        self._stream(["apt-get", "install", "-y", "dkms", "build-essential",
+                      f"linux-headers-{self.kernel_version}"])
+
+        source_dir = Path.home() / "xdna-driver"
+        if not source_dir.exists():
+            self._stream(["git", "clone", XDNA_DRIVER_REPO, str(source_dir)], privileged=False)
+        else:
+            self._stream(["git", "pull"], cwd=source_dir, privileged=False)
+        self._stream(["./amdxdna_drv.sh", "-install"], cwd=source_dir, privileged=False)
+        print("   ✅ Kernel module installed (DKMS)")
+        return {'kernel': self.kernel_version, 'source': str(source_dir), 'method': 'dkms'}
+
+    def _step_permissions(self) -> Dict[str, Any]:
+        """Add the user to the NPU groups and install the udev rule"""
+        rule_path = self._path("/etc/udev/rules.d/99-npu.rules")
+        rule_ok = rule_path.exists() and rule_path.read_text() == UDEV_RULE
+        missing_groups = []
+        if self.system_root and self.user:
+            for group in NPU_GROUPS:
+                try:
+                    if self.user not in grp.getgrnam(group).gr_mem:
+                        missing_groups.append(group)
+                except KeyError:
+                    continue
+
+        if not self.force and rule_ok and not missing_groups:
+            print("   ✅ Permissions already configured")
+            return {'status': 'skipped'}
+
+        if self.system_root:
+            for group in missing_groups:
+                self._command(["usermod", "-aG", group, self.user])
+            if not rule_ok or self.force:
+                self._command(["tee", str(rule_path)], input=UDEV_RULE)
+                self._command(["udevadm", "control", "--reload-rules"])
+                self._command(["udevadm", "trigger"])
+        else:
+            rule_path.parent.mkdir(parents=True, exist_ok=True)
+            rule_path.write_text(UDEV_RULE)
+        print("   ✅ Permissions configured")
+        return {'groups_added': missing_groups, 'udev_rule': str(rule_path)}
+
+    def _step_check(self) -> Dict[str, Any]:
+        """Report which components are present (never fails)"""
+        result = {
+            'xrt_smi': self.xrt_smi.exists(),
+            'kernel_module': self._installed_module() is not None,
+            'device': self._path("/dev/accel/accel0").exists(),
+        }
+        for label, ok in (("XRT runtime", result['xrt_smi']),
+                          ("Kernel module", result['kernel_module']),
+                          ("NPU device", result['device'])):
+            print(f"   {'✅' if ok else '⚠️'} {label}")
+        return result
+
+    def _xrt_installed(self) -> bool:
+        """Whether an earlier run installed these exact XRT packages"""
+        digests = {name: self.checksums.get(name) for name in XRT_PACKAGES}
+        previous = self._previous.get('xrt', {})
+        return self.xrt_smi.exists() and previous.get('details', {}).get('packages') == digests
+
+    def _kernel_module_installed(self) -> bool:
+        """Whether the prebuilt module for the target kernel is already in place"""
+        target = self.kernel_module_target
+        return target.exists() and sha256_file(target) == self.checksums[self.kernel_module_artifact]
+
+    def _installed_module(self) -> Optional[Path]:
+        """amdxdna module file for the target kernel, prebuilt or DKMS-built"""
+        module_dir = self.kernel_module_target.parent
+        if not module_dir.is_dir():
+            return None
+        return next(iter(sorted(module_dir.glob("amdxdna.ko*"))), None)
+
+    def _package_installed(self, package: str) -> bool:
+        """Whether dpkg reports the package in a .deb as installed"""
+        name = self._command(["dpkg-deb", "-f", package, "Package"], privileged=False).stdout.strip()
+        result = subprocess.run(["dpkg-query", "-W", "-f=${Status}", name],
+                                capture_output=True, text=True)
+        return result.returncode == 0 and result.stdout.strip() == "install ok installed"
+
+    def _artifact(self, name: str) -> Path:
+        """Path of an artifact located during verify (located now if not)"""
+        if name not in self.artifacts:
+            self.artifacts[name] = self._locate(name)
+        return self.artifacts[name]
+
+    def _locate(self, name: str) -> Path:
+        """Find an artifact in the release dir or download cache, downloading if needed"""
+        for base in (self.release_dir, self.cache_dir):
+            if (base / name).exists():
+                return base / name
+        if not self.download:
+            raise FileNotFoundError(f"{name} not found in {self.release_dir} or {self.cache_dir}")
+        return self._download(name, self.cache_dir / name)
+
+    @staticmethod
+    def _download(name: str, target: Path) -> Path:
+        """Download into <target>.part, resuming a partial file with a Range request"""
+        url = f"{RELEASE_URL}/{Path(name).name}"
+        partial = target.with_name(target.name + ".part")
+        partial.parent.mkdir(parents=True, exist_ok=True)
+        offset = partial.stat().st_size if partial.exists() else 0
+
+        request = urllib.request.Request(url)
+        if offset:
+            request.add_header("Range", f"bytes={offset}-")
+        print(f"   📥 {Path(name).name}" + (f" (resuming at {offset} bytes)" if offset else ""))
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                mode = 'ab' if offset and response.status == 206 else 'wb'
+                with open(partial, mode) as f:
+                    shutil.copyfileobj(response, f, 1 << 20)
+        except urllib.error.HTTPError as e:
+            # 416: the partial file already holds every byte; verify decides
+            if not (offset and e.code == 416):
+                raise
+        os.replace(partial, target)
+        return target
+
+    def _is_verified(self, name: str, path: Path) -> bool:
+        """Whether the artifact matches an earlier verification (same path, size and mtime)"""
+        record = self.state.verified.get(name)
+        if not record or record.get('sha256') != self.checksums[name]:
+            return False
+        stat = path.stat()
+        return record.get('path') == str(path) and record.get('size') == stat.st_size and \
+            record.get('mtime_ns') == stat.st_mtime_ns
+
+
+def run_install_script() -> int:
+    """Run install-npu-host.sh (source build); returns its exit code"""
     script_path = get_script_path()
 
     if not script_path.exists():
         print(f"❌ Installation script not found: {script_path}")
-        sys.exit(1)
+        return 1
 
     print(f"📦 Running installation script: {script_path}")
+    result = subprocess.run(["bash", str(script_path)], check=False)
+    return result.returncode
 
-    try:
-        # Run the installation script
-        result = subprocess.run(
-            ["bash", str(script_path)],
-            check=False
-        )
 
-        if result.returncode == 0:
+def print_timings(steps: Dict[str, Any]):
+    """Print the per-step timing summary"""
+    print("\n⏱️ Step timings:")
+    for name, entry in steps.items():
+        if entry:
+            print(f"   {name:<14}{entry['status']:<12}{entry['elapsed_s']:8.2f}s")
+
+
+def main():
+    """Run NPU host installation"""
+    parser = argparse.ArgumentParser(description="Unicorn NPU host setup")
+    parser.add_argument('--root', default='/', help="Root filesystem to install into")
+    parser.add_argument('--release-dir', default=None, help="Directory with checksums.txt")
+    parser.add_argument('--state-file', default=None, help="Install state file")
+    parser.add_argument('--kernel-version', default=None, help="Target kernel release")
+    parser.add_argument('--jobs', type=int, default=None, help="Parallel hashing workers")
+    parser.add_argument('--no-download', action='store_true', help="Use local artifacts only")
+    parser.add_argument('--force', action='store_true', help="Redo all steps and re-verify")
+    parser.add_argument('--from-source', action='store_true',
+                        help="Run install-npu-host.sh (compile XRT and driver)")
+    args = parser.parse_args()
+
+    print("🦄 Unicorn NPU Core - Host System Setup")
+    print("=" * 50)
+
+    root = Path(args.root)
+    system_root = root.resolve() == Path("/")
+    os_version = read_os_version(root)
+
+    if args.from_source or (system_root and os_version not in PREBUILT_UBUNTU_VERSIONS):
+        if not args.from_source:
+            print(f"⚠️ No prebuilt for Ubuntu {os_version}, compiling from source")
+        returncode = run_install_script()
+        if returncode == 0:
             print("\n✅ NPU host setup complete!")
             print("⚠️ Please log out and back in for group changes to take effect")
         else:
-            print(f"\n❌ Installation failed with code {result.returncode}")
-            sys.exit(result.returncode)
+            print(f"\n❌ Installation failed with code {returncode}")
+            sys.exit(returncode)
+        return
+
+    if system_root and not (Path("/sys/bus/pci/devices/0000:c7:00.1").exists() or
+                            Path("/dev/accel/accel0").exists()):
+        print("⚠️ AMD NPU may not be present (requires Ryzen AI Phoenix/Hawk Point/Strix)")
+
+    try:
+        installer = PrebuiltInstaller(
+            root=args.root,
+            release_dir=args.release_dir,
+            state_path=args.state_file,
+            kernel_version=args.kernel_version,
+            download=not args.no_download,
+            force=args.force,
+            jobs=args.jobs
+        )
+    except Exception as e:
+        print(f"\n❌ Cannot start installation: {e}")
+        sys.exit(1)
 
+    try:
+        steps = installer.run()
     except Exception as e:
         print(f"\n❌ Installation error: {e}")
+        print(f"   Re-run to resume; progress is kept in {installer.state.path}")
+        print_timings(installer.state.steps)
         sys.exit(1)
 
+    print_timings(steps)
+    print("\n✅ NPU host setup complete!")
+    if system_root:
+        print("⚠️ Please log out and back in for group changes to take effect")
+
 
 if __name__ == "__main__":
     main()
@@ -1,4 +1,5 @@
 """NPU utilities"""
 
-# Placeholder for future utility implementations
-__all__ = []
+from .async_subprocess import run_command_async
+
+__all__ = ["run_command_async"]
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Async Subprocess Helpers
+Non-blocking counterpart to subprocess.run for asyncio callers
+"""
+
+import asyncio
+import subprocess
+from typing import List, Optional
+
+
+async def run_command_async(args: List[str],
+                            timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+    """
+    Run a command without blocking the event loop
+
+    Mirrors ``subprocess.run(args, capture_output=True, text=True, timeout=...)``
+    so callers can share result handling with the synchronous code paths.
+    The child process is killed if the timeout expires or the awaiting
+    task is cancelled.
+
+    Args:
+        args: Command and arguments
+        timeout: Timeout in seconds (None for no timeout)
+
+    Returns:
+        CompletedProcess with decoded stdout/stderr
+
+    Raises:
+        FileNotFoundError: If the executable does not exist
+        subprocess.TimeoutExpired: If the command exceeds the timeout
+    """
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        await _kill(process)
+        raise subprocess.TimeoutExpired(args, timeout)
+    except asyncio.CancelledError:
+        await _kill(process)
+        raise
+
+    return subprocess.CompletedProcess(
+        args,
+        process.returncode,
+        stdout.decode(errors='replace'),
+        stderr.decode(errors='replace')
+    )
+
+
+async def _kill(process: asyncio.subprocess.Process):
+    """Kill a child process and reap it"""
+    if process.returncode is None:
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+        await process.wait()